@@ -0,0 +1,9 @@
+from rest_framework.pagination import LimitOffsetPagination
+
+
+class GroupMemberPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination of a group's members
+    """
+    default_limit = 50
+    max_limit = 500
@@ -71,3 +71,15 @@ class GroupSerializer(serializers.ModelSerializer):
                 'read_only': True,
             },
         }
+
+
+class GroupSummarySerializer(serializers.ModelSerializer):
+    """
+    Group serializer for listing groups, with the number of members instead of the members
+    """
+    member_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = group_models.Group
+        fields = ['id', 'name', 'created_by', 'member_count', 'created_at', 'updated_at']
+        read_only_fields = fields
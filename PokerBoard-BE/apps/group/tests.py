@@ -1,4 +1,6 @@
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from ddf import G
@@ -178,6 +180,66 @@ class GroupTestCases(APITestCase):
         response = self.client.get(reverse('groups-detail', args=[7]))
         self.assertEqual(response.status_code, 404)
 
+    def test_list_group_compact(self):
+        """
+        Get group list in compact view, groups carry member counts instead of members
+        """
+        G(group_models.GroupMember, group=self.group)
+        response = self.client.get(self.GROUP_URL, {"view": "compact"})
+        expected_data = [
+            {
+                "id": self.group.id,
+                "name": self.group.name,
+                "created_by": self.user.id,
+                "member_count": 2,
+                "created_at": self.group.created_at.strftime(pokerboard_constants.DATETIME_FORMAT),
+                "updated_at": self.group.updated_at.strftime(pokerboard_constants.DATETIME_FORMAT),
+            }
+        ]
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual(response.data, expected_data)
+
+    def test_list_group_query_count(self):
+        """
+        Get group list, takes as many queries for many groups and members as for one
+        """
+        def count_queries(params):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.GROUP_URL, params)
+            self.assertEqual(response.status_code, 200)
+            return len(context.captured_queries)
+
+        # warm up the token cache, so only the listing itself is counted
+        self.client.get(self.GROUP_URL)
+        few = [count_queries({}), count_queries({"view": "compact"})]
+        for _ in range(5):
+            group = G(group_models.Group)
+            G(group_models.GroupMember, group=group, user=self.user)
+            G(group_models.GroupMember, group=group, n=3)
+        self.assertListEqual(few, [count_queries({}), count_queries({"view": "compact"})])
+        self.assertListEqual(few, [2, 1])
+
+    def test_get_group_members(self):
+        """
+        Get a page of group members
+        """
+        members = G(group_models.GroupMember, group=self.group, n=3)
+        url = reverse('groups-members', args=[self.group.id])
+        response = self.client.get(url, {"limit": 2, "offset": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 4)
+        self.assertListEqual([member["id"] for member in response.data["results"]], [members[0].id, members[1].id])
+        self.assertEqual(response.data["results"][0]["user"]["email"], members[0].user.email)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_get_group_members_of_other_group(self):
+        """
+        Get members of a group the user is not a member of, expects 404
+        """
+        group = G(group_models.Group)
+        response = self.client.get(reverse('groups-members', args=[group.id]))
+        self.assertEqual(response.status_code, 404)
+
     def test_add_member_to_group(self):
         """
         Add member to group, Expects 201 response code
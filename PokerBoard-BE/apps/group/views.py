@@ -1,8 +1,16 @@
+from django.db.models import Count, Prefetch
+from django.db.models.query import QuerySet
+
+from rest_framework.decorators import action
 from rest_framework.generics import CreateAPIView
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.serializers import Serializer
 from rest_framework.viewsets import ModelViewSet
 
 from apps.group import (
     models as group_models,
+    pagination as group_pagination,
     permissions as group_permissions,
     serializer as group_serializers,
 )
@@ -11,20 +19,59 @@ from apps.group import (
 class GroupViewset(ModelViewSet):
     """
     Group API for creating group and get list of groups a user is associated with.
+    With ?view=compact groups carry member counts instead of their members, which are paged by the members endpoint.
     """
     serializer_class = group_serializers.GroupSerializer
 
+    @property
+    def is_compact(self) -> bool:
+        """
+        Checks if groups are read in the compact representation
+        """
+        return self.request.method == "GET" and self.request.query_params.get("view") == "compact"
+
+    def get_serializer_class(self) -> Serializer:
+        """
+        Get serializer class based on the requested representation
+        """
+        if self.action == "members":
+            return group_serializers.GroupMemberSerializer
+        if self.is_compact:
+            return group_serializers.GroupSummarySerializer
+        return group_serializers.GroupSerializer
+
     def perform_create(self, serializer):
         """
         Saves serializer and injects created_by property as current user
         """
         serializer.save(created_by=self.request.user)
 
-    def get_queryset(self):
+    def get_queryset(self) -> QuerySet:
         """
         Gets groups list in which current user is a member.
+        Membership is resolved in a subquery, so a group is listed once, and members are prefetched with their users,
+        keeping the number of queries independent of the number of groups and members.
+        """
+        queryset = group_models.Group.objects.filter(
+            id__in=group_models.GroupMember.objects.filter(user=self.request.user).values("group_id")
+        ).order_by("id")
+        if self.action == "members":
+            return queryset
+        if self.is_compact:
+            return queryset.annotate(member_count=Count("members"))
+        return queryset.prefetch_related(
+            Prefetch("members", queryset=group_models.GroupMember.objects.select_related("user"))
+        )
+
+    @action(detail=True, pagination_class=group_pagination.GroupMemberPagination)
+    def members(self, request: Request, pk: int=None) -> Response:
+        """
+        Gets a page of a group's members
         """
-        return group_models.Group.objects.filter(members__user=self.request.user)
+        group = self.get_object()
+        queryset = group_models.GroupMember.objects.filter(group=group).select_related("user").order_by("id")
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
 
 
 class GroupMemberApi(CreateAPIView):
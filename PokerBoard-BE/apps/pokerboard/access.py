@@ -0,0 +1,55 @@
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.pokerboard import models as pokerboard_models
+
+_stats_lock = threading.Lock()
+stats = {
+    "hits": 0,
+    "misses": 0,
+}
+
+
+def _cache_key(email: str, pokerboard_id: int) -> str:
+    """
+    Cache key of a user's access to a pokerboard
+    """
+    return f"pokerboard_access:{email}:{pokerboard_id}"
+
+
+def _count(counter: str) -> None:
+    """
+    Increments a hit/miss counter
+    """
+    with _stats_lock:
+        stats[counter] += 1
+
+
+def has_access(user, pokerboard_id: int) -> bool:
+    """
+    Checks if user is a member (the manager or an accepted invitee) of a pokerboard.
+    A miss loads every pokerboard the user can access, so later checks of the user are hits.
+    """
+    allowed = cache.get(_cache_key(user.email, pokerboard_id))
+    if allowed is not None:
+        _count("hits")
+        return allowed
+    _count("misses")
+
+    pokerboard_ids = set(pokerboard_models.Membership.objects.filter(
+        user=user
+    ).values_list("pokerboard_id", flat=True))
+    entries = {_cache_key(user.email, board_id): True for board_id in pokerboard_ids}
+    entries[_cache_key(user.email, pokerboard_id)] = pokerboard_id in pokerboard_ids
+    cache.set_many(entries, settings.POKERBOARD_ACCESS_CACHE_TTL)
+    return entries[_cache_key(user.email, pokerboard_id)]
+
+
+def invalidate(email: str, pokerboard_id: int) -> None:
+    """
+    Drops a cached access check
+    """
+    cache.delete(_cache_key(email, pokerboard_id))
+
@@ -7,3 +7,5 @@ admin.site.register(pokerboard_models.Ticket)
 admin.site.register(pokerboard_models.GameSession)
 admin.site.register(pokerboard_models.Vote)
 admin.site.register(pokerboard_models.Invite)
+admin.site.register(pokerboard_models.ImportJob)
+admin.site.register(pokerboard_models.Membership)
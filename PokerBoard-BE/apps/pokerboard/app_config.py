@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 
 class PokerboardConfig(AppConfig):
     """
@@ -8,6 +8,10 @@ class PokerboardConfig(AppConfig):
     name = 'apps.pokerboard'
 
     def ready(self) -> None:
+        from apps.pokerboard.membership import invite_membership_handler, manager_membership_handler
         from apps.pokerboard.signals import send_email_handler
-        from apps.pokerboard.models import Invite
+        from apps.pokerboard.models import Invite, Pokerboard
         post_save.connect(send_email_handler, sender=Invite)
+        post_save.connect(invite_membership_handler, sender=Invite)
+        post_delete.connect(invite_membership_handler, sender=Invite)
+        post_save.connect(manager_membership_handler, sender=Pokerboard)
@@ -7,12 +7,25 @@ JIRA_HEADERS = {
     'Accept': 'application/json',
 }
 
-MESSAGE_TYPES = ["estimate", "skip", "vote", "initialise_game", "start_timer", "update"]
+# who receives the reply of a websocket message handler: the sending client only, the session's
+# managers, or everyone in the session as a numbered session event
+AUDIENCE_UNICAST = "unicast"
+AUDIENCE_MANAGERS = "managers"
+AUDIENCE_BROADCAST = "broadcast"
 
 STORY_POINTS_FIELD = "customfield_10016"
 
+# spacing between ranks of consecutive tickets, a ticket moved between two others takes the midpoint
+TICKET_RANK_GAP = 1024
+
+# ranks are rebalanced before they pass the largest integer javascript represents exactly
+TICKET_RANK_LIMIT = 2 ** 53 - 1
+
 FIBONACCI_OPTIONS = [1, 2, 3, 5, 8, 13, 21, 34]
 
+# largest page jira returns for a search
+JQL_MAX_PAGE_SIZE = 100
+
 JIRA_API_URL_V1 = f"{settings.JIRA_URL}rest/agile/1.0/"
 JIRA_API_URL_V2 = f"{settings.JIRA_URL}rest/api/2/"
 
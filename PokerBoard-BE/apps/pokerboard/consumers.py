@@ -1,21 +1,51 @@
+import asyncio
 import json
+import time
 from datetime import datetime
 
+from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
-from django.db.models.query_utils import Q
+from django.db import DatabaseError, transaction
 
+from asgiref.sync import sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 from rest_framework import serializers
 
 from apps.pokerboard import (
+    access as pokerboard_access,
     constants as pokerboard_constants,
+    database as pokerboard_database,
+    events as pokerboard_events,
+    imports as pokerboard_imports,
+    messages as pokerboard_messages,
     models as pokerboard_models,
+    presence as pokerboard_presence,
+    ranking as pokerboard_ranking,
     serializers as pokerboard_serializers,
+    timers as pokerboard_timers,
     utils as pokerboard_utils,
+    votes as pokerboard_votes,
 )
 from apps.user import serializers as user_serializers
 
 
+session_handlers = pokerboard_messages.MessageHandlers()
+
+ESTIMATE_MESSAGE = pokerboard_messages.compile_validator({
+    "estimate": (pokerboard_messages.positive_integer, pokerboard_messages.REQUIRED),
+})
+
+INITIALISE_GAME_MESSAGE = pokerboard_messages.compile_validator({
+    "since": (pokerboard_messages.nullable(pokerboard_messages.integer), pokerboard_messages.OPTIONAL),
+})
+
+# session events ending voting, with the status they leave the session in
+FINISHED_STATUSES = {
+    "estimate": pokerboard_models.GameSession.ESTIMATED,
+    "skip": pokerboard_models.GameSession.SKIPPED,
+}
+
+
 class SessionConsumer(AsyncWebsocketConsumer):
     """
     Session consumer for handling websocket connections
@@ -26,149 +56,312 @@ class SessionConsumer(AsyncWebsocketConsumer):
         """
         session_id = self.scope['url_route']['kwargs']['pk']
         self.room_name = str(session_id)
-        self.group_name = f"session_{self.room_name}"
-        self.session = pokerboard_models.GameSession.objects.filter(id=session_id).first()
+        self.group_name = pokerboard_events.group_name(session_id)
+        self.managers_group_name = f"{self.group_name}_managers"
+        self.session = await self.get_session(session_id)
         if not self.session:
-            self.close()
+            await self.close()
             return
 
         if type(self.scope["user"]) == AnonymousUser or self.session.status != pokerboard_models.GameSession.IN_PROGRESS:
-            self.close()
+            await self.close()
             return
-  
-        pokerboards = pokerboard_models.Pokerboard.objects.filter(
-            Q(manager=self.scope["user"]) | Q(invite__invitee=self.scope["user"], invite__is_accepted=True)
-        )
 
-        if not pokerboards.filter(id=self.session.ticket.pokerboard.id).exists():
-            self.close()
+        if not await self.has_access():
+            await self.close()
             return
         
         # Join room group
-        clients = getattr(self.channel_layer, self.group_name, [])
-        clients.append(self.scope["user"])
-        setattr(self.channel_layer, self.group_name, clients)
-        serializer = user_serializers.UserSerializer(clients, many=True)
+        self.presence = pokerboard_presence.PresenceRegistry(session_id)
+        self.events = pokerboard_events.EventLog(session_id)
+        self.user_data = user_serializers.UserSerializer(self.scope["user"]).data
         await self.channel_layer.group_add(
             self.group_name,
             self.channel_name
         )
-        message = {
-            'type': 'broadcast',
-            'message': {
-                'type': 'update',
-                'users': serializer.data
-            }
-        }
+        if self.is_manager():
+            await self.channel_layer.group_add(self.managers_group_name, self.channel_name)
         await self.accept()
+        self.deadline = pokerboard_timers.deadline(self.session)
+        if self.deadline is not None and self.deadline > time.time():
+            pokerboard_timers.timer_scheduler.watch(self.session.id, self.deadline)
+        await sync_to_async(self.presence.join, thread_sensitive=False)(self.channel_name, self.user_data)
+        await self.broadcast_presence("join")
+        self.heartbeat_task = asyncio.ensure_future(self.heartbeat())
+
+    @pokerboard_database.database_sync_to_async
+    def get_session(self, session_id):
+        """
+        Fetches game session along with its ticket and pokerboard
+        """
+        return pokerboard_models.GameSession.objects.select_related(
+            "ticket__pokerboard"
+        ).filter(id=session_id).first()
+
+    @pokerboard_database.database_sync_to_async
+    def has_access(self):
+        """
+        Checks if current user is the manager or an accepted invitee of session's pokerboard
+        """
+        return pokerboard_access.has_access(self.scope["user"], self.session.ticket.pokerboard_id)
+
+    def is_manager(self):
+        """
+        Checks if current user is the manager and the session is still in progress
+        """
+        return (
+            self.scope["user"].id == self.session.ticket.pokerboard.manager_id and
+            self.session.status == pokerboard_models.GameSession.IN_PROGRESS
+        )
+
+    async def heartbeat(self):
+        """
+        Keeps current user's presence alive while the socket is open
+        """
+        while True:
+            await asyncio.sleep(settings.PRESENCE_HEARTBEAT_INTERVAL)
+            expired = await sync_to_async(self.presence.heartbeat, thread_sensitive=False)(self.channel_name, self.user_data)
+            if expired:
+                await self.broadcast_presence("join")
+
+    async def broadcast_presence(self, message_type):
+        """
+        Broadcast the user who joined/left instead of the whole participant list
+        """
+        await self.publish({
+            'type': message_type,
+            'user': self.user_data
+        })
+
+    async def publish(self, message):
+        """
+        Numbers a message as the session's next event and broadcasts it to the group
+        """
+        event = await sync_to_async(self.events.append, thread_sensitive=False)(message)
         await self.channel_layer.group_send(
-            self.group_name, message
+            self.group_name,
+            {
+                'type': 'broadcast',
+                'message': event
+            }
         )
 
-    def estimate(self, event):
+    async def send_error(self, error):
+        """
+        Sends an error to current user only
+        """
+        await self.send(text_data=pokerboard_messages.dumps({
+            "error": error
+        }))
+
+    async def reply(self, target, message):
+        """
+        Routes the reply of a message handler to its audience, only broadcasts become session events
+        """
+        if target == pokerboard_constants.AUDIENCE_BROADCAST:
+            await self.publish(message)
+        elif target == pokerboard_constants.AUDIENCE_MANAGERS:
+            await self.channel_layer.group_send(
+                self.managers_group_name,
+                {
+                    'type': 'broadcast',
+                    'message': message
+                }
+            )
+        else:
+            await self.send(text_data=pokerboard_messages.dumps(message))
+
+    @session_handlers.register(
+        "estimate", pokerboard_constants.AUDIENCE_BROADCAST, ESTIMATE_MESSAGE, "Estimation failed"
+    )
+    async def estimate(self, event):
         """
         Finalize estimation of a ticket
         """
+        if not self.is_manager():
+            await self.send_error("Only manager can finalize estimate")
+            return
         try:
-            manager = self.session.ticket.pokerboard.manager
-            if self.scope["user"] == manager and self.session.status == pokerboard_models.GameSession.IN_PROGRESS:
-                self.session.status = pokerboard_models.GameSession.ESTIMATED
-                ticket = self.session.ticket
-                ticket.estimate = event["message"]["estimate"]
-                url = f"{pokerboard_constants.JIRA_API_URL_V2}issue/{ticket.ticket_id}"
-                data = json.dumps({
-                    "update": {
-                        'customfield_10016': [
-                            {
-                                "set": ticket.estimate
-                            }
-                        ]
-                    }
-                })
-                self.session.save()
-                ticket.save()
-                return {
-                    "type": event["type"],
-                    "estimate": event["message"]["estimate"]
-                }
-            else:
-                self.send(text_data=json.dumps({
-                    "error": "Only manager can finalize estimate"
-                }))
-        except serializers.ValidationError as e:
-            self.send(text_data=json.dumps({
-                "error": "Estimation failed"
-            }))
+            estimated = await self.save_estimate(event["message"]["estimate"])
+        except (KeyError, TypeError, ValueError, DatabaseError):
+            await self.send_error("Estimation failed")
+            return
+        if not estimated:
+            await self.send_error("Session is already over")
+            return
+        await sync_to_async(pokerboard_timers.timer_scheduler.cancel, thread_sensitive=False)(self.session.id)
+        return {
+            "type": event["type"],
+            "estimate": event["message"]["estimate"]
+        }
+
+    def lock_session(self):
+        """
+        Locks the session row until the transaction ends, returns False if the session was finished
+        meanwhile (by its timer or another socket), updating the status of self.session
+        """
+        status = pokerboard_models.GameSession.objects.select_for_update().values_list(
+            "status", flat=True
+        ).get(id=self.session.id)
+        if status != pokerboard_models.GameSession.IN_PROGRESS:
+            self.session.status = status
+            return False
+        return True
+
+    @pokerboard_database.database_sync_to_async
+    def save_estimate(self, estimate):
+        """
+        Marks the session estimated and saves ticket's final estimate, returns False if it was already finished
+        """
+        ticket = self.session.ticket
+        ticket.estimate = int(estimate)
+        pokerboard_votes.vote_buffer.flush(self.session.id)
+        with transaction.atomic():
+            if not self.lock_session():
+                return False
+            self.session.status = pokerboard_models.GameSession.ESTIMATED
+            self.session.save()
+            ticket.save()
+        return True
 
-    def skip(self, event):
+    @session_handlers.register("skip", pokerboard_constants.AUDIENCE_BROADCAST)
+    async def skip(self, event):
         """
         Skip current voting session
         """
-        manager = self.session.ticket.pokerboard.manager
-        if self.scope["user"] == manager and self.session.status == pokerboard_models.GameSession.IN_PROGRESS:
+        if not self.is_manager():
+            await self.send_error("Can't skip")
+            return
+        try:
+            skipped = await self.save_skip()
+        except DatabaseError:
+            await self.send_error("Skipping failed")
+            return
+        if not skipped:
+            await self.send_error("Session is already over")
+            return
+        await sync_to_async(pokerboard_timers.timer_scheduler.cancel, thread_sensitive=False)(self.session.id)
+        return {
+            "type": event["type"],
+        }
+
+    @pokerboard_database.database_sync_to_async
+    def save_skip(self):
+        """
+        Marks the session skipped and moves its ticket to the end, returns False if it was already finished
+        """
+        pokerboard_votes.vote_buffer.flush(self.session.id)
+        with transaction.atomic():
+            if not self.lock_session():
+                return False
             self.session.status = pokerboard_models.GameSession.SKIPPED
             self.session.timer_started_at = None
             self.session.save()
-            pokerboard_utils.move_ticket_to_end(self.session.ticket)
-            return {
-                "type": event["type"],
-            }
-        else:
-            self.send(text_data=json.dumps({
-                "error": "Can't skip"
-            }))
+            pokerboard_ranking.move_to_end(self.session.ticket)
+        return True
         
-    def initialise_game(self, event):
+    @session_handlers.register("initialise_game", pokerboard_constants.AUDIENCE_UNICAST, INITIALISE_GAME_MESSAGE)
+    async def initialise_game(self, event):
         """
-        Initialise game, fetches connceted users and votes already given
+        Catches current user up on the session. Replies with the events after the number given as since
+        while the event buffer still holds them, else a snapshot of connected users, votes already
+        given and the timer, numbered as the latest event it includes.
+        Estimates of other users' votes are sent to managers only.
         """
-        votes = pokerboard_models.Vote.objects.filter(game_session=self.session)
-        vote_serializer = pokerboard_serializers.VoteSerializer(instance=votes, many=True)
-        clients = list(set(getattr(self.channel_layer, self.group_name, [])))
-        serializer = user_serializers.UserSerializer(instance=clients, many=True)
+        since = event["message"].get("since")
+        if since is not None:
+            events = await sync_to_async(self.events.since, thread_sensitive=False)(since)
+            if events is not None:
+                reply = {
+                    "type": event["type"],
+                    "seq": events[-1]["seq"] if events else since,
+                    "events": events,
+                    "server_time": time.time()
+                }
+                if self.is_manager():
+                    # vote events carry no estimates, managers get them with the current votes
+                    reply["votes"] = await self.get_votes()
+                return reply
+        # numbered before the state is read, events racing with the snapshot are sent again, not lost
+        seq = await sync_to_async(self.events.latest, thread_sensitive=False)()
+        votes = await self.get_votes()
+        if not self.is_manager():
+            votes = [
+                vote if vote["user"]["id"] == self.user_data["id"] else pokerboard_votes.without_estimate(vote)
+                for vote in votes
+            ]
+        users = await sync_to_async(self.presence.members, thread_sensitive=False)()
         return {
             "type": event["type"],
-            "votes": vote_serializer.data,
-            "users": serializer.data,
-            "timer": json.dumps(self.session.timer_started_at, default=self.myconverter)
+            "seq": seq,
+            "votes": votes,
+            "users": users,
+            "timer": json.dumps(self.session.timer_started_at, default=self.myconverter),
+            "deadline": self.deadline,
+            "server_time": time.time()
         }
 
-    def vote(self, event):
+    @pokerboard_database.database_sync_to_async
+    def get_votes(self):
         """
-        Places/update a vote on a ticket
+        Fetches serialized votes of current session, including votes not yet written
         """
+        votes = pokerboard_models.Vote.objects.filter(game_session=self.session).select_related("user")
+        votes = pokerboard_serializers.VoteSerializer(instance=votes, many=True).data
+        return pokerboard_votes.vote_buffer.merge(self.session.id, votes)
+
+    @session_handlers.register(
+        "vote", pokerboard_constants.AUDIENCE_MANAGERS, ESTIMATE_MESSAGE, "Invalid estimate"
+    )
+    async def vote(self, event):
+        """
+        Places/update a vote on a ticket. Everyone is told who voted as a session event,
+        managers are then sent the vote with its estimate
+        """
+        if self.session.status != pokerboard_models.GameSession.IN_PROGRESS:
+            await self.send_error("Voting is over")
+            return
+        if self.deadline is not None and self.deadline <= time.time():
+            await self.send_error("Voting time is over")
+            return
+        estimate = event["message"]["estimate"]
         try:
-            serializer = pokerboard_serializers.VoteSerializer(data=event["message"])
-            serializer.is_valid(raise_exception=True)
-            pokerboard_utils.validate_vote(
-                self.session.ticket.pokerboard.estimation_type, serializer.validated_data["estimate"])
-            serializer.save(game_session=self.session, user=self.scope["user"])
-            return {
-                "type": event["type"],
-                "vote": serializer.data
-            }
-        except serializers.ValidationError as e:
-            self.send(text_data=json.dumps({
-                "error": "Invalid estimate"
-            }))
+            pokerboard_utils.validate_vote(self.session.ticket.pokerboard.estimation_type, estimate)
+        except serializers.ValidationError:
+            await self.send_error("Invalid estimate")
+            return
+        vote = await sync_to_async(pokerboard_votes.vote_buffer.add, thread_sensitive=False)(
+            self.session.id, self.user_data, estimate
+        )
+        # only schedules the flush task, on this loop
+        pokerboard_votes.vote_buffer.ensure_flusher()
+        await self.publish({
+            "type": event["type"],
+            "vote": pokerboard_votes.without_estimate(vote)
+        })
+        return {
+            "type": event["type"],
+            "vote": vote
+        }
 
-    def start_timer(self, event):
+    @session_handlers.register("start_timer", pokerboard_constants.AUDIENCE_BROADCAST)
+    async def start_timer(self, event):
         """
         Starts timer on current voting session
         """
-        manager = self.session.ticket.pokerboard.manager
-        if self.scope["user"] == manager and self.session.status == pokerboard_models.GameSession.IN_PROGRESS:
-            now = datetime.now()
-            self.session.timer_started_at = now
-            self.session.save()
-            return {
-                "type": event["type"],
-                "timer_started_at": json.dumps(now, default=self.myconverter),
-            }
-        else:
-            self.send(text_data=json.dumps({
-                "error": "Can't start timer"
-            }))
+        if not self.is_manager():
+            await self.send_error("Can't start timer")
+            return
+        now = datetime.now()
+        self.session.timer_started_at = now
+        await pokerboard_database.database_sync_to_async(self.session.save)(update_fields=["timer_started_at"])
+        deadline = pokerboard_timers.deadline(self.session)
+        await sync_to_async(pokerboard_timers.timer_scheduler.start, thread_sensitive=False)(self.session.id, deadline)
+        return {
+            "type": event["type"],
+            "timer_started_at": json.dumps(now, default=self.myconverter),
+            "deadline": deadline,
+        }
 
     def myconverter(self, obj):
         """
@@ -179,57 +372,90 @@ class SessionConsumer(AsyncWebsocketConsumer):
 
     async def receive(self, text_data):
         """
-        Runs on recieving any message, acts as a gateway of websocket communication
+        Runs on recieving any message, acts as a gateway of websocket communication.
+        Dispatches only message types registered in session_handlers, once their payload is valid.
         """
         try:
-            text_data_json = json.loads(text_data)
-            print(text_data_json)
-            serializer = pokerboard_serializers.MessageSerializer(data=text_data_json)
-            serializer.is_valid(raise_exception=True)
-            message = text_data_json['message']
-            message_type = text_data_json['message_type']
-            method_to_call = getattr(self, message_type)
-            res = method_to_call({
-                'type': message_type,
-                'message': message,
-                'user': self.scope["user"].id
-            })
-            # Send message to room group
-            if res:
-                await self.channel_layer.group_send(
-                    self.group_name,
-                    {
-                        'type': 'broadcast',
-                        'message': res
-                    }
-                )
-        except serializers.ValidationError:
-            await self.send(text_data=json.dumps({
-                "error": "Something went wrong"
-            }))
+            handler, message = session_handlers.parse(text_data)
+        except pokerboard_messages.MessageError as error:
+            await self.send_error(str(error))
+            return
+        res = await getattr(self, handler.method)({
+            'type': handler.message_type,
+            'message': message,
+            'user': self.scope["user"].id
+        })
+        if res:
+            await self.reply(handler.audience, res)
 
     async def broadcast(self, event):
         """
-        Broadcast a message to connected channels in current group
+        Broadcast a message to connected channels in current group.
+        A started timer is watched on this worker, and sent with the server's clock to count down against.
+        A finished session is marked finished on this socket too, so that it takes no more votes.
         """
-        await self.send(text_data=json.dumps(event["message"]))
+        message = event["message"]
+        if message.get("type") in FINISHED_STATUSES:
+            self.session.status = FINISHED_STATUSES[message["type"]]
+        if message.get("type") == "start_timer":
+            self.deadline = message["deadline"]
+            pokerboard_timers.timer_scheduler.watch(self.session.id, self.deadline)
+            message = dict(message, server_time=time.time())
+        await self.send(text_data=pokerboard_messages.dumps(message))
 
     async def disconnect(self, code):
         """
         Runs when a user disconnects
         """
-        clients = getattr(self.channel_layer, self.group_name, [])
-        clients.remove(self.scope["user"])
-        setattr(self.channel_layer, self.group_name, clients)
-        serializer = user_serializers.UserSerializer(list(set(clients)), many=True)
-        message = {
-            'type': 'broadcast',
-            'message': {
-                'type': 'update',
-                'users': serializer.data
-            }
-        }
-        await self.channel_layer.group_send(
-            self.group_name, message
-        )
+        if not hasattr(self, "presence"):
+            return
+        self.heartbeat_task.cancel()
+        await pokerboard_database.database_sync_to_async(pokerboard_votes.vote_buffer.flush)(self.session.id)
+        left = await sync_to_async(self.presence.leave, thread_sensitive=False)(self.channel_name, self.user_data["id"])
+        if left:
+            await self.broadcast_presence("leave")
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        await self.channel_layer.group_discard(self.managers_group_name, self.channel_name)
+
+
+class ImportJobConsumer(AsyncWebsocketConsumer):
+    """
+    Import job consumer pushing progress of an import job to the user who started it
+    """
+    async def connect(self):
+        """
+        Runs on connection initiate, sends the job's current progress
+        """
+        job = await self.get_job(self.scope['url_route']['kwargs']['pk'])
+        if job is None:
+            await self.close()
+            return
+        self.group_name = pokerboard_imports.group_name(job.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.send(text_data=json.dumps({
+            "type": "progress",
+            "job": pokerboard_serializers.ImportJobSerializer(job).data,
+        }))
+
+    @pokerboard_database.database_sync_to_async
+    def get_job(self, job_id):
+        """
+        Fetches an import job of the current user
+        """
+        if type(self.scope["user"]) == AnonymousUser:
+            return None
+        return pokerboard_models.ImportJob.objects.filter(id=job_id, manager=self.scope["user"]).first()
+
+    async def progress(self, event):
+        """
+        Sends progress of the job
+        """
+        await self.send(text_data=json.dumps(event))
+
+    async def disconnect(self, code):
+        """
+        Leaves the job's group
+        """
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
@@ -0,0 +1,34 @@
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from channels.db import DatabaseSyncToAsync
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Returns the thread pool used for database access from websocket consumers.
+    Every thread holds its own connection, so the pool size caps a worker's connections.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.WEBSOCKET_DB_POOL_SIZE, thread_name_prefix="websocket-db"
+            )
+    return _executor
+
+
+def database_sync_to_async(func):
+    """
+    Runs a sync function touching the ORM in the websocket database pool, so it never blocks the event loop
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await DatabaseSyncToAsync(func, thread_sensitive=False, executor=get_executor())(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,62 @@
+import json
+
+from django.conf import settings
+
+from apps.pokerboard import store as pokerboard_store
+
+
+def group_name(session_id: int) -> str:
+    """
+    Channel layer group of the sockets connected to a game session
+    """
+    return f"session_{session_id}"
+
+
+class EventLog:
+    """
+    Sequence numbered events of a game session in the shared session store.
+    Every event broadcast to a session gets the next number of the session, the latest
+    SESSION_EVENT_BUFFER_SIZE are kept in a ring buffer so that a client that missed some
+    can catch up on them instead of downloading the whole session state again.
+    """
+
+    def __init__(self, session_id: int, store=None, size: int=None, ttl: int=None):
+        self.store = store or pokerboard_store.get_store()
+        self.size = size or settings.SESSION_EVENT_BUFFER_SIZE
+        self.ttl = ttl or settings.SESSION_EVENT_TTL
+        self.seq_key = f"events:{session_id}:seq"
+        self.log_key = f"events:{session_id}:log"
+
+    def append(self, event: dict) -> dict:
+        """
+        Numbers an event and adds it to the buffer, dropping the oldest once full, returns the numbered event
+        """
+        event = dict(event, seq=self.store.incr(self.seq_key))
+        self.store.rpush(self.log_key, json.dumps(event))
+        self.store.ltrim(self.log_key, -self.size, -1)
+        self.store.expire(self.seq_key, self.ttl)
+        self.store.expire(self.log_key, self.ttl)
+        return event
+
+    def latest(self) -> int:
+        """
+        Returns number of the latest event, 0 before the first one
+        """
+        return int(self.store.get(self.seq_key) or 0)
+
+    def since(self, seq: int):
+        """
+        Returns events numbered after seq in order, or None when some of them have already
+        been dropped from the buffer (or seq is not one of this session's) and a snapshot is needed
+        """
+        latest = self.latest()
+        if seq > latest:
+            return None
+        events = sorted(
+            (json.loads(event) for event in self.store.lrange(self.log_key, 0, -1)),
+            key=lambda event: event["seq"]
+        )
+        events = [event for event in events if event["seq"] > seq]
+        if seq < latest and (not events or events[0]["seq"] != seq + 1):
+            return None
+        return events
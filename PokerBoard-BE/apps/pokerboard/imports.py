@@ -0,0 +1,80 @@
+import json
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from rest_framework.exceptions import APIException, ValidationError
+
+from apps.pokerboard import (
+    models as pokerboard_models,
+    ranking as pokerboard_ranking,
+    serializers as pokerboard_serializers,
+    utils as pokerboard_utils
+)
+
+logger = logging.getLogger(__name__)
+
+
+def group_name(job_id: int) -> str:
+    """
+    Channel layer group receiving progress of an import job
+    """
+    return f"import_{job_id}"
+
+
+def push_progress(job: pokerboard_models.ImportJob) -> None:
+    """
+    Saves progress of a job and pushes it to the job's websocket group
+    """
+    job.save(update_fields=["status", "processed", "errors", "pokerboard", "updated_at"])
+    async_to_sync(get_channel_layer().group_send)(group_name(job.id), {
+        "type": "progress",
+        "job": pokerboard_serializers.ImportJobSerializer(job).data,
+    })
+
+
+def run_import(job_id: int) -> None:
+    """
+    Validates tickets of a job IMPORT_BATCH_SIZE at a time, reporting progress after every batch,
+    then creates the pokerboard with all its tickets. A job with invalid tickets fails without creating anything.
+    """
+    job = pokerboard_models.ImportJob.objects.select_related("manager").get(id=job_id)
+    if job.status != pokerboard_models.ImportJob.PENDING:
+        return
+    payload = json.loads(job.payload)
+    tickets = payload.pop("tickets")
+    job.status = pokerboard_models.ImportJob.RUNNING
+    push_progress(job)
+
+    try:
+        errors = []
+        for start in range(0, len(tickets), settings.IMPORT_BATCH_SIZE):
+            batch = tickets[start:start + settings.IMPORT_BATCH_SIZE]
+            errors += pokerboard_utils.invalid_ticket_errors(pokerboard_utils.validate_tickets(batch))
+            job.processed = start + len(batch)
+            push_progress(job)
+        if errors:
+            raise ValidationError(errors)
+
+        serializer = pokerboard_serializers.PokerboardSerializer(data=payload)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            pokerboard = serializer.save(manager=job.manager)
+            pokerboard_models.Ticket.objects.bulk_create([
+                pokerboard_models.Ticket(pokerboard=pokerboard, ticket_id=ticket, rank=rank)
+                for ticket, rank in zip(tickets, pokerboard_ranking.initial_ranks(len(tickets)))
+            ], batch_size=settings.IMPORT_BATCH_SIZE)
+    except APIException as error:
+        job.status = pokerboard_models.ImportJob.FAILED
+        job.errors = json.dumps(error.detail if isinstance(error.detail, (list, dict)) else [error.detail])
+    except Exception:
+        logger.exception("Import job %s failed", job_id)
+        job.status = pokerboard_models.ImportJob.FAILED
+        job.errors = json.dumps(["Something went wrong"])
+    else:
+        job.status = pokerboard_models.ImportJob.DONE
+        job.pokerboard = pokerboard
+    push_progress(job)
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.db import transaction
+
+from apps.group import models as group_models
+from apps.pokerboard import (
+    models as pokerboard_models,
+    tasks as pokerboard_tasks
+)
+
+
+def invite_group(pokerboard: pokerboard_models.Pokerboard, group, group_name: str, role: int) -> int:
+    """
+    Invites every member of a group who is not invited to the pokerboard yet, inserting INVITE_BATCH_SIZE
+    invites per query, then hands all their invitation emails to one celery task.
+    Takes a fixed number of queries whatever the size of the group, returns the number of invites created.
+    """
+    emails = list(group_models.GroupMember.objects.filter(group=group).exclude(
+        user__email__in=pokerboard_models.Invite.objects.filter(
+            pokerboard=pokerboard, invitee__isnull=False
+        ).values("invitee")
+    ).values_list("user__email", flat=True))
+    if not emails:
+        return 0
+
+    with transaction.atomic():
+        invites = pokerboard_models.Invite.objects.bulk_create([
+            pokerboard_models.Invite(
+                type=pokerboard_models.Invite.GROUP, invitee=email, pokerboard=pokerboard,
+                group=group, group_name=group_name, role=role
+            ) for email in emails
+        ], batch_size=settings.INVITE_BATCH_SIZE)
+        # bulk_create returns ids on postgresql only, elsewhere the new invites are looked up by invitee
+        invite_ids = [invite.id for invite in invites]
+        if None in invite_ids:
+            invite_ids = list(pokerboard_models.Invite.objects.filter(
+                pokerboard=pokerboard, group=group, invitee__in=emails
+            ).values_list("id", flat=True))
+
+    pokerboard_tasks.send_invite_emails_task.delay(invite_ids)
+    return len(invite_ids)
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from django.conf import settings
+
+from rest_framework.exceptions import APIException
+from rest_framework.serializers import ValidationError
+
+from apps.pokerboard import constants as pokerboard_constants
+
+
+class JiraError(ValidationError):
+    """
+    Jira answered with an unexpected status code
+    """
+
+
+class JiraUnavailable(APIException):
+    """
+    Jira could not be reached, even after retrying
+    """
+    status_code = 503
+    default_detail = "Jira is unavailable, try again later"
+    default_code = "jira_unavailable"
+
+
+class JiraClient:
+    """
+    Jira REST client sharing pooled HTTP sessions between threads.
+    Requests time out, and are retried with exponential backoff on connection errors, 429 and 5xx.
+    Requests that change jira, like adding a comment, are retried only when they could not connect,
+    as jira may have applied one that failed afterwards.
+    """
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self, base_url: str, auth: tuple, timeout: tuple, retries: int, backoff: float, max_parallel: int
+    ):
+        self.agile_url = f"{base_url}rest/agile/1.0/"
+        self.api_url = f"{base_url}rest/api/2/"
+        self.timeout = timeout
+        # GETs and read-only POSTs like search
+        self.session = self._session(auth, max_parallel, Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset(["GET", "POST"]),
+            raise_on_status=False,
+        ))
+        self.unsafe_session = self._session(auth, max_parallel, Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=backoff,
+            raise_on_status=False,
+        ))
+        # shared by every caller, so parallelism towards jira stays bounded across requests.
+        # background refreshes run on executor, fan-outs on fanout_executor, so that a fan-out
+        # running as a refresh never waits on the pool it occupies
+        self.executor = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="jira")
+        self.fanout_executor = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="jira-fanout")
+
+    @staticmethod
+    def _session(auth: tuple, max_parallel: int, retry: Retry) -> requests.Session:
+        """
+        HTTP session authenticated to jira, retrying requests as retry allows
+        """
+        session = requests.Session()
+        session.auth = auth
+        session.headers.update(pokerboard_constants.JIRA_HEADERS)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_parallel, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def request(
+        self, method: str, url: str, payload: Any=None, status_code: int=200, idempotent: bool=True
+    ) -> dict:
+        """
+        Performs a request and returns the decoded response.
+        Requests that are not idempotent are not retried once they reached jira.
+        """
+        session = self.session if idempotent else self.unsafe_session
+        try:
+            response = session.request(method, url, data=payload or {}, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            raise JiraUnavailable()
+        if response.status_code != status_code:
+            error_msgs = ["Something went wrong"]
+            try:
+                error_msgs = json.loads(response.text).get("errorMessages", error_msgs)
+            except ValueError:
+                pass
+            raise JiraError(error_msgs)
+        if not response.text:
+            return {}
+        return json.loads(response.text)
+
+    def get_boards(self) -> list:
+        """
+        Get all available boards
+        """
+        return self.request("GET", f"{self.agile_url}board")["values"]
+
+    def get_sprints(self, board_id: int) -> list:
+        """
+        Get sprints for a given board
+        """
+        return self.request("GET", f"{self.agile_url}board/{board_id}/sprint")["values"]
+
+    def get_all_sprints(self) -> list:
+        """
+        Fetches sprints of all boards concurrently, in board order
+        """
+        board_ids = [board["id"] for board in self.get_boards()]
+        return [sprint for sprints in self.fanout_executor.map(self.get_sprints, board_ids) for sprint in sprints]
+
+    async def aget_all_sprints(self) -> list:
+        """
+        Async variant of get_all_sprints, the event loop waits while the client's threads fetch
+        """
+        loop = asyncio.get_event_loop()
+        boards = await loop.run_in_executor(self.executor, self.get_boards)
+        results = await asyncio.gather(*[
+            loop.run_in_executor(self.fanout_executor, self.get_sprints, board["id"]) for board in boards
+        ])
+        return [sprint for sprints in results for sprint in sprints]
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> JiraClient:
+    """
+    Returns the process wide jira client, built from settings on first use
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = JiraClient(
+                base_url=settings.JIRA_URL,
+                auth=pokerboard_constants.JIRA_AUTH,
+                timeout=settings.JIRA_TIMEOUT,
+                retries=settings.JIRA_RETRIES,
+                backoff=settings.JIRA_RETRY_BACKOFF,
+                max_parallel=settings.JIRA_MAX_PARALLEL,
+            )
+        return _client
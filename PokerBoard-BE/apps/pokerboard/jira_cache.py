@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import caches
+
+from apps.pokerboard import jira as pokerboard_jira
+
+logger = logging.getLogger(__name__)
+
+_stats_lock = threading.Lock()
+stats = {}
+
+
+def _cache():
+    """
+    Cache backend holding jira responses, configured by the JIRA_CACHE_ALIAS entry of CACHES
+    """
+    return caches[settings.JIRA_CACHE_ALIAS]
+
+
+def _cache_key(endpoint: str, key: str) -> str:
+    """
+    Cache key of a jira response, hashed as keys can be arbitrary JQL
+    """
+    return f"jira:{endpoint}:{hashlib.md5(key.encode()).hexdigest()}"
+
+
+def _count(endpoint: str, counter: str, amount: int=1) -> None:
+    """
+    Increments a hit/stale/miss counter of an endpoint
+    """
+    with _stats_lock:
+        endpoint_stats = stats.setdefault(endpoint, {"hits": 0, "stale_hits": 0, "misses": 0})
+        endpoint_stats[counter] += amount
+
+
+def get_stats() -> dict:
+    """
+    Hit/stale/miss counters and hit ratio per endpoint since the worker started
+    """
+    with _stats_lock:
+        result = {}
+        for endpoint, counters in stats.items():
+            total = sum(counters.values())
+            result[endpoint] = dict(counters, hit_ratio=(counters["hits"] + counters["stale_hits"]) / total if total else 0)
+        return result
+
+
+def _store(cache_key: str, value: Any, policy: dict) -> None:
+    """
+    Caches a response with the time it stops being fresh, kept for another `stale` seconds
+    """
+    _cache().set(cache_key, (value, time.time() + policy["ttl"]), policy["ttl"] + policy.get("stale", 0))
+
+
+def _refresh(cache_key: str, fetch: Callable, policy: dict) -> None:
+    """
+    Refetches a stale response in the background
+    """
+    try:
+        _store(cache_key, fetch(), policy)
+    except Exception:
+        logger.exception("Refreshing cached jira response failed")
+    finally:
+        _cache().delete(f"{cache_key}:refreshing")
+
+
+def cached(endpoint: str, key: str, fetch: Callable) -> Any:
+    """
+    Returns a jira response from the cache, fetching it on a miss.
+    Endpoints are configured in JIRA_CACHE_POLICIES: responses are fresh for `ttl` seconds,
+    then served stale for up to `stale` more seconds while one background fetch refreshes them.
+    """
+    policy = settings.JIRA_CACHE_POLICIES[endpoint]
+    cache_key = _cache_key(endpoint, key)
+    entry = _cache().get(cache_key)
+    if entry is not None:
+        value, fresh_until = entry
+        if fresh_until > time.time():
+            _count(endpoint, "hits")
+            return value
+        _count(endpoint, "stale_hits")
+        if _cache().add(f"{cache_key}:refreshing", True, policy["ttl"]):
+            pokerboard_jira.get_client().executor.submit(_refresh, cache_key, fetch, policy)
+        return value
+    _count(endpoint, "misses")
+    value = fetch()
+    _store(cache_key, value, policy)
+    return value
+
+
+def invalidate(endpoint: str, key: str) -> None:
+    """
+    Drops a cached jira response
+    """
+    _cache().delete(_cache_key(endpoint, key))
+
+
+def get_many(endpoint: str, keys: list) -> dict:
+    """
+    Returns cached values of the keys found in the cache
+    """
+    cache_keys = {_cache_key(endpoint, key): key for key in keys}
+    found = _cache().get_many(list(cache_keys))
+    _count(endpoint, "hits", len(found))
+    _count(endpoint, "misses", len(keys) - len(found))
+    return {cache_keys[cache_key]: value for cache_key, (value, fresh_until) in found.items()}
+
+
+def set_many(endpoint: str, values: dict) -> None:
+    """
+    Caches several values of an endpoint at once
+    """
+    policy = settings.JIRA_CACHE_POLICIES[endpoint]
+    fresh_until = time.time() + policy["ttl"]
+    _cache().set_many(
+        {_cache_key(endpoint, key): (value, fresh_until) for key, value in values.items()}, policy["ttl"]
+    )
@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+
+from apps.pokerboard import (
+    access as pokerboard_access,
+    models as pokerboard_models
+)
+
+
+def sync_membership(user, pokerboard: pokerboard_models.Pokerboard) -> None:
+    """
+    Recomputes a user's membership of a pokerboard from its manager and the user's accepted invites
+    """
+    if pokerboard.manager_id == user.id:
+        role = pokerboard_models.Membership.MANAGER
+    else:
+        role = pokerboard_models.Invite.objects.filter(
+            pokerboard=pokerboard, invitee=user.email, is_accepted=True
+        ).aggregate(role=Max("role"))["role"]
+
+    if role is None:
+        pokerboard_models.Membership.objects.filter(user=user, pokerboard=pokerboard).delete()
+    else:
+        pokerboard_models.Membership.objects.update_or_create(
+            user=user, pokerboard=pokerboard, defaults={"role": role}
+        )
+    pokerboard_access.invalidate(user.email, pokerboard.id)
+
+
+def manager_membership_handler(**kwargs):
+    """
+    Django signal handler giving a pokerboard's manager the manager membership,
+    and resyncing former managers when it changes hands
+    """
+    pokerboard = kwargs.get('instance')
+    if kwargs.get('created'):
+        pokerboard_models.Membership.objects.create(
+            user_id=pokerboard.manager_id, pokerboard=pokerboard, role=pokerboard_models.Membership.MANAGER
+        )
+        pokerboard_access.invalidate(pokerboard.manager.email, pokerboard.id)
+        return
+
+    manager_ids = list(pokerboard_models.Membership.objects.filter(
+        pokerboard=pokerboard, role=pokerboard_models.Membership.MANAGER
+    ).values_list("user_id", flat=True))
+    if manager_ids == [pokerboard.manager_id]:
+        return
+    for user in get_user_model().objects.filter(id__in=manager_ids + [pokerboard.manager_id]):
+        sync_membership(user, pokerboard)
+
+
+def invite_membership_handler(**kwargs):
+    """
+    Django signal handler resyncing the invitee's membership whenever an invite changes
+    """
+    instance = kwargs.get('instance')
+    if not instance.invitee:
+        return
+    user = get_user_model().objects.filter(email=instance.invitee).first()
+    if user is not None:
+        sync_membership(user, instance.pokerboard)
@@ -0,0 +1,134 @@
+import json
+from collections import namedtuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+REQUIRED = True
+OPTIONAL = False
+
+# largest value django and DRF accept for a PositiveIntegerField
+POSITIVE_INTEGER_MAX = 2147483647
+
+Handler = namedtuple("Handler", ["message_type", "method", "audience", "validate", "error"])
+
+
+class MessageError(Exception):
+    """
+    A websocket message that can not be handled, its text is sent back to the client as the error
+    """
+
+
+def loads(text: str):
+    """
+    Decodes json, with orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def dumps(data) -> str:
+    """
+    Encodes json, with orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data)
+
+
+def integer(value, min_value: int=None, max_value: int=None) -> int:
+    """
+    Cleans an integer the way DRF's IntegerField does: ints, integral floats and strings of digits
+    """
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(value)
+        value = int(value)
+    elif isinstance(value, str):
+        value = int(value.strip())
+    elif not isinstance(value, int):
+        raise ValueError(value)
+    if min_value is not None and value < min_value:
+        raise ValueError(value)
+    if max_value is not None and value > max_value:
+        raise ValueError(value)
+    return value
+
+
+def positive_integer(value) -> int:
+    """
+    Cleans an integer that fits a PositiveIntegerField, like DRF's serializer of one does
+    """
+    return integer(value, min_value=0, max_value=POSITIVE_INTEGER_MAX)
+
+
+def nullable(cleaner):
+    """
+    Cleaner letting None through, cleaning anything else with cleaner
+    """
+    def clean(value):
+        return None if value is None else cleaner(value)
+    return clean
+
+
+def compile_validator(fields: dict):
+    """
+    Compiles a schema of {field: (cleaner, REQUIRED or OPTIONAL)} into a validator of message payloads,
+    returning the payload with only its known fields, cleaned. A payload that is not an object is taken
+    as empty, so it fails only when some field is required.
+    """
+    specs = tuple((name, cleaner, required) for name, (cleaner, required) in fields.items())
+
+    def validate(payload) -> dict:
+        if not isinstance(payload, dict):
+            payload = {}
+        cleaned = {}
+        for name, cleaner, required in specs:
+            if name not in payload:
+                if required:
+                    raise ValueError(name)
+                continue
+            cleaned[name] = cleaner(payload[name])
+        return cleaned
+    return validate
+
+
+class MessageHandlers:
+    """
+    Table of the websocket message types a consumer handles. Every type is registered with the
+    consumer method handling it, the audience of its reply, a validator of its payload, and the
+    error sent back when the payload is invalid. Types not in the table are never dispatched.
+    """
+
+    def __init__(self):
+        self._handlers = {}
+
+    def register(self, message_type: str, audience: str, validator=None, error: str="Something went wrong"):
+        """
+        Decorator registering a consumer method as the handler of a message type
+        """
+        def decorator(method):
+            self._handlers[message_type] = Handler(
+                message_type, method.__name__, audience, validator or compile_validator({}), error
+            )
+            return method
+        return decorator
+
+    def parse(self, text: str) -> tuple:
+        """
+        Decodes a message and validates its payload, returns its handler and the cleaned payload
+        """
+        try:
+            data = loads(text)
+            handler = self._handlers[data["message_type"]]
+        except (ValueError, TypeError, KeyError):
+            raise MessageError("Something went wrong")
+        try:
+            return handler, handler.validate(data.get("message"))
+        except (ValueError, TypeError):
+            raise MessageError(handler.error)
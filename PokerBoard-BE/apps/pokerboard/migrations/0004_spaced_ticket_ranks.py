@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+RANK_GAP = 1024
+
+
+def space_ranks(apps, schema_editor):
+    """
+    Spreads existing ranks of every pokerboard RANK_GAP apart, keeping their order
+    """
+    Ticket = apps.get_model('pokerboard', 'Ticket')
+    pokerboard_ids = Ticket.objects.values_list('pokerboard_id', flat=True).distinct()
+    for pokerboard_id in pokerboard_ids:
+        ticket_ids = Ticket.objects.filter(pokerboard_id=pokerboard_id).order_by('rank', 'id').values_list('id', flat=True)
+        Ticket.objects.filter(pokerboard_id=pokerboard_id).update(rank=models.Case(
+            *[models.When(id=ticket_id, then=models.Value((idx + 1) * RANK_GAP)) for idx, ticket_id in enumerate(ticket_ids)],
+            output_field=models.BigIntegerField()
+        ))
+
+
+def compact_ranks(apps, schema_editor):
+    """
+    Renumbers ranks of every pokerboard 1..n, so they fit the old field
+    """
+    Ticket = apps.get_model('pokerboard', 'Ticket')
+    pokerboard_ids = Ticket.objects.values_list('pokerboard_id', flat=True).distinct()
+    for pokerboard_id in pokerboard_ids:
+        ticket_ids = Ticket.objects.filter(pokerboard_id=pokerboard_id).order_by('rank', 'id').values_list('id', flat=True)
+        Ticket.objects.filter(pokerboard_id=pokerboard_id).update(rank=models.Case(
+            *[models.When(id=ticket_id, then=models.Value(idx + 1)) for idx, ticket_id in enumerate(ticket_ids)],
+            output_field=models.BigIntegerField()
+        ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokerboard', '0003_gamesession_vote'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ticket',
+            name='rank',
+            field=models.BigIntegerField(help_text='Rank of ticket, tickets are ordered by it and ranks are spaced apart'),
+        ),
+        migrations.RunPython(space_ranks, compact_ranks),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 2.2 on 2026-10-19 01:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('pokerboard', '0004_spaced_ticket_ranks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Pending'), (2, 'Running'), (3, 'Done'), (4, 'Failed')], default=1)),
+                ('payload', models.TextField(help_text='Pokerboard details and tickets to import, JSON encoded')),
+                ('total', models.PositiveIntegerField(default=0, help_text='Number of tickets to import')),
+                ('processed', models.PositiveIntegerField(default=0, help_text='Number of tickets validated so far')),
+                ('errors', models.TextField(default='[]', help_text='Error messages of a failed import, JSON encoded')),
+                ('manager', models.ForeignKey(help_text='User importing', on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to=settings.AUTH_USER_MODEL)),
+                ('pokerboard', models.ForeignKey(help_text='Pokerboard created by the import', null=True, on_delete=django.db.models.deletion.SET_NULL, to='pokerboard.Pokerboard')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 2.2 on 2026-10-19 01:28
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+MANAGER = 3
+
+
+def create_memberships(apps, schema_editor):
+    """
+    Creates memberships of every pokerboard's manager and accepted invitees, keeping the highest role
+    """
+    Pokerboard = apps.get_model('pokerboard', 'Pokerboard')
+    Invite = apps.get_model('pokerboard', 'Invite')
+    Membership = apps.get_model('pokerboard', 'Membership')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+
+    roles = {}
+    user_ids = dict(User.objects.values_list('email', 'id'))
+    for pokerboard_id, email, role in Invite.objects.filter(is_accepted=True).values_list('pokerboard_id', 'invitee', 'role'):
+        if email in user_ids:
+            key = (user_ids[email], pokerboard_id)
+            roles[key] = max(role, roles.get(key, role))
+    for pokerboard_id, manager_id in Pokerboard.objects.values_list('id', 'manager_id'):
+        roles[(manager_id, pokerboard_id)] = MANAGER
+
+    Membership.objects.bulk_create([
+        Membership(user_id=user_id, pokerboard_id=pokerboard_id, role=role)
+        for (user_id, pokerboard_id), role in roles.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('pokerboard', '0005_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Membership',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('role', models.IntegerField(choices=[(1, 'Spectator'), (2, 'Contributor'), (3, 'Manager')], help_text='Highest role of the member, manager above invited roles')),
+                ('pokerboard', models.ForeignKey(help_text='Pokerboard', on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='pokerboard.Pokerboard')),
+                ('user', models.ForeignKey(help_text='Member', on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'pokerboard')},
+            },
+        ),
+        migrations.RunPython(create_memberships, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+import logging
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+logger = logging.getLogger(__name__)
+
+IN_PROGRESS = 1
+SKIPPED = 2
+
+
+def copy_pokerboards(apps, schema_editor):
+    """
+    Copies every session's pokerboard from its ticket, and skips all but the latest
+    in progress session of a pokerboard so at most one is left per pokerboard.
+    The sessions skipped this way are logged, their votes are kept.
+    """
+    GameSession = apps.get_model('pokerboard', 'GameSession')
+    Ticket = apps.get_model('pokerboard', 'Ticket')
+    GameSession.objects.update(pokerboard_id=models.Subquery(
+        Ticket.objects.filter(id=models.OuterRef('ticket_id')).values('pokerboard_id')[:1]
+    ))
+    latest = {}
+    for session_id, pokerboard_id in GameSession.objects.filter(status=IN_PROGRESS).order_by('id').values_list('id', 'pokerboard_id'):
+        latest[pokerboard_id] = session_id
+    extra = GameSession.objects.filter(status=IN_PROGRESS).exclude(id__in=latest.values())
+    skipped = list(extra.values_list('id', 'pokerboard_id'))
+    for session_id, pokerboard_id in skipped:
+        logger.warning(
+            "Skipping game session %s, pokerboard %s has a later one in progress", session_id, pokerboard_id
+        )
+    extra.update(status=SKIPPED)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokerboard', '0006_membership'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamesession',
+            name='pokerboard',
+            field=models.ForeignKey(editable=False, help_text='Pokerboard of the ticket, copied from it on save', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='game_sessions', to='pokerboard.Pokerboard'),
+        ),
+        migrations.RunPython(copy_pokerboards, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='gamesession',
+            name='pokerboard',
+            field=models.ForeignKey(editable=False, help_text='Pokerboard of the ticket, copied from it on save', on_delete=django.db.models.deletion.CASCADE, related_name='game_sessions', to='pokerboard.Pokerboard'),
+        ),
+        migrations.AddConstraint(
+            model_name='gamesession',
+            constraint=models.UniqueConstraint(condition=models.Q(status=1), fields=('pokerboard',), name='one_active_session_per_pokerboard'),
+        ),
+    ]
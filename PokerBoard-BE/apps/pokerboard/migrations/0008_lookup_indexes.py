@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pokerboard', '0007_gamesession_pokerboard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invite',
+            index=models.Index(fields=['pokerboard', 'invitee'], name='invite_pokerboard_invitee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invite',
+            index=models.Index(condition=models.Q(is_accepted=True), fields=['pokerboard'], name='invite_accepted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['pokerboard', 'rank'], name='ticket_pokerboard_rank_idx'),
+        ),
+    ]
@@ -46,7 +46,12 @@ class Ticket(user_models.CustomBase):
     pokerboard = models.ForeignKey(Pokerboard, related_name="tickets", on_delete=models.CASCADE, help_text="Pokerboard to which ticket belongs")
     ticket_id = models.SlugField(help_text="Ticket ID imported from JIRA")
     estimate = models.IntegerField(null=True, help_text="Final estimate of ticket")
-    rank = models.PositiveSmallIntegerField(help_text="Rank of ticket")
+    rank = models.BigIntegerField(help_text="Rank of ticket, tickets are ordered by it and ranks are spaced apart")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["pokerboard", "rank"], name="ticket_pokerboard_rank_idx"),
+        ]
 
     def __str__(self) -> str:
         return f'{self.ticket_id} - {self.pokerboard}'
@@ -65,9 +70,29 @@ class GameSession(user_models.CustomBase):
         (ESTIMATED, "Estimated"),
     )
     ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name="estimations")
+    pokerboard = models.ForeignKey(
+        Pokerboard, on_delete=models.CASCADE, related_name="game_sessions", editable=False,
+        help_text="Pokerboard of the ticket, copied from it on save"
+    )
     status = models.PositiveIntegerField(default=IN_PROGRESS, choices=STATUS_CHOICES)
     timer_started_at = models.DateTimeField(null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                # status IN_PROGRESS
+                fields=["pokerboard"], condition=models.Q(status=1), name="one_active_session_per_pokerboard"
+            ),
+        ]
+
+    def save(self, *args, **kwargs) -> None:
+        # copied from a loaded ticket, the ticket is fetched only for a session saved the first time without it
+        if GameSession.ticket.is_cached(self):
+            self.pokerboard_id = self.ticket.pokerboard_id
+        elif self.pokerboard_id is None:
+            self.pokerboard_id = Ticket.objects.values_list("pokerboard_id", flat=True).get(id=self.ticket_id)
+        super().save(*args, **kwargs)
+
     def __str__(self) -> str:
         return f"{self.ticket.ticket_id} {self.status}"
 
@@ -121,6 +146,61 @@ class Invite(user_models.CustomBase):
     role = models.IntegerField(choices=ROLE, help_text="Role", default=CONTRIBUTOR)
     is_accepted = models.BooleanField(default=False, help_text="Boolean indicates if invitation accepted or not")
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["pokerboard", "invitee"], name="invite_pokerboard_invitee_idx"),
+            models.Index(fields=["pokerboard"], condition=models.Q(is_accepted=True), name="invite_accepted_idx"),
+        ]
+
     def __str__(self):
         return f'Invitee: {self.invitee} - Pokerboard: {self.pokerboard} - Group: {self.group}'
 
+
+class Membership(user_models.CustomBase):
+    """
+    Membership model => one row per user and pokerboard the user can access, with the user's role.
+    Derived from the pokerboard's manager and accepted invites, and kept in sync with them.
+    """
+    SPECTATOR = Invite.SPECTATOR
+    CONTRIBUTOR = Invite.CONTRIBUTOR
+    MANAGER = 3
+    ROLE = Invite.ROLE + (
+        (MANAGER, "Manager"),
+    )
+    user = models.ForeignKey(get_user_model(), related_name="memberships", on_delete=models.CASCADE, help_text="Member")
+    pokerboard = models.ForeignKey(
+        Pokerboard, related_name="memberships", on_delete=models.CASCADE, help_text="Pokerboard"
+    )
+    role = models.IntegerField(choices=ROLE, help_text="Highest role of the member, manager above invited roles")
+
+    class Meta:
+        unique_together = ('user', 'pokerboard')
+
+    def __str__(self) -> str:
+        return f"{self.user} - {self.pokerboard} - {self.get_role_display()}"
+
+
+class ImportJob(user_models.CustomBase):
+    """
+    ImportJob model for pokerboards created in the background from a (large) list of jira tickets
+    """
+    PENDING = 1
+    RUNNING = 2
+    DONE = 3
+    FAILED = 4
+    STATUS_CHOICES = (
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    )
+    manager = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name="import_jobs", help_text="User importing")
+    pokerboard = models.ForeignKey(Pokerboard, null=True, on_delete=models.SET_NULL, help_text="Pokerboard created by the import")
+    status = models.PositiveSmallIntegerField(choices=STATUS_CHOICES, default=PENDING)
+    payload = models.TextField(help_text="Pokerboard details and tickets to import, JSON encoded")
+    total = models.PositiveIntegerField(default=0, help_text="Number of tickets to import")
+    processed = models.PositiveIntegerField(default=0, help_text="Number of tickets validated so far")
+    errors = models.TextField(default="[]", help_text="Error messages of a failed import, JSON encoded")
+
+    def __str__(self) -> str:
+        return f"{self.manager} {self.get_status_display()} {self.processed}/{self.total}"
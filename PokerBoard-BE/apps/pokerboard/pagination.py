@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PokerboardCursorPagination(CursorPagination):
+    """
+    Cursor pagination of pokerboards, newest first.
+    Pages are stable while pokerboards are being created, and never need a COUNT query.
+    """
+    ordering = "-id"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
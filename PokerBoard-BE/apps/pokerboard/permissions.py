@@ -7,4 +7,4 @@ class IsManagerPermission(permissions.BasePermission):
     """
 
     def has_object_permission(self, request, view, pokerboard):
-        return request.user == pokerboard.manager
+        return request.user.id == pokerboard.manager_id
@@ -0,0 +1,76 @@
+import json
+import time
+
+from django.conf import settings
+
+from apps.pokerboard import store as pokerboard_store
+
+
+class PresenceRegistry:
+    """
+    Tracks users connected to a game session in the shared session store.
+    Connections are kept by channel name in a sorted set scored by their expiry time, so
+    connections whose worker died fall out of the session once their heartbeats stop. Live
+    connections are counted per user, so a user with several tabs open stays present until the
+    last one closes, and joining or leaving never has to look at the session's other users.
+    """
+
+    def __init__(self, session_id: int, store=None, ttl: int=None):
+        self.store = store or pokerboard_store.get_store()
+        self.ttl = ttl or settings.PRESENCE_TTL
+        self.members_key = f"presence:{session_id}:members"
+        self.users_key = f"presence:{session_id}:users"
+        self.connections_key = f"presence:{session_id}:connections"
+
+    def join(self, channel_name: str, user_data: dict) -> bool:
+        """
+        Adds or refreshes a connection, returns True if its user was not present before
+        """
+        added = self.store.zadd(self.members_key, {channel_name: time.time() + self.ttl})
+        self.store.hset(self.users_key, channel_name, json.dumps(user_data))
+        connections = self.store.hincrby(self.connections_key, user_data["id"], 1) if added else None
+        for key in (self.members_key, self.users_key, self.connections_key):
+            self.store.expire(key, self.ttl)
+        return connections == 1
+
+    def heartbeat(self, channel_name: str, user_data: dict) -> bool:
+        """
+        Extends a connection's presence, returns True if its user had already expired
+        """
+        return self.join(channel_name, user_data)
+
+    def leave(self, channel_name: str, user_id: int) -> bool:
+        """
+        Removes a connection, returns True if its user has no other connection left
+        """
+        removed = self.store.zrem(self.members_key, channel_name)
+        self.store.hdel(self.users_key, channel_name)
+        return bool(removed) and self._disconnected(user_id)
+
+    def _disconnected(self, user_id: int) -> bool:
+        """
+        Counts one connection of a user less, returns True if it was the user's last
+        """
+        if self.store.hincrby(self.connections_key, user_id, -1) > 0:
+            return False
+        self.store.hdel(self.connections_key, user_id)
+        return True
+
+    def members(self) -> list:
+        """
+        Returns serialized users currently present in the session, once each
+        """
+        now = time.time()
+        expired = self.store.zrangebyscore(self.members_key, "-inf", now)
+        if expired:
+            users = self.store.hmget(self.users_key, expired)
+            for channel_name, user in zip(expired, users):
+                # only the one pruning a connection counts it out, when several prune at once
+                if self.store.zrem(self.members_key, channel_name) and user:
+                    self._disconnected(json.loads(user)["id"])
+            self.store.hdel(self.users_key, *expired)
+        channel_names = self.store.zrangebyscore(self.members_key, now, "+inf")
+        if not channel_names:
+            return []
+        users = (json.loads(user) for user in self.store.hmget(self.users_key, channel_names) if user)
+        return list({user["id"]: user for user in users}.values())
@@ -0,0 +1,142 @@
+from django.db import models, transaction
+
+from rest_framework.serializers import ValidationError
+
+from apps.pokerboard import (
+    constants as pokerboard_constants,
+    models as pokerboard_models
+)
+
+
+def initial_ranks(count: int) -> list:
+    """
+    Ranks for a new list of tickets, TICKET_RANK_GAP apart so later moves fit in between
+    """
+    return [(idx + 1) * pokerboard_constants.TICKET_RANK_GAP for idx in range(count)]
+
+
+def _lock_pokerboard(pokerboard_id: int) -> None:
+    """
+    Serializes rank changes of a pokerboard until the end of the transaction
+    """
+    list(pokerboard_models.Pokerboard.objects.select_for_update().filter(pk=pokerboard_id).values_list("id"))
+
+
+def _set_ranks(pokerboard_id: int, ranks: dict) -> None:
+    """
+    Sets ranks of tickets (by id) in a single UPDATE
+    """
+    if not ranks:
+        return
+    pokerboard_models.Ticket.objects.filter(pokerboard_id=pokerboard_id, id__in=ranks).update(rank=models.Case(
+        *[models.When(id=ticket_id, then=models.Value(rank)) for ticket_id, rank in ranks.items()],
+        output_field=models.BigIntegerField()
+    ))
+
+
+def _rank_between(lower: int, upper: int) -> int:
+    """
+    Rank between two neighbours (None meaning the start/end of the list), None if there is no room left
+    """
+    if lower is None and upper is None:
+        return pokerboard_constants.TICKET_RANK_GAP
+    if lower is None:
+        return upper - pokerboard_constants.TICKET_RANK_GAP
+    if upper is None:
+        return lower + pokerboard_constants.TICKET_RANK_GAP
+    if upper - lower < 2:
+        return None
+    return (lower + upper) // 2
+
+
+def needs_rebalance(rank: int) -> bool:
+    """
+    Checks if a rank drifted close to the largest rank the frontend can order exactly
+    """
+    return abs(rank) > pokerboard_constants.TICKET_RANK_LIMIT
+
+
+def rebalance(pokerboard_id: int) -> None:
+    """
+    Spreads ranks of a pokerboard's tickets TICKET_RANK_GAP apart again, keeping their order
+    """
+    with transaction.atomic():
+        _lock_pokerboard(pokerboard_id)
+        ticket_ids = list(pokerboard_models.Ticket.objects.filter(
+            pokerboard_id=pokerboard_id
+        ).order_by("rank", "id").values_list("id", flat=True))
+        _set_ranks(pokerboard_id, dict(zip(ticket_ids, initial_ranks(len(ticket_ids)))))
+
+
+def reorder(pokerboard_id: int, ticket_ids: list) -> None:
+    """
+    Puts tickets in the given order, reusing the ranks they hold between them,
+    so tickets left out of the list keep their places. One SELECT and one UPDATE.
+    """
+    if len(set(ticket_ids)) != len(ticket_ids):
+        raise ValidationError("A ticket can appear only once in the ordering")
+    with transaction.atomic():
+        _lock_pokerboard(pokerboard_id)
+        tickets = {
+            ticket_id: (pk, rank) for pk, ticket_id, rank in pokerboard_models.Ticket.objects.filter(
+                pokerboard_id=pokerboard_id, ticket_id__in=ticket_ids
+            ).values_list("id", "ticket_id", "rank")
+        }
+        missing = [ticket_id for ticket_id in ticket_ids if ticket_id not in tickets]
+        if missing:
+            raise ValidationError(f"Tickets not on this pokerboard: {', '.join(missing)}")
+
+        ranks = sorted(rank for pk, rank in tickets.values())
+        _set_ranks(pokerboard_id, {
+            tickets[ticket_id][0]: rank for ticket_id, rank in zip(ticket_ids, ranks) if tickets[ticket_id][1] != rank
+        })
+
+
+def move_after(pokerboard_id: int, ticket_id: str, after: str=None) -> pokerboard_models.Ticket:
+    """
+    Moves a ticket right after another one (to the top if after is None), updating only the moved ticket
+    """
+    if ticket_id == after:
+        raise ValidationError("A ticket can not be moved after itself")
+    with transaction.atomic():
+        _lock_pokerboard(pokerboard_id)
+        tickets = {
+            ticket.ticket_id: ticket for ticket in pokerboard_models.Ticket.objects.filter(
+                pokerboard_id=pokerboard_id, ticket_id__in=[ticket_id, after]
+            )
+        }
+        missing = [key for key in (ticket_id, after) if key is not None and key not in tickets]
+        if missing:
+            raise ValidationError(f"Tickets not on this pokerboard: {', '.join(missing)}")
+
+        ticket = tickets[ticket_id]
+        lower = tickets[after].rank if after is not None else None
+        following = pokerboard_models.Ticket.objects.filter(pokerboard_id=pokerboard_id).exclude(id=ticket.id)
+        if lower is not None:
+            following = following.filter(rank__gt=lower)
+        upper = following.order_by("rank").values_list("rank", flat=True).first()
+
+        rank = _rank_between(lower, upper)
+        if rank is None or needs_rebalance(rank):
+            rebalance(pokerboard_id)
+            return move_after(pokerboard_id, ticket_id, after)
+        pokerboard_models.Ticket.objects.filter(id=ticket.id).update(rank=rank)
+        ticket.rank = rank
+        return ticket
+
+
+def move_to_end(ticket: pokerboard_models.Ticket) -> None:
+    """
+    Moves a ticket after every other ticket of its pokerboard, a single-row UPDATE.
+    Ranks only grow this way, so the pokerboard is rebalanced in the background once they get large.
+    """
+    last_rank = pokerboard_models.Ticket.objects.filter(
+        pokerboard_id=ticket.pokerboard_id
+    ).order_by("-rank").values("rank")[:1]
+    pokerboard_models.Ticket.objects.filter(id=ticket.id).update(
+        rank=models.Subquery(last_rank) + pokerboard_constants.TICKET_RANK_GAP
+    )
+    ticket.refresh_from_db(fields=["rank"])
+    if needs_rebalance(ticket.rank):
+        from apps.pokerboard.tasks import rebalance_ticket_ranks_task
+        rebalance_ticket_ranks_task.delay(ticket.pokerboard_id)
@@ -1,13 +1,18 @@
+import base64
 import json
 from typing import Any
 from typing_extensions import OrderedDict
 
+from django.db import IntegrityError, transaction
+
 from rest_framework import serializers
 
 from apps.group import models as group_models
 from apps.pokerboard import (
     constants as pokerboard_constants,
+    invites as pokerboard_invites,
     models as pokerboard_models,
+    ranking as pokerboard_ranking,
     utils as pokerboard_utils
 )
 from apps.user import serializers as user_serializers
@@ -35,6 +40,20 @@ class PokerboardSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "description", "estimation_type", "duration", "manager", "status", "tickets", "created_at"]
 
 
+class PokerboardSummarySerializer(serializers.ModelSerializer):
+    """
+    Pokerboard serializer for listing pokerboards, with the number of tickets instead of the tickets
+    """
+    manager = user_serializers.UserSerializer(read_only=True)
+    ticket_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = pokerboard_models.Pokerboard
+        fields = [
+            "id", "title", "description", "estimation_type", "duration", "manager", "status", "ticket_count", "created_at"
+        ]
+
+
 class CreatePokerboardSerializer(PokerboardSerializer):
     """
     Create Pokerboard serializer which requires a list of tickets and
@@ -54,14 +73,9 @@ class CreatePokerboardSerializer(PokerboardSerializer):
         Validates list of tickets by calling an API
         """
         attrs = super().validate(attrs)
-        tickets = attrs["tickets"]
-        # removing [] from ["KD-1", "KD-2"]. ["KD-1", "KD-2"] -> "KD-1", "KD-2"
-        ticket_ids = json.dumps(tickets)[1:-1]
-        jql = f"issue IN ({ticket_ids})"
-        url = f"{pokerboard_constants.JIRA_API_URL_V2}search?jql={jql}"
-
-        # validate ticket Id's
-        pokerboard_utils.JiraApi.query_jira("GET", url)
+        errors = pokerboard_utils.invalid_ticket_errors(pokerboard_utils.validate_tickets(attrs["tickets"]))
+        if errors:
+            raise serializers.ValidationError(errors)
         attrs["manager"] = self.context.get("request").user
         return attrs
 
@@ -71,12 +85,93 @@ class CreatePokerboardSerializer(PokerboardSerializer):
         """
         tickets = validated_data.pop("tickets")
         pokerboard = super().create(validated_data)
-        pokerboard_models.Ticket.objects.bulk_create(
-            [pokerboard_models.Ticket(pokerboard=pokerboard, ticket_id=ticket, rank=idx+1) for idx, ticket in enumerate(tickets)]
-        )
+        pokerboard_models.Ticket.objects.bulk_create([
+            pokerboard_models.Ticket(pokerboard=pokerboard, ticket_id=ticket, rank=rank)
+            for ticket, rank in zip(tickets, pokerboard_ranking.initial_ranks(len(tickets)))
+        ])
         return pokerboard
 
 
+class JqlQuerySerializer(serializers.Serializer):
+    """
+    JQL search query, with optional field projection, pagination cursor and streaming
+    """
+    jql = serializers.CharField()
+    fields = serializers.CharField(required=False)
+    cursor = serializers.CharField(required=False)
+    page_size = serializers.IntegerField(min_value=1, max_value=pokerboard_constants.JQL_MAX_PAGE_SIZE, required=False)
+    stream = serializers.BooleanField(default=False)
+
+    @staticmethod
+    def encode_cursor(start_at: int) -> str:
+        """
+        Opaque cursor of a search page
+        """
+        return base64.urlsafe_b64encode(json.dumps({"start_at": start_at}).encode()).decode()
+
+    def validate_fields(self: serializers.Serializer, fields: str) -> list:
+        """
+        Splits comma separated field names
+        """
+        return [field.strip() for field in fields.split(",") if field.strip()]
+
+    def validate_cursor(self: serializers.Serializer, cursor: str) -> int:
+        """
+        Decodes a cursor to the index of the first issue of its page
+        """
+        try:
+            start_at = json.loads(base64.urlsafe_b64decode(cursor.encode()))["start_at"]
+        except (ValueError, TypeError, KeyError):
+            raise serializers.ValidationError("Invalid cursor")
+        if not isinstance(start_at, int) or start_at < 0:
+            raise serializers.ValidationError("Invalid cursor")
+        return start_at
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """
+    Import job serializer for displaying progress of an import
+    """
+
+    class Meta:
+        model = pokerboard_models.ImportJob
+        fields = ["id", "status", "total", "processed", "errors", "pokerboard"]
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        rep = super().to_representation(instance)
+        rep["errors"] = json.loads(instance.errors)
+        return rep
+
+
+class ImportPokerboardSerializer(PokerboardSerializer):
+    """
+    Import pokerboard serializer which validates pokerboard details and queues an import job,
+    the job validates tickets against jira and creates the pokerboard
+    """
+    tickets = serializers.ListField(child=serializers.SlugField(), write_only=True)
+
+    class Meta(PokerboardSerializer.Meta):
+        extra_kwargs = {
+            "status": {
+                "read_only": True
+            },
+        }
+
+    def create(self: serializers.ModelSerializer, validated_data: OrderedDict) -> pokerboard_models.ImportJob:
+        """
+        Creates the import job
+        """
+        return pokerboard_models.ImportJob.objects.create(
+            manager=self.context.get("request").user,
+            payload=json.dumps(validated_data),
+            total=len(validated_data["tickets"]),
+        )
+
+    def to_representation(self: serializers.ModelSerializer, instance: pokerboard_models.ImportJob) -> OrderedDict:
+        return ImportJobSerializer(instance).data
+
+
 class CommentSerializer(serializers.Serializer):
     """
     Comment serializer with comment and the issue to comment on
@@ -85,6 +180,13 @@ class CommentSerializer(serializers.Serializer):
     issue = serializers.SlugField()
 
 
+class CommentQuerySerializer(serializers.Serializer):
+    """
+    Comment listing query, with the issue to list comments of
+    """
+    issueId = serializers.SlugField()
+
+
 class TicketOrderSerializer(serializers.ListSerializer):
     """
     Ticket order serializer for ordering tickets
@@ -92,22 +194,32 @@ class TicketOrderSerializer(serializers.ListSerializer):
     child = TicketSerializer()
     def create(self: serializers.ListSerializer, validated_data: list) -> list:
         """
-        Order tickets according to ticket_id's
+        Order tickets by the ranks sent
         """
-        pokerboard = self.context.get('pk')
-        validated_data.sort(key=lambda x: x["ticket_id"])
-        ticket_ids = list(map(lambda x: x["ticket_id"], validated_data))
-        tickets = pokerboard_models.Ticket.objects.filter(
-            ticket_id__in=ticket_ids, 
-            pokerboard=pokerboard
-        ).order_by("ticket_id").all()
-        for ticket, updated_ticket in zip(tickets, validated_data):
-            ticket.rank = updated_ticket.get('rank')
-        pokerboard_models.Ticket.objects.bulk_update(tickets, ['rank'])
-
+        ordered = sorted(validated_data, key=lambda x: x["rank"])
+        pokerboard_ranking.reorder(self.context.get('pk'), [ticket["ticket_id"] for ticket in ordered])
         return validated_data
 
 
+class TicketMoveSerializer(serializers.Serializer):
+    """
+    Ticket move serializer for moving one ticket right after another (to the top if after is null)
+    """
+    ticket_id = serializers.SlugField()
+    after = serializers.SlugField(allow_null=True, default=None)
+
+    def create(self: serializers.Serializer, validated_data: OrderedDict) -> pokerboard_models.Ticket:
+        """
+        Moves the ticket
+        """
+        return pokerboard_ranking.move_after(
+            self.context.get('pk'), validated_data["ticket_id"], validated_data["after"]
+        )
+
+    def to_representation(self: serializers.Serializer, instance: pokerboard_models.Ticket) -> OrderedDict:
+        return TicketSerializer(instance=instance).data
+
+
 class VoteSerializer(serializers.ModelSerializer):
     """
     Vote serializer for creating/listing votes
@@ -140,7 +252,9 @@ class GameSessionSerializer(serializers.ModelSerializer):
     """
     Gamesession serializer
     """
-    ticket = serializers.PrimaryKeyRelatedField(queryset=pokerboard_models.Ticket.objects.only())
+    ACTIVE_SESSION_ERROR = "An active game session already exists for this pokerboard"
+
+    ticket = serializers.PrimaryKeyRelatedField(queryset=pokerboard_models.Ticket.objects.only("pokerboard_id"))
 
     class Meta:
         model = pokerboard_models.GameSession
@@ -161,20 +275,22 @@ class GameSessionSerializer(serializers.ModelSerializer):
         Checks if a gamesession already in progress for a pokerboard
         """
         active_sessions = pokerboard_models.GameSession.objects.filter(
-            ticket__pokerboard=attrs.pokerboard,
+            pokerboard_id=attrs.pokerboard_id,
             status=pokerboard_models.GameSession.IN_PROGRESS
         ).exists()
         if active_sessions:
-            raise serializers.ValidationError("An active game session already exists for this pokerboard")
+            raise serializers.ValidationError(self.ACTIVE_SESSION_ERROR)
         return attrs
 
-
-class MessageSerializer(serializers.Serializer):
-    """
-    Message serializer for validating a message
-    """
-    message_type = serializers.ChoiceField(choices=pokerboard_constants.MESSAGE_TYPES)
-    message = serializers.OrderedDict()
+    def create(self: serializers.ModelSerializer, validated_data: OrderedDict) -> pokerboard_models.GameSession:
+        """
+        Creates the session, the database rejects a second active session started concurrently
+        """
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError({"ticket": [self.ACTIVE_SESSION_ERROR]})
 
 
 class PokerboardMemberSerializer(serializers.ModelSerializer):
@@ -230,13 +346,5 @@ class InviteUserSerializer(PokerboardMemberSerializer):
             invitee = validated_data['invitee']
             pokerboard_models.Invite.objects.create(pokerboard=pokerboard, invitee=invitee, role=role)
         else:
-            group = validated_data['group']
-            group_name = validated_data['group_name']
-            members = group_models.GroupMember.objects.filter(group=group)
-            pokerboard_models.Invite.objects.bulk_create([
-                pokerboard_models.Invite(
-                    invitee=member.user.email, pokerboard=pokerboard,
-                    group=group, group_name=group_name, role=role
-                ) for member in members
-            ])
+            pokerboard_invites.invite_group(pokerboard, validated_data['group'], validated_data['group_name'], role)
         return validated_data
@@ -1,6 +1,6 @@
-from apps.user.tasks import send_email_task
-from apps.pokerboard.tasks import send_email_task
-from apps.pokerboard import serializers as pokerboard_serializers
+from apps.pokerboard.tasks import send_invite_emails_task
+from poker import mail
+
 
 def send_email_handler(**kwargs):
     """
@@ -8,6 +8,5 @@ def send_email_handler(**kwargs):
     """
     instance = kwargs.get('instance')
     created = kwargs.get('created')
-    if created:
-        send_email_task.delay(instance.id, instance.invitee, 
-            pokerboard_serializers.PokerboardSerializer(instance=instance.pokerboard).data, instance.get_role_display())
+    if created and instance.invitee:
+        mail.enqueue(send_invite_emails_task, instance.id)
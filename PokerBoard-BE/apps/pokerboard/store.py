@@ -0,0 +1,185 @@
+import threading
+import time
+
+from django.conf import settings
+
+
+class LocalPipeline:
+    """
+    Queues commands of a LocalStore and runs them under its lock, like a redis MULTI/EXEC transaction
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._commands = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self._commands.append((getattr(self._store, name), args, kwargs))
+            return self
+        return queue
+
+    def execute(self) -> list:
+        with self._store._lock:
+            commands, self._commands = self._commands, []
+            return [command(*args, **kwargs) for command, args, kwargs in commands]
+
+
+class LocalStore:
+    """
+    In-process stand-in for the subset of the redis client API used for live session state.
+    Used when no SESSION_STORE_URL is configured (development and tests).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._data = {}
+        self._expiry = {}
+
+    def _get(self, name: str, factory: type=None):
+        """
+        Get value stored at name, dropping it first if its ttl has passed
+        """
+        expire_at = self._expiry.get(name)
+        if expire_at is not None and expire_at <= time.time():
+            self._data.pop(name, None)
+            self._expiry.pop(name, None)
+        if factory is not None and name not in self._data:
+            self._data[name] = factory()
+        return self._data.get(name)
+
+    def expire(self, name: str, seconds: int) -> bool:
+        with self._lock:
+            if self._get(name) is None:
+                return False
+            self._expiry[name] = time.time() + seconds
+            return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            deleted = 0
+            for name in names:
+                if self._get(name) is not None:
+                    deleted += 1
+                self._data.pop(name, None)
+                self._expiry.pop(name, None)
+            return deleted
+
+    def pipeline(self) -> LocalPipeline:
+        return LocalPipeline(self)
+
+    def flushall(self) -> bool:
+        with self._lock:
+            self._data.clear()
+            self._expiry.clear()
+            return True
+
+    def get(self, name: str):
+        with self._lock:
+            value = self._get(name)
+            return None if value is None else str(value)
+
+    def incr(self, name: str, amount: int=1) -> int:
+        with self._lock:
+            value = int(self._get(name) or 0) + amount
+            self._data[name] = value
+            return value
+
+    def rpush(self, name: str, *values) -> int:
+        with self._lock:
+            list_ = self._get(name, list)
+            list_.extend(values)
+            return len(list_)
+
+    def lrange(self, name: str, start: int, end: int) -> list:
+        with self._lock:
+            list_ = self._get(name) or []
+            return list_[start:None if end == -1 else end + 1]
+
+    def ltrim(self, name: str, start: int, end: int) -> bool:
+        with self._lock:
+            list_ = self._get(name, list)
+            list_[:] = self.lrange(name, start, end)
+            return True
+
+    def zadd(self, name: str, mapping: dict) -> int:
+        with self._lock:
+            zset = self._get(name, dict)
+            added = len([member for member in mapping if str(member) not in zset])
+            zset.update({str(member): float(score) for member, score in mapping.items()})
+            return added
+
+    def zrem(self, name: str, *members) -> int:
+        with self._lock:
+            zset = self._get(name, dict)
+            return len([member for member in members if zset.pop(str(member), None) is not None])
+
+    def zscore(self, name: str, member):
+        with self._lock:
+            return (self._get(name) or {}).get(str(member))
+
+    def zrangebyscore(self, name: str, min: float, max: float) -> list:
+        with self._lock:
+            zset = self._get(name) or {}
+            members = [(score, member) for member, score in zset.items() if float(min) <= score <= float(max)]
+            return [member for score, member in sorted(members)]
+
+    def zremrangebyscore(self, name: str, min: float, max: float) -> int:
+        with self._lock:
+            members = self.zrangebyscore(name, min, max)
+            return self.zrem(name, *members) if members else 0
+
+    def hset(self, name: str, key, value) -> int:
+        with self._lock:
+            hash_ = self._get(name, dict)
+            created = str(key) not in hash_
+            hash_[str(key)] = value
+            return int(created)
+
+    def hsetnx(self, name: str, key, value) -> int:
+        with self._lock:
+            hash_ = self._get(name, dict)
+            if str(key) in hash_:
+                return 0
+            hash_[str(key)] = value
+            return 1
+
+    def hgetall(self, name: str) -> dict:
+        with self._lock:
+            return dict(self._get(name) or {})
+
+    def hincrby(self, name: str, key, amount: int=1) -> int:
+        with self._lock:
+            hash_ = self._get(name, dict)
+            hash_[str(key)] = int(hash_.get(str(key), 0)) + amount
+            return hash_[str(key)]
+
+    def hmget(self, name: str, keys: list) -> list:
+        with self._lock:
+            hash_ = self._get(name) or {}
+            return [hash_.get(str(key)) for key in keys]
+
+    def hdel(self, name: str, *keys) -> int:
+        with self._lock:
+            hash_ = self._get(name, dict)
+            return len([key for key in keys if hash_.pop(str(key), None) is not None])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Returns the process wide session store client.
+    A redis client when SESSION_STORE_URL is set, so that every worker shares state, else a LocalStore.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            if settings.SESSION_STORE_URL:
+                import redis
+                _store = redis.Redis.from_url(settings.SESSION_STORE_URL, decode_responses=True)
+            else:
+                _store = LocalStore()
+    return _store
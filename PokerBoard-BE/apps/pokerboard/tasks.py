@@ -1,20 +1,51 @@
 from django.conf import settings
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
 
+from poker import mail
 from poker.celery import app
 
 
-@app.task
-def send_email_task(invite_id, email, pokerboard, role):
+def invite_email(invite) -> mail.EmailMultiAlternatives:
     """
-    Celery task for sending invitation email
+    Invitation email to a pokerboard
     """
-    template = render_to_string("pokerboard/email_template.html", {
-        "invite_id": invite_id,
+    pokerboard = {"id": invite.pokerboard_id, "title": invite.pokerboard.title}
+    template = mail.render("pokerboard/email_template.html", {
+        "invite_id": invite.id,
         "pokerboard": pokerboard,
-        "role": role,
+        "role": invite.get_role_display(),
         "domain": settings.BASE_URL_FE,
     })
-    subject = render_to_string("pokerboard/email_subject_template.html", {"pokerboard": pokerboard})
-    send_mail(subject=subject, message="", html_message=template, from_email=settings.EMAIL_HOST_USER, recipient_list=[email])
+    subject = mail.render("pokerboard/email_subject_template.html", {"pokerboard": pokerboard})
+    return mail.build(invite.invitee, subject, html=template)
+
+
+@app.task(bind=True, **mail.retry_options())
+def send_invite_emails_task(self, invite_ids):
+    """
+    Celery task for sending invitation emails of many invites, in batches over one connection each.
+    Takes only invite ids, fetching just the fields the email needs.
+    """
+    from apps.pokerboard.models import Invite
+    invites = Invite.objects.filter(id__in=invite_ids, invitee__isnull=False).select_related("pokerboard").only(
+        "id", "invitee", "role", "pokerboard__title"
+    )
+    result = mail.send_batch({f"invite:{invite.id}": invite_email(invite) for invite in invites})
+    return {**result, "message_size": mail.message_size(self)}
+
+
+@app.task
+def rebalance_ticket_ranks_task(pokerboard_id):
+    """
+    Celery task for spreading ticket ranks of a pokerboard apart again
+    """
+    from apps.pokerboard.ranking import rebalance
+    rebalance(pokerboard_id)
+
+
+@app.task
+def import_pokerboard_task(job_id):
+    """
+    Celery task for running a pokerboard import job
+    """
+    from apps.pokerboard.imports import run_import
+    run_import(job_id)
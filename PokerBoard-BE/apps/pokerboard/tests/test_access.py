@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from ddf import G
+from rest_framework.test import APITestCase
+
+from apps.pokerboard import (
+    access as pokerboard_access,
+    models as pokerboard_models
+)
+
+
+class PokerboardAccessTestCases(APITestCase):
+    """
+    Test pokerboard access cache
+    """
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup a pokerboard with its manager and another user
+        """
+        cache.clear()
+        self.manager = G(get_user_model())
+        self.user = G(get_user_model())
+        self.pokerboard = G(pokerboard_models.Pokerboard, manager=self.manager)
+
+    def test_manager_has_access(self: APITestCase) -> None:
+        """
+        Test manager can access, second check is a hit without queries
+        """
+        self.assertTrue(pokerboard_access.has_access(self.manager, self.pokerboard.id))
+        hits = pokerboard_access.stats["hits"]
+        with self.assertNumQueries(0):
+            self.assertTrue(pokerboard_access.has_access(self.manager, self.pokerboard.id))
+        self.assertEqual(pokerboard_access.stats["hits"], hits + 1)
+
+    def test_miss_loads_all_pokerboards_of_user(self: APITestCase) -> None:
+        """
+        Test one miss fills access of every pokerboard of the user
+        """
+        other_pokerboard = G(pokerboard_models.Pokerboard, manager=self.manager)
+        pokerboard_access.has_access(self.manager, self.pokerboard.id)
+        with self.assertNumQueries(0):
+            self.assertTrue(pokerboard_access.has_access(self.manager, other_pokerboard.id))
+
+    def test_accepting_invite_invalidates(self: APITestCase) -> None:
+        """
+        Test cached denial is dropped once the invite is accepted
+        """
+        invite = G(pokerboard_models.Invite, invitee=self.user.email, pokerboard=self.pokerboard, is_accepted=False)
+        self.assertFalse(pokerboard_access.has_access(self.user, self.pokerboard.id))
+        invite.is_accepted = True
+        invite.save()
+        self.assertTrue(pokerboard_access.has_access(self.user, self.pokerboard.id))
+
+    def test_removing_member_invalidates(self: APITestCase) -> None:
+        """
+        Test cached access is dropped once the member is removed
+        """
+        invite = G(pokerboard_models.Invite, invitee=self.user.email, pokerboard=self.pokerboard, is_accepted=True)
+        self.assertTrue(pokerboard_access.has_access(self.user, self.pokerboard.id))
+        invite.delete()
+        self.assertFalse(pokerboard_access.has_access(self.user, self.pokerboard.id))
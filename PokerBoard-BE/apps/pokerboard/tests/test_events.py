@@ -0,0 +1,50 @@
+from rest_framework.test import APITestCase
+
+from apps.pokerboard import (
+    events as pokerboard_events,
+    store as pokerboard_store
+)
+
+
+class EventLogTestCases(APITestCase):
+    """
+    Test session event log
+    """
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup a log of three events on a fresh local store
+        """
+        self.store = pokerboard_store.LocalStore()
+        self.log = pokerboard_events.EventLog(1, store=self.store, size=3, ttl=30)
+
+    def test_append_numbers_events(self: APITestCase) -> None:
+        """
+        Test events are numbered in order, per session
+        """
+        self.assertEqual(self.log.latest(), 0)
+        self.assertDictEqual(self.log.append({"type": "join"}), {"type": "join", "seq": 1})
+        self.assertDictEqual(self.log.append({"type": "vote"}), {"type": "vote", "seq": 2})
+        other = pokerboard_events.EventLog(2, store=self.store, size=3, ttl=30)
+        self.assertDictEqual(other.append({"type": "join"}), {"type": "join", "seq": 1})
+        self.assertEqual(self.log.latest(), 2)
+
+    def test_since(self: APITestCase) -> None:
+        """
+        Test events after a number are returned while the buffer holds them all
+        """
+        for idx in range(3):
+            self.log.append({"type": "vote", "estimate": idx})
+        self.assertListEqual([event["seq"] for event in self.log.since(0)], [1, 2, 3])
+        self.assertListEqual([event["seq"] for event in self.log.since(2)], [3])
+        self.assertListEqual(self.log.since(3), [])
+
+    def test_since_rolled_over(self: APITestCase) -> None:
+        """
+        Test a snapshot is needed once events after the number are dropped, or for a number never given
+        """
+        for idx in range(5):
+            self.log.append({"type": "vote", "estimate": idx})
+        self.assertIsNone(self.log.since(1))
+        self.assertListEqual([event["seq"] for event in self.log.since(2)], [3, 4, 5])
+        self.assertIsNone(self.log.since(6))
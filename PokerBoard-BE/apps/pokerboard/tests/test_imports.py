@@ -0,0 +1,179 @@
+import json
+import pytest
+from unittest.mock import Mock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+
+from channels import DEFAULT_CHANNEL_LAYER
+from channels.db import database_sync_to_async
+from channels.layers import channel_layers
+from channels.testing import WebsocketCommunicator
+from ddf import G
+from rest_framework.test import APITestCase
+
+from apps.pokerboard import (
+    imports as pokerboard_imports,
+    models as pokerboard_models
+)
+from apps.pokerboard.tests import test_utils as pokerboard_test_utils
+from apps.user import models as user_models
+from poker.asgi import application
+
+
+@override_settings(IMPORT_BATCH_SIZE=2)
+@patch("apps.pokerboard.jira.requests.Session.request", side_effect=pokerboard_test_utils.search_stub)
+class ImportJobTestCases(pokerboard_test_utils.EagerCeleryMixin, APITestCase):
+    """
+    Test pokerboard import jobs, with an eager celery and a stub jira
+    """
+    IMPORTS_URL = reverse("imports-list")
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup method for creating default user and it's token
+        """
+        super().setUp()
+        self.user = G(get_user_model())
+        token = G(user_models.Token, user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        caches["jira"].clear()
+        self.data = {
+            "title": "Avengers",
+            "description": "Take down thanos",
+            "duration": 60,
+            "estimation_type": pokerboard_models.Pokerboard.FIBONACCI,
+            "tickets": ["KD-3", "KD-1", "KD-5", "KD-2", "KD-4"]
+        }
+
+    def test_import_pokerboard(self: APITestCase, mock_request: Mock) -> None:
+        """
+        Test import returns a job at once, and the job creates the pokerboard with its tickets in order
+        """
+        response = self.client.post(self.IMPORTS_URL, data=self.data, format="json")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], pokerboard_models.ImportJob.PENDING)
+        self.assertEqual(response.data["total"], 5)
+
+        response = self.client.get(reverse("imports-detail", args=[response.data["id"]]))
+        self.assertEqual(response.status_code, 200)
+        pokerboard = pokerboard_models.Pokerboard.objects.get(title=self.data["title"])
+        expected_data = {
+            "id": response.data["id"],
+            "status": pokerboard_models.ImportJob.DONE,
+            "total": 5,
+            "processed": 5,
+            "errors": [],
+            "pokerboard": pokerboard.id,
+        }
+        self.assertDictEqual(expected_data, response.data)
+        self.assertEqual(pokerboard.manager, self.user)
+        self.assertListEqual(
+            list(pokerboard.tickets.order_by("rank").values_list("ticket_id", flat=True)), self.data["tickets"]
+        )
+        # three batches of validation
+        self.assertEqual(mock_request.call_count, 3)
+
+    def test_import_pokerboard_with_invalid_tickets(self: APITestCase, mock_request: Mock) -> None:
+        """
+        Test a job with invalid tickets fails, naming them, without creating a pokerboard
+        """
+        self.data["tickets"] = ["KD-1", "K-2", "KD-3", "K-4"]
+        response = self.client.post(self.IMPORTS_URL, data=self.data, format="json")
+        response = self.client.get(reverse("imports-detail", args=[response.data["id"]]))
+        self.assertEqual(response.data["status"], pokerboard_models.ImportJob.FAILED)
+        self.assertListEqual(response.data["errors"], [
+            "The issue key 'K-2' for field 'issue' is invalid.",
+            "The issue key 'K-4' for field 'issue' is invalid.",
+        ])
+        self.assertIsNone(response.data["pokerboard"])
+        self.assertFalse(pokerboard_models.Pokerboard.objects.filter(title=self.data["title"]).exists())
+
+    def test_import_pokerboard_with_taken_title(self: APITestCase, mock_request: Mock) -> None:
+        """
+        Test a job fails if its title got taken while it was queued
+        """
+        job = G(pokerboard_models.ImportJob, manager=self.user, payload=json.dumps(self.data), total=5)
+        G(pokerboard_models.Pokerboard, title=self.data["title"])
+        pokerboard_imports.run_import(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, pokerboard_models.ImportJob.FAILED)
+        self.assertDictEqual(json.loads(job.errors), {"title": ["pokerboard with this title already exists."]})
+
+    def test_import_pokerboard_without_tickets(self: APITestCase, mock_request: Mock) -> None:
+        """
+        Test import validates pokerboard details before queueing a job
+        """
+        del self.data["tickets"]
+        response = self.client.post(self.IMPORTS_URL, data=self.data, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertDictEqual(response.data, {"tickets": ["This field is required."]})
+        self.assertFalse(pokerboard_models.ImportJob.objects.exists())
+
+    def test_import_job_of_other_user(self: APITestCase, mock_request: Mock) -> None:
+        """
+        Test a user can not follow another user's import job
+        """
+        job = G(pokerboard_models.ImportJob, payload=json.dumps(self.data))
+        response = self.client.get(reverse("imports-detail", args=[job.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.asyncio
+class TestImportJobWebsocket:
+    """
+    Test import job progress over websockets
+    """
+    @pytest.fixture
+    def setup(self):
+        """
+        Setup a pending import job of a user
+        """
+        self.user = G(get_user_model())
+        self.token = user_models.Token.objects.create(user=self.user)
+        self.job = G(pokerboard_models.ImportJob, manager=self.user, total=3, payload=json.dumps({
+            "title": "Avengers",
+            "description": "Take down thanos",
+            "duration": 60,
+            "tickets": ["KD-1", "KD-2", "KD-3"],
+        }))
+        caches["jira"].clear()
+        channel_layers.backends.pop(DEFAULT_CHANNEL_LAYER, None)
+
+    async def test_import_progress_is_pushed(self, setup):
+        """
+        Test the job's progress is pushed after every batch
+        """
+        communicator = WebsocketCommunicator(application, f"/imports/{self.job.id}?token={self.token.key}")
+        connected, subprotocol = await communicator.connect()
+        assert connected
+        res = json.loads(await communicator.receive_from())
+        assert res["job"]["status"] == pokerboard_models.ImportJob.PENDING
+
+        with override_settings(IMPORT_BATCH_SIZE=2), patch(
+            "apps.pokerboard.jira.requests.Session.request", side_effect=pokerboard_test_utils.search_stub
+        ):
+            await database_sync_to_async(pokerboard_imports.run_import)(self.job.id)
+        updates = [json.loads(await communicator.receive_from())["job"] for _ in range(4)]
+        assert [(job["status"], job["processed"]) for job in updates] == [
+            (pokerboard_models.ImportJob.RUNNING, 0),
+            (pokerboard_models.ImportJob.RUNNING, 2),
+            (pokerboard_models.ImportJob.RUNNING, 3),
+            (pokerboard_models.ImportJob.DONE, 3),
+        ]
+        assert updates[-1]["pokerboard"] is not None
+        await communicator.disconnect()
+
+    async def test_import_progress_of_other_user(self, setup):
+        """
+        Test a user can not follow another user's import job
+        """
+        other = await database_sync_to_async(user_models.Token.objects.create)(
+            user=await database_sync_to_async(G)(get_user_model())
+        )
+        communicator = WebsocketCommunicator(application, f"/imports/{self.job.id}?token={other.key}")
+        connected, subprotocol = await communicator.connect()
+        assert not connected
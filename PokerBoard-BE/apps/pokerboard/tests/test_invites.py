@@ -0,0 +1,107 @@
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import override_settings
+from django.urls import reverse
+
+from ddf import G
+from rest_framework.test import APITestCase
+
+from apps.group import models as group_models
+from apps.pokerboard import (
+    invites as pokerboard_invites,
+    models as pokerboard_models
+)
+from apps.pokerboard.tests import test_utils as pokerboard_test_utils
+from apps.user import models as user_models
+from poker import mail as poker_mail
+
+
+class GroupInviteTestCases(pokerboard_test_utils.EagerCeleryMixin, APITestCase):
+    """
+    Test inviting a group to a pokerboard
+    """
+    INVITE_URL = reverse('members-list')
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup a pokerboard and a group of its manager
+        """
+        super().setUp()
+        poker_mail.get_cache().clear()
+
+        self.user = G(get_user_model())
+        token = G(user_models.Token, user=self.user)
+        self.pokerboard = G(pokerboard_models.Pokerboard, manager=self.user, title="Dummy Pokerboard")
+        self.group = G(group_models.Group, created_by=self.user, name="Dummy Group")
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def invite_group(self: APITestCase):
+        """
+        Invites the group as contributors
+        """
+        return self.client.post(self.INVITE_URL, data={
+            "type": pokerboard_models.Invite.GROUP,
+            "group_name": self.group.name,
+            "pokerboard": self.pokerboard.id,
+            "role": pokerboard_models.Invite.CONTRIBUTOR
+        })
+
+    def test_invite_group_emails_members(self: APITestCase) -> None:
+        """
+        Test every member is invited and emailed, members invited before are skipped
+        """
+        members = G(group_models.GroupMember, group=self.group, n=3)
+        G(pokerboard_models.Invite, pokerboard=self.pokerboard, invitee=members[0].user.email)
+        mail.outbox = []
+
+        response = self.invite_group()
+        self.assertEqual(response.status_code, 201)
+        invites = pokerboard_models.Invite.objects.filter(pokerboard=self.pokerboard, group=self.group)
+        expected_emails = {self.user.email, members[1].user.email, members[2].user.email}
+        self.assertSetEqual({invite.invitee for invite in invites}, expected_emails)
+        self.assertSetEqual({message.to[0] for message in mail.outbox}, expected_emails)
+        for message in mail.outbox:
+            invite = invites.get(invitee=message.to[0])
+            self.assertIn(f"/join/{invite.id}", message.alternatives[0][0])
+            self.assertIn("Dummy Pokerboard", message.subject)
+
+    def test_invite_group_again_emails_new_members_only(self: APITestCase) -> None:
+        """
+        Test inviting a group again invites and emails only members who joined it since
+        """
+        G(group_models.GroupMember, group=self.group, n=2)
+        pokerboard_invites.invite_group(self.pokerboard, self.group, self.group.name, pokerboard_models.Invite.CONTRIBUTOR)
+        new_member = G(group_models.GroupMember, group=self.group)
+        mail.outbox = []
+
+        invited = pokerboard_invites.invite_group(
+            self.pokerboard, self.group, self.group.name, pokerboard_models.Invite.CONTRIBUTOR
+        )
+        self.assertEqual(invited, 1)
+        self.assertListEqual([message.to[0] for message in mail.outbox], [new_member.user.email])
+
+    # sent emails are claimed in the default (in process) cache, the mail cache costs queries per email
+    @override_settings(MAIL_CACHE_ALIAS='default')
+    def test_invite_large_group_query_count(self: APITestCase) -> None:
+        """
+        Test inviting a 1000 member group takes a handful of queries
+        """
+        users = get_user_model().objects.bulk_create([
+            get_user_model()(email=f"member-{idx}@example.com", first_name="member", last_name=str(idx))
+            for idx in range(999)
+        ])
+        group_models.GroupMember.objects.bulk_create([
+            group_models.GroupMember(group=self.group, user=user)
+            for user in get_user_model().objects.filter(email__startswith="member-")
+        ])
+        # warm up the token cache, so only the invite itself is counted
+        self.client.get(reverse('pokerboards-list'))
+        mail.outbox = []
+
+        # 8 queries, the worker fetching the invites by id included,
+        # plus the savepoint and its release around the inserts inside the test's transaction
+        with self.assertNumQueries(10):
+            response = self.invite_group()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(pokerboard_models.Invite.objects.filter(group=self.group).count(), len(users) + 1)
+        self.assertEqual(len(mail.outbox), len(users) + 1)
@@ -0,0 +1,191 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+from rest_framework.test import APITestCase
+
+from apps.pokerboard import jira as pokerboard_jira
+
+
+class StubJiraServer(ThreadingMixIn, HTTPServer):
+    """
+    Local stand-in for Jira serving canned responses, optionally slow or failing
+    """
+    daemon_threads = True
+
+    def __init__(self, boards: int=0, delay: float=0, failures: int=0):
+        super().__init__(("127.0.0.1", 0), StubJiraHandler)
+        self.boards = boards
+        self.delay = delay
+        self.failures = failures
+        self.requests = []
+        self.connections = set()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+
+class StubJiraHandler(BaseHTTPRequestHandler):
+    """
+    Answers board and sprint listings and comments, the first `failures` requests get a 503
+    """
+    protocol_version = "HTTP/1.1"
+
+    def record(self) -> bool:
+        """
+        Records the request, returns True if it is one of the failing ones
+        """
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.connections.add(self.client_address)
+            return len(server.requests) <= server.failures
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.record():
+            return self.respond(503, {"errorMessages": ["Try again"]})
+        self.respond(201, {})
+
+    def do_GET(self) -> None:
+        server = self.server
+        if self.record():
+            return self.respond(503, {"errorMessages": ["Try again"]})
+        time.sleep(server.delay)
+        if self.path == "/rest/agile/1.0/board":
+            return self.respond(200, {"values": [{"id": idx} for idx in range(server.boards)]})
+        if self.path.startswith("/rest/agile/1.0/board/"):
+            board_id = int(self.path.split("/")[5])
+            return self.respond(200, {"values": [{"id": board_id, "name": f"Sprint {board_id}"}]})
+        self.respond(404, {"errorMessages": ["Not found"]})
+
+    def respond(self, status: int, body: dict) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class JiraClientTestCases(APITestCase):
+    """
+    Test jira client against a local stub server
+    """
+
+    def start_server(self: APITestCase, **kwargs) -> StubJiraServer:
+        """
+        Starts a stub server for the duration of the test
+        """
+        server = StubJiraServer(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def client_for(self: APITestCase, server: StubJiraServer, **kwargs) -> pokerboard_jira.JiraClient:
+        """
+        Jira client talking to a stub server
+        """
+        options = {"timeout": (1, 1), "retries": 2, "backoff": 0, "max_parallel": 8}
+        options.update(kwargs)
+        return pokerboard_jira.JiraClient(base_url=server.url, auth=("user", "token"), **options)
+
+    def test_get_all_sprints_fetches_boards_concurrently(self: APITestCase) -> None:
+        """
+        Test sprints of every board are fetched in parallel and returned in board order
+        """
+        server = self.start_server(boards=8, delay=0.2)
+        client = self.client_for(server)
+        started = time.perf_counter()
+        sprints = client.get_all_sprints()
+        elapsed = time.perf_counter() - started
+        self.assertListEqual([sprint["id"] for sprint in sprints], list(range(8)))
+        # boards listing plus one round of sprint listings, instead of nine sequential round trips
+        self.assertLess(elapsed, 0.2 * 5)
+
+    def test_aget_all_sprints(self: APITestCase) -> None:
+        """
+        Test async variant returns the same sprints
+        """
+        import asyncio
+        server = self.start_server(boards=3)
+        client = self.client_for(server)
+        sprints = asyncio.get_event_loop().run_until_complete(client.aget_all_sprints())
+        self.assertListEqual([sprint["name"] for sprint in sprints], ["Sprint 0", "Sprint 1", "Sprint 2"])
+
+    def test_retries_unavailable_responses(self: APITestCase) -> None:
+        """
+        Test 5xx responses are retried before giving up
+        """
+        server = self.start_server(boards=1, failures=2)
+        client = self.client_for(server)
+        self.assertListEqual(client.get_boards(), [{"id": 0}])
+        self.assertEqual(len(server.requests), 3)
+
+    def test_does_not_retry_comments(self: APITestCase) -> None:
+        """
+        Test a comment that failed after reaching jira is not posted again
+        """
+        server = self.start_server(failures=1)
+        client = self.client_for(server)
+        url = f"{client.api_url}issue/KD-1/comment"
+        with self.assertRaises(pokerboard_jira.JiraError):
+            client.request("POST", url, payload="{}", status_code=201, idempotent=False)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_retries_read_only_posts(self: APITestCase) -> None:
+        """
+        Test idempotent POSTs like search are retried
+        """
+        server = self.start_server(failures=1)
+        client = self.client_for(server)
+        client.request("POST", f"{client.api_url}search", payload="{}", status_code=201)
+        self.assertEqual(len(server.requests), 2)
+
+    def test_fan_out_inside_background_job(self: APITestCase) -> None:
+        """
+        Test a fan-out running on the client's executor, as a cache refresh does, does not wait on itself
+        """
+        server = self.start_server(boards=3)
+        client = self.client_for(server, max_parallel=1)
+        sprints = client.executor.submit(client.get_all_sprints).result(timeout=5)
+        self.assertEqual(len(sprints), 3)
+
+    def test_gives_up_after_retries(self: APITestCase) -> None:
+        """
+        Test the jira error is raised once retries run out
+        """
+        server = self.start_server(boards=1, failures=10)
+        client = self.client_for(server, retries=1)
+        with self.assertRaises(pokerboard_jira.JiraError) as context:
+            client.get_boards()
+        self.assertEqual(context.exception.detail, ["Try again"])
+        self.assertEqual(len(server.requests), 2)
+
+    def test_timeout(self: APITestCase) -> None:
+        """
+        Test a slow jira times out instead of blocking the worker
+        """
+        server = self.start_server(boards=1, delay=1)
+        client = self.client_for(server, timeout=(1, 0.2), retries=0)
+        with self.assertRaises(pokerboard_jira.JiraUnavailable):
+            client.get_boards()
+
+    def test_reuses_connections(self: APITestCase) -> None:
+        """
+        Test sequential requests share one pooled connection
+        """
+        server = self.start_server(boards=1)
+        client = self.client_for(server)
+        client.get_boards()
+        client.get_boards()
+        self.assertEqual(len(server.requests), 2)
+        self.assertEqual(len(server.connections), 1)
@@ -0,0 +1,109 @@
+import json
+import time
+from unittest.mock import Mock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+
+from ddf import G
+from rest_framework.test import APITestCase
+
+from apps.pokerboard import jira_cache as pokerboard_jira_cache
+from apps.pokerboard.tests import mock_data as pokerboard_mock_data
+from apps.user import models as user_models
+
+POLICIES = {
+    "search": {"ttl": 60},
+    "sprints": {"ttl": 60, "stale": 600},
+    "comments": {"ttl": 30},
+}
+
+
+@override_settings(JIRA_CACHE_POLICIES=POLICIES)
+class JiraCacheTestCases(APITestCase):
+    """
+    Test jira response cache
+    """
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup an empty cache and fresh counters
+        """
+        caches["jira"].clear()
+        pokerboard_jira_cache.stats.clear()
+
+    def test_cached_response_is_reused(self: APITestCase) -> None:
+        """
+        Test a fresh response is served from the cache without fetching again
+        """
+        fetch = Mock(return_value={"issues": []})
+        self.assertEqual(pokerboard_jira_cache.cached("search", "project = KD", fetch), {"issues": []})
+        self.assertEqual(pokerboard_jira_cache.cached("search", "project = KD", fetch), {"issues": []})
+        self.assertEqual(fetch.call_count, 1)
+        self.assertDictEqual(
+            pokerboard_jira_cache.get_stats(), {"search": {"hits": 1, "stale_hits": 0, "misses": 1, "hit_ratio": 0.5}}
+        )
+
+    def test_expired_response_is_fetched_again(self: APITestCase) -> None:
+        """
+        Test a response without stale period is refetched once its ttl passes
+        """
+        fetch = Mock(side_effect=[{"issues": [1]}, {"issues": [2]}])
+        pokerboard_jira_cache.cached("search", "project = KD", fetch)
+        with patch("apps.pokerboard.jira_cache.time.time", return_value=time.time() + 61):
+            self.assertEqual(pokerboard_jira_cache.cached("search", "project = KD", fetch), {"issues": [2]})
+
+    def test_stale_response_is_served_while_revalidating(self: APITestCase) -> None:
+        """
+        Test a stale response is returned right away and refreshed in the background
+        """
+        fetch = Mock(side_effect=[["old"], ["new"]])
+        pokerboard_jira_cache.cached("sprints", "all", fetch)
+        with patch("apps.pokerboard.jira_cache.time.time", return_value=time.time() + 61):
+            self.assertEqual(pokerboard_jira_cache.cached("sprints", "all", fetch), ["old"])
+        deadline = time.time() + 5
+        while fetch.call_count < 2 or caches["jira"].get(pokerboard_jira_cache._cache_key("sprints", "all"))[0] != ["new"]:
+            self.assertLess(time.time(), deadline)
+            time.sleep(0.01)
+        self.assertEqual(pokerboard_jira_cache.cached("sprints", "all", fetch), ["new"])
+        self.assertEqual(pokerboard_jira_cache.get_stats()["sprints"]["stale_hits"], 1)
+
+    @patch("apps.pokerboard.jira.requests.Session.request")
+    def test_posting_comment_invalidates_comments(self: APITestCase, mock_request: Mock) -> None:
+        """
+        Test comments of a ticket are refetched after commenting on it
+        """
+        user = G(get_user_model())
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + G(user_models.Token, user=user).key)
+        url = reverse("comment")
+        mock_request.return_value.status_code = 200
+        mock_request.return_value.text = json.dumps(pokerboard_mock_data.COMMENTS_REPONSE)
+        self.client.get(f"{url}?issueId=KD-4")
+        self.client.get(f"{url}?issueId=KD-4")
+        self.assertEqual(mock_request.call_count, 1)
+
+        mock_request.return_value.status_code = 201
+        mock_request.return_value.text = "{}"
+        self.assertEqual(self.client.post(url, data={"comment": "Hello", "issue": "KD-4"}).status_code, 201)
+        mock_request.return_value.status_code = 200
+        mock_request.return_value.text = json.dumps(pokerboard_mock_data.COMMENTS_REPONSE)
+        self.client.get(f"{url}?issueId=KD-4")
+        self.assertEqual(mock_request.call_count, 3)
+
+    def test_stats_for_admins_only(self: APITestCase) -> None:
+        """
+        Test cache stats are only visible to staff users
+        """
+        url = reverse("jira-cache-stats")
+        user = G(get_user_model(), is_staff=False)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + G(user_models.Token, user=user).key)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        pokerboard_jira_cache.cached("search", "project = KD", Mock(return_value={}))
+        admin = G(get_user_model(), is_staff=True)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + G(user_models.Token, user=admin).key)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["search"]["misses"], 1)
@@ -0,0 +1,56 @@
+from django.core.exceptions import ImproperlyConfigured
+
+from rest_framework.test import APITestCase
+
+from poker import layers as poker_layers
+from poker.settings.base import Setting
+
+
+class RedisSetting(Setting):
+    CHANNEL_LAYER = 'redis'
+    CHANNEL_LAYER_URL = 'redis://redis:6379/2'
+    CHANNEL_LAYER_CAPACITY = 500
+
+
+class ChannelLayerSettingTestCases(APITestCase):
+    """
+    Test channel layer selection from settings
+    """
+
+    def test_memory_layer(self: APITestCase) -> None:
+        """
+        Test the in-memory layer is the default, tuned by the capacity and expiry settings
+        """
+        self.assertDictEqual(Setting().CHANNEL_LAYERS["default"], {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+            "CONFIG": {"capacity": 100, "expiry": 60, "group_expiry": 86400},
+        })
+
+    def test_redis_layer(self: APITestCase) -> None:
+        """
+        Test overriding the layer in a settings subclass switches CHANNEL_LAYERS to redis
+        """
+        self.assertDictEqual(RedisSetting().CHANNEL_LAYERS["default"], {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {
+                "hosts": ["redis://redis:6379/2"], "prefix": "asgi",
+                "capacity": 500, "expiry": 60, "group_expiry": 86400,
+            },
+        })
+
+    def test_redis_pubsub_layer(self: APITestCase) -> None:
+        """
+        Test the pubsub layer gets only its hosts and prefix
+        """
+        config = poker_layers.layer_config("redis_pubsub", "redis://redis:6379/2", "asgi", 100, 60, 86400)
+        self.assertDictEqual(config, {
+            "BACKEND": "channels_redis.pubsub.RedisPubSubChannelLayer",
+            "CONFIG": {"hosts": ["redis://redis:6379/2"], "prefix": "asgi"},
+        })
+
+    def test_unknown_layer(self: APITestCase) -> None:
+        """
+        Test an unknown layer name is a configuration error
+        """
+        with self.assertRaises(ImproperlyConfigured):
+            poker_layers.layer_config("rabbitmq", None, "asgi", 100, 60, 86400)
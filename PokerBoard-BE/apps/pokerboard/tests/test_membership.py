@@ -0,0 +1,109 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+
+from ddf import G
+from rest_framework.test import APITestCase
+
+from apps.pokerboard import (
+    access as pokerboard_access,
+    models as pokerboard_models
+)
+from apps.user import models as user_models
+
+
+class MembershipTestCases(APITestCase):
+    """
+    Test pokerboard memberships are kept in sync with managers and invites
+    """
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup a pokerboard with its manager, and an invited user
+        """
+        cache.clear()
+        self.manager = G(get_user_model())
+        self.user = G(get_user_model())
+        self.pokerboard = G(pokerboard_models.Pokerboard, manager=self.manager)
+        self.invite = G(
+            pokerboard_models.Invite, invitee=self.user.email, pokerboard=self.pokerboard,
+            role=pokerboard_models.Invite.SPECTATOR, is_accepted=False
+        )
+        token = G(user_models.Token, user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+
+    def roles(self: APITestCase) -> dict:
+        """
+        Roles of the pokerboard's members by user id
+        """
+        return dict(pokerboard_models.Membership.objects.filter(
+            pokerboard=self.pokerboard
+        ).values_list("user_id", "role"))
+
+    def test_manager_is_member(self: APITestCase) -> None:
+        """
+        Test creating a pokerboard makes its manager a member, pending invites do not
+        """
+        self.assertDictEqual(self.roles(), {self.manager.id: pokerboard_models.Membership.MANAGER})
+
+    def test_accepting_invite_adds_member(self: APITestCase) -> None:
+        """
+        Test accepting an invite makes the invitee a member with the invite's role
+        """
+        self.assertFalse(pokerboard_access.has_access(self.user, self.pokerboard.id))
+        response = self.client.put(reverse('members-detail', args=[self.invite.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.roles()[self.user.id], pokerboard_models.Membership.SPECTATOR)
+        self.assertTrue(pokerboard_access.has_access(self.user, self.pokerboard.id))
+
+    def test_highest_invite_role_wins(self: APITestCase) -> None:
+        """
+        Test a user invited both directly and through a group gets the higher role
+        """
+        self.invite.is_accepted = True
+        self.invite.save()
+        G(
+            pokerboard_models.Invite, invitee=self.user.email, pokerboard=self.pokerboard,
+            role=pokerboard_models.Invite.CONTRIBUTOR, is_accepted=True
+        )
+        self.assertEqual(self.roles()[self.user.id], pokerboard_models.Membership.CONTRIBUTOR)
+
+    def test_removing_invite_removes_member(self: APITestCase) -> None:
+        """
+        Test deleting the accepted invite removes the membership
+        """
+        self.invite.is_accepted = True
+        self.invite.save()
+        self.invite.delete()
+        self.assertNotIn(self.user.id, self.roles())
+        self.assertFalse(pokerboard_access.has_access(self.user, self.pokerboard.id))
+
+    def test_changing_manager(self: APITestCase) -> None:
+        """
+        Test handing a pokerboard over moves the manager membership, the former manager loses access
+        """
+        self.invite.is_accepted = True
+        self.invite.save()
+        self.pokerboard.manager = self.user
+        self.pokerboard.save()
+        self.assertDictEqual(self.roles(), {self.user.id: pokerboard_models.Membership.MANAGER})
+
+    def test_saving_pokerboard_keeps_membership(self: APITestCase) -> None:
+        """
+        Test saving a pokerboard without changing its manager takes a single membership query
+        """
+        self.pokerboard.status = pokerboard_models.Pokerboard.STARTED
+        with self.assertNumQueries(2):
+            self.pokerboard.save()
+        self.assertDictEqual(self.roles(), {self.manager.id: pokerboard_models.Membership.MANAGER})
+
+    def test_pokerboard_list_uses_membership(self: APITestCase) -> None:
+        """
+        Test pokerboards are listed once per member, including invited ones
+        """
+        self.invite.is_accepted = True
+        self.invite.save()
+        G(pokerboard_models.Pokerboard, manager=self.user)
+        response = self.client.get(reverse('pokerboards-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 2)
@@ -0,0 +1,72 @@
+import json
+
+from rest_framework.test import APITestCase
+
+from apps.pokerboard import (
+    consumers as pokerboard_consumers,
+    messages as pokerboard_messages
+)
+
+
+class MessageHandlersTestCases(APITestCase):
+    """
+    Test websocket message parsing and validation
+    """
+
+    def parse(self: APITestCase, message_type: str, message=None) -> tuple:
+        """
+        Parses a message through the session consumer's handler table
+        """
+        return pokerboard_consumers.session_handlers.parse(json.dumps({
+            "message_type": message_type, "message": message
+        }))
+
+    def test_parse_vote(self: APITestCase) -> None:
+        """
+        Test a vote is dispatched to its handler, with its estimate cleaned and unknown fields dropped
+        """
+        handler, message = self.parse("vote", {"estimate": "5", "extra": 1})
+        self.assertEqual(handler.method, "vote")
+        self.assertDictEqual(message, {"estimate": 5})
+
+    def test_invalid_payload(self: APITestCase) -> None:
+        """
+        Test an invalid payload fails with the error of its message type
+        """
+        for estimate in (None, True, 2.5, "five", -1):
+            with self.assertRaisesMessage(pokerboard_messages.MessageError, "Invalid estimate"):
+                self.parse("vote", {"estimate": estimate})
+        with self.assertRaisesMessage(pokerboard_messages.MessageError, "Estimation failed"):
+            self.parse("estimate", "estimate")
+
+    def test_oversized_estimate(self: APITestCase) -> None:
+        """
+        Test an estimate too large for the Vote and Ticket estimate columns is rejected
+        """
+        self.assertDictEqual(self.parse("vote", {"estimate": 2147483647})[1], {"estimate": 2147483647})
+        with self.assertRaisesMessage(pokerboard_messages.MessageError, "Invalid estimate"):
+            self.parse("vote", {"estimate": 10 ** 12})
+        with self.assertRaisesMessage(pokerboard_messages.MessageError, "Estimation failed"):
+            self.parse("estimate", {"estimate": 2147483648})
+
+    def test_optional_fields(self: APITestCase) -> None:
+        """
+        Test a payload that is not an object is taken as empty when no field is required
+        """
+        self.assertDictEqual(self.parse("initialise_game", "initialise_game")[1], {})
+        self.assertDictEqual(self.parse("initialise_game", {"since": None})[1], {"since": None})
+        self.assertDictEqual(self.parse("initialise_game", {"since": 4})[1], {"since": 4})
+
+    def test_unregistered_types_are_rejected(self: APITestCase) -> None:
+        """
+        Test consumer methods that are not registered handlers, and malformed messages, are never dispatched
+        """
+        for text in (
+            json.dumps({"message_type": "broadcast", "message": {}}),
+            json.dumps({"message_type": "disconnect"}),
+            json.dumps(["vote"]),
+            json.dumps({"message": {}}),
+            "not json",
+        ):
+            with self.assertRaisesMessage(pokerboard_messages.MessageError, "Something went wrong"):
+                pokerboard_consumers.session_handlers.parse(text)
@@ -0,0 +1,81 @@
+from unittest.mock import patch
+
+from rest_framework.test import APITestCase
+
+from apps.pokerboard import (
+    presence as pokerboard_presence,
+    store as pokerboard_store
+)
+
+
+class PresenceRegistryTestCases(APITestCase):
+    """
+    Test presence registry
+    """
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup a registry on a fresh local store
+        """
+        self.store = pokerboard_store.LocalStore()
+        self.registry = pokerboard_presence.PresenceRegistry(1, store=self.store, ttl=30)
+        self.user_data = {"id": 1, "email": "a@b.com", "first_name": "A", "last_name": "B"}
+
+    def test_join(self: APITestCase) -> None:
+        """
+        Test join returns True only for new users
+        """
+        self.assertTrue(self.registry.join("channel-1", self.user_data))
+        self.assertFalse(self.registry.join("channel-1", self.user_data))
+        self.assertListEqual(self.registry.members(), [self.user_data])
+
+    def test_leave(self: APITestCase) -> None:
+        """
+        Test leave removes the user
+        """
+        self.registry.join("channel-1", self.user_data)
+        self.assertTrue(self.registry.leave("channel-1", 1))
+        self.assertFalse(self.registry.leave("channel-1", 1))
+        self.assertListEqual(self.registry.members(), [])
+
+    def test_user_with_two_connections(self: APITestCase) -> None:
+        """
+        Test a user joining from two tabs is listed once and leaves only when the last tab closes
+        """
+        self.assertTrue(self.registry.join("channel-1", self.user_data))
+        self.assertFalse(self.registry.join("channel-2", self.user_data))
+        self.assertListEqual(self.registry.members(), [self.user_data])
+        self.assertFalse(self.registry.leave("channel-1", 1))
+        self.assertListEqual(self.registry.members(), [self.user_data])
+        self.assertTrue(self.registry.leave("channel-2", 1))
+        self.assertListEqual(self.registry.members(), [])
+
+    def test_updates_do_not_list_members(self: APITestCase) -> None:
+        """
+        Test join, heartbeat and leave decide on first and last connections without listing the session
+        """
+        with patch.object(self.registry, "members") as members:
+            self.registry.join("channel-1", self.user_data)
+            self.registry.heartbeat("channel-1", self.user_data)
+            self.registry.leave("channel-1", 1)
+        members.assert_not_called()
+
+    def test_sessions_are_isolated(self: APITestCase) -> None:
+        """
+        Test users of one session are not visible in another
+        """
+        self.registry.join("channel-1", self.user_data)
+        other = pokerboard_presence.PresenceRegistry(2, store=self.store, ttl=30)
+        self.assertListEqual(other.members(), [])
+
+    @patch("apps.pokerboard.presence.time.time")
+    def test_expired_users_are_pruned(self: APITestCase, mock_time) -> None:
+        """
+        Test users without heartbeat drop out after ttl
+        """
+        mock_time.return_value = 1000
+        self.registry.join("channel-1", self.user_data)
+        mock_time.return_value = 1031
+        self.assertListEqual(self.registry.members(), [])
+        self.assertTrue(self.registry.heartbeat("channel-1", self.user_data))
+        self.assertListEqual(self.registry.members(), [self.user_data])
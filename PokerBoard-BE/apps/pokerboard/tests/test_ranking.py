@@ -0,0 +1,66 @@
+from ddf import G
+from rest_framework.test import APITestCase
+
+from apps.pokerboard import (
+    constants as pokerboard_constants,
+    models as pokerboard_models,
+    ranking as pokerboard_ranking
+)
+
+
+class MoveToEndTestCases(APITestCase):
+    """
+    Test moving a skipped ticket to the end of its pokerboard
+    """
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup a pokerboard with spaced out tickets
+        """
+        self.pokerboard = G(pokerboard_models.Pokerboard)
+        self.tickets = [
+            G(pokerboard_models.Ticket, pokerboard=self.pokerboard, rank=rank, estimate=None)
+            for rank in pokerboard_ranking.initial_ranks(5)
+        ]
+
+    def ranks(self: APITestCase) -> dict:
+        """
+        Ranks of the pokerboard's tickets by id
+        """
+        return dict(self.pokerboard.tickets.values_list("id", "rank"))
+
+    def test_move_to_end_updates_one_row(self: APITestCase) -> None:
+        """
+        Test skipping a ticket only changes the skipped ticket, with one UPDATE
+        """
+        before = self.ranks()
+        # update and reading back the new rank
+        with self.assertNumQueries(2):
+            pokerboard_ranking.move_to_end(self.tickets[0])
+        after = self.ranks()
+        self.assertEqual(after[self.tickets[0].id], before[self.tickets[-1].id] + pokerboard_constants.TICKET_RANK_GAP)
+        self.assertEqual(self.tickets[0].rank, after[self.tickets[0].id])
+        del before[self.tickets[0].id], after[self.tickets[0].id]
+        self.assertDictEqual(before, after)
+
+    def test_move_to_end_keeps_order_of_others(self: APITestCase) -> None:
+        """
+        Test skipping tickets one after another cycles through the list
+        """
+        pokerboard_ranking.move_to_end(self.tickets[0])
+        pokerboard_ranking.move_to_end(self.tickets[1])
+        ordered = list(self.pokerboard.tickets.order_by("rank").values_list("id", flat=True))
+        expected = [ticket.id for ticket in self.tickets[2:] + self.tickets[:2]]
+        self.assertListEqual(expected, ordered)
+
+    def test_move_to_end_rebalances_large_ranks(self: APITestCase) -> None:
+        """
+        Test ranks are spread out again once a skip pushes them past the limit
+        """
+        pokerboard_models.Ticket.objects.filter(id=self.tickets[-1].id).update(rank=pokerboard_constants.TICKET_RANK_LIMIT)
+        pokerboard_ranking.move_to_end(self.tickets[0])
+        ordered = list(self.pokerboard.tickets.order_by("rank").values_list("id", "rank"))
+        self.assertListEqual(
+            [(ticket.id, rank) for ticket, rank in zip(self.tickets[1:] + self.tickets[:1], pokerboard_ranking.initial_ranks(5))],
+            ordered
+        )
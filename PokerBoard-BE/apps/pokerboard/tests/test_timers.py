@@ -0,0 +1,67 @@
+import random
+
+from rest_framework.test import APITestCase
+
+from apps.pokerboard import (
+    store as pokerboard_store,
+    timers as pokerboard_timers
+)
+
+
+class TimerSchedulerTestCases(APITestCase):
+    """
+    Test voting timer scheduler
+    """
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup two workers' schedulers sharing a fresh local store
+        """
+        self.store = pokerboard_store.LocalStore()
+        self.scheduler = pokerboard_timers.TimerScheduler(store=self.store)
+        self.other = pokerboard_timers.TimerScheduler(store=self.store)
+
+    def test_due_in_deadline_order(self: APITestCase) -> None:
+        """
+        Test due timers come out earliest first, restarted and cancelled timers only once or never
+        """
+        for session_id, deadline in ((1, 30), (2, 10), (3, 20)):
+            self.scheduler.start(session_id, deadline)
+            self.scheduler.watch(session_id, deadline)
+        self.scheduler.watch(3, 40)
+        self.scheduler.cancel(2)
+        self.assertListEqual(self.scheduler.due(25), [])
+        self.assertListEqual(self.scheduler.due(50), [(1, 30), (3, 40)])
+        self.assertListEqual(self.scheduler.due(100), [])
+
+    def test_timer_fires_once_across_workers(self: APITestCase) -> None:
+        """
+        Test only one of the workers watching a timer claims it, and a restarted timer is not claimed early
+        """
+        self.scheduler.start(1, 10)
+        self.assertTrue(self.scheduler.claim(1, 10))
+        self.assertFalse(self.other.claim(1, 10))
+        self.scheduler.start(2, 10)
+        self.scheduler.start(2, 20)
+        self.assertFalse(self.other.claim(2, 10))
+        self.assertTrue(self.other.claim(2, 20))
+
+    def test_claim_compares_deadlines_in_milliseconds(self: APITestCase) -> None:
+        """
+        Test a timer is claimed with its deadline as computed again by another worker, off by float rounding
+        """
+        started_at, duration = 1700000000.1, 30.1
+        self.scheduler.start(1, started_at + duration)
+        self.assertNotEqual(started_at + duration, 1700000030.2)
+        self.assertTrue(self.other.claim(1, 1700000030.2))
+
+    def test_many_timers(self: APITestCase) -> None:
+        """
+        Test thousands of timers come out in deadline order
+        """
+        deadlines = {session_id: random.uniform(0, 1000) for session_id in range(5000)}
+        for session_id, deadline in deadlines.items():
+            self.scheduler.watch(session_id, deadline)
+        due = self.scheduler.due(500)
+        self.assertListEqual([deadline for session_id, deadline in due], sorted(d for d in deadlines.values() if d <= 500))
+        self.assertEqual(len(due) + len(self.scheduler.due(1000)), 5000)
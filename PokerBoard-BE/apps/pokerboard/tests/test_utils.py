@@ -1,12 +1,29 @@
 import json
+import re
 from unittest.mock import Mock, patch
 
+from django.core.cache import caches
+from django.test import override_settings
+
 from rest_framework.test import APITestCase
 
 from apps.pokerboard import (
     utils as pokerboard_utils
 )
 from apps.pokerboard.tests import mock_data as pokerboard_mock_data
+from poker.celery import app as celery_app
+
+
+class EagerCeleryMixin:
+    """
+    Test case mixin running celery tasks eagerly, in the test's own thread, for every test
+    """
+
+    def setUp(self: APITestCase) -> None:
+        super().setUp()
+        eager = celery_app.conf.task_always_eager
+        celery_app.conf["CELERY_TASK_ALWAYS_EAGER"] = True
+        self.addCleanup(celery_app.conf.__setitem__, "CELERY_TASK_ALWAYS_EAGER", eager)
 
 
 class JiraApiTestCases(APITestCase):
@@ -14,7 +31,7 @@ class JiraApiTestCases(APITestCase):
     Test Jira api
     """
 
-    @patch("apps.pokerboard.utils.requests.request")
+    @patch("apps.pokerboard.jira.requests.Session.request")
     def test_get_sprints(self: APITestCase, mock_get: Mock) -> None:
         """
         Test get sprints
@@ -24,7 +41,7 @@ class JiraApiTestCases(APITestCase):
         sprints = pokerboard_utils.JiraApi.get_sprints(1)
         self.assertEqual(sprints, pokerboard_mock_data.SPRINTS_RESPONSE["values"])
 
-    @patch("apps.pokerboard.utils.requests.request")
+    @patch("apps.pokerboard.jira.requests.Session.request")
     def test_get_boards(self: APITestCase, mock_get: Mock) -> None:
         """
         Test get boards
@@ -34,8 +51,8 @@ class JiraApiTestCases(APITestCase):
         boards = pokerboard_utils.JiraApi.get_boards()
         self.assertEqual(boards, pokerboard_mock_data.BOARDS_RESPONSE["values"])
 
-    @patch("apps.pokerboard.utils.JiraApi.get_boards")
-    @patch("apps.pokerboard.utils.requests.request")
+    @patch("apps.pokerboard.jira.JiraClient.get_boards")
+    @patch("apps.pokerboard.jira.requests.Session.request")
     def test_get_all_sprints(self: APITestCase, mock_get: Mock, boards_mock: Mock) -> None:
         """
         Test get all sprints
@@ -46,3 +63,53 @@ class JiraApiTestCases(APITestCase):
         sprints = pokerboard_utils.JiraApi.get_all_sprints()
         self.assertEqual(sprints, pokerboard_mock_data.SPRINTS_RESPONSE["values"])
 
+
+
+def search_stub(method: str, url: str, data: str=None, **kwargs) -> Mock:
+    """
+    Stub jira search knowing every KD issue
+    """
+    body = json.loads(data)
+    keys = re.findall(r'"([^"]+)"', body["jql"])
+    response = Mock(status_code=200)
+    response.text = json.dumps({
+        "issues": [{"key": key.upper()} for key in keys if key.upper().startswith("KD-")],
+        "warningMessages": [f"The issue key '{key}' for field 'issue' is invalid." for key in keys if not key.upper().startswith("KD-")],
+    })
+    return response
+
+
+@override_settings(JIRA_VALIDATION_CHUNK_SIZE=2)
+class ValidateTicketsTestCases(APITestCase):
+    """
+    Test ticket validation against jira
+    """
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup an empty jira cache
+        """
+        caches["jira"].clear()
+
+    @patch("apps.pokerboard.jira.requests.Session.request", side_effect=search_stub)
+    def test_validate_tickets_in_chunks(self: APITestCase, mock_request: Mock) -> None:
+        """
+        Test tickets are validated in chunks with POST searches, returning a map per ticket
+        """
+        validity = pokerboard_utils.validate_tickets(["KD-1", "KD-2", "K-3", "kd-4", "KD-5", "KD-1"])
+        self.assertDictEqual(validity, {"KD-1": True, "KD-2": True, "K-3": False, "kd-4": True, "KD-5": True})
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertTrue(all(call[0][0] == "POST" for call in mock_request.call_args_list))
+        self.assertEqual(json.loads(mock_request.call_args[1]["data"])["validateQuery"], "warn")
+
+    @patch("apps.pokerboard.jira.requests.Session.request", side_effect=search_stub)
+    def test_validated_tickets_are_cached(self: APITestCase, mock_request: Mock) -> None:
+        """
+        Test tickets validated before are not sent to jira again, invalid ones are
+        """
+        pokerboard_utils.validate_tickets(["KD-1", "KD-2", "K-3"])
+        mock_request.reset_mock()
+        validity = pokerboard_utils.validate_tickets(["KD-1", "KD-2", "K-3"])
+        self.assertDictEqual(validity, {"KD-1": True, "KD-2": True, "K-3": False})
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertIn('"K-3"', json.loads(mock_request.call_args[1]["data"])["jql"])
@@ -1,12 +1,18 @@
 import json
 import pytest
+import time
 from unittest.mock import Mock, patch
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connection
 from django.http import response
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.http import urlencode
 
+from channels import DEFAULT_CHANNEL_LAYER
+from channels.layers import channel_layers
 from channels.testing import WebsocketCommunicator
 from ddf import G
 from rest_framework.test import APITestCase
@@ -14,10 +20,19 @@ from rest_framework.test import APITestCase
 from apps.group import models as group_models
 from apps.pokerboard import (
     constants as pokerboard_constants,
-    models as pokerboard_models
+    models as pokerboard_models,
+    ranking as pokerboard_ranking,
+    store as pokerboard_store,
+    votes as pokerboard_votes
+)
+from apps.pokerboard.tests import (
+    mock_data as pokerboard_mock_data,
+    test_utils as pokerboard_test_utils
+)
+from apps.user import (
+    models as user_models,
+    serializers as user_serializers
 )
-from apps.pokerboard.tests import mock_data as pokerboard_mock_data
-from apps.user import models as user_models
 from poker.asgi import application
 
 
@@ -36,6 +51,7 @@ class PokerboardTestCases(APITestCase):
         self.pokerboard = G(pokerboard_models.Pokerboard, manager=self.user)
 
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        caches["jira"].clear()
 
     def test_create_pokerboard(self: APITestCase) -> None:
         """
@@ -146,6 +162,29 @@ class PokerboardTestCases(APITestCase):
         self.assertEqual(response.status_code, 400)
         self.assertDictEqual(expected_data, response.data)
 
+    @patch("apps.pokerboard.jira.requests.Session.request", side_effect=pokerboard_test_utils.search_stub)
+    def test_create_pokerboard_reports_each_invalid_ticket(self: APITestCase, mock_request: Mock) -> None:
+        """
+        Test create pokerboard names every invalid ticket
+        """
+        data = {
+            "title": "Marvel",
+            "description": "Take down thanos",
+            "duration": 60,
+            "estimation_type": pokerboard_models.Pokerboard.FIBONACCI,
+            "tickets": ["KD-1", "K-2", "KD-3", "K-4"]
+        }
+        expected_data = {
+            "non_field_errors": [
+                "The issue key 'K-2' for field 'issue' is invalid.",
+                "The issue key 'K-4' for field 'issue' is invalid.",
+            ]
+        }
+        response = self.client.post(self.POKERBOARD_URL, data=data)
+        self.assertEqual(response.status_code, 400)
+        self.assertDictEqual(expected_data, response.data)
+        self.assertFalse(pokerboard_models.Pokerboard.objects.filter(title=data["title"]).exists())
+
     def test_create_pokerboard_with_empty_tickets_array(self: APITestCase) -> None:
         """
         Test create pokerboard with empty tickets array
@@ -218,6 +257,76 @@ class PokerboardTestCases(APITestCase):
         self.assertListEqual(expected_data, response.data)
 
 
+    def test_pokerboard_list_summary(self: APITestCase) -> None:
+        """
+        Test list pokerboards in the summary representation
+        """
+        G(pokerboard_models.Ticket, pokerboard=self.pokerboard, n=2)
+        expected_data = [
+            {
+                "id": self.pokerboard.id,
+                "title": self.pokerboard.title,
+                "description": self.pokerboard.description,
+                "duration": self.pokerboard.duration,
+                "estimation_type": self.pokerboard.estimation_type,
+                "status": self.pokerboard.status,
+                "created_at": self.pokerboard.created_at.strftime(pokerboard_constants.DATETIME_FORMAT),
+                "ticket_count": 2,
+                "manager": {
+                    "id": self.pokerboard.manager.id,
+                    "email": self.pokerboard.manager.email,
+                    "first_name": self.pokerboard.manager.first_name,
+                    "last_name": self.pokerboard.manager.last_name,
+                }
+            }
+        ]
+
+        response = self.client.get(self.POKERBOARD_URL, {"view": "summary"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data["next"])
+        self.assertListEqual(expected_data, response.data["results"])
+
+    def test_pokerboard_list_summary_pagination(self: APITestCase) -> None:
+        """
+        Test summary listing is cursor paginated, newest pokerboard first, including invited pokerboards
+        """
+        invited = G(pokerboard_models.Pokerboard)
+        G(pokerboard_models.Invite, pokerboard=invited, invitee=self.user.email, is_accepted=True)
+        G(pokerboard_models.Invite, pokerboard=G(pokerboard_models.Pokerboard), invitee=self.user.email)
+        newest = G(pokerboard_models.Pokerboard, manager=self.user)
+
+        response = self.client.get(self.POKERBOARD_URL, {"view": "summary", "page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual([newest.id, invited.id], [board["id"] for board in response.data["results"]])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual([self.pokerboard.id], [board["id"] for board in response.data["results"]])
+        self.assertIsNone(response.data["next"])
+
+    def test_pokerboard_list_query_count(self: APITestCase) -> None:
+        """
+        Test listing pokerboards takes as many queries for many pokerboards as for one
+        """
+        def count_queries(params: dict) -> int:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.POKERBOARD_URL, params)
+            self.assertEqual(response.status_code, 200)
+            return len(context.captured_queries)
+
+        # warm up the token cache, so only the listing itself is counted
+        self.client.get(self.POKERBOARD_URL)
+        few = [count_queries({}), count_queries({"view": "summary"})]
+
+        for _ in range(5):
+            pokerboard = G(pokerboard_models.Pokerboard, manager=G(get_user_model()))
+            G(pokerboard_models.Ticket, pokerboard=pokerboard, n=3)
+            G(pokerboard_models.Invite, pokerboard=pokerboard, invitee=self.user.email, is_accepted=True)
+        G(pokerboard_models.Ticket, pokerboard=self.pokerboard, n=3)
+
+        self.assertListEqual(few, [count_queries({}), count_queries({"view": "summary"})])
+
+
 class SuggestionsTestCases(APITestCase):
     """
     Test Suggestion API
@@ -231,6 +340,7 @@ class SuggestionsTestCases(APITestCase):
         self.user = G(get_user_model())
         token = G(user_models.Token, user=self.user)
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        caches["jira"].clear()
 
     def test_suggestions(self: APITestCase) -> None:
         """
@@ -342,6 +452,100 @@ class TicketOrderTestCases(APITestCase):
         self.assertListEqual(expected_data, response.data)
 
 
+    def ordered_ticket_ids(self: APITestCase) -> list:
+        """
+        Ticket ids of the pokerboard by rank
+        """
+        return list(self.pokerboard.tickets.order_by("rank").values_list("ticket_id", flat=True))
+
+    def test_order_tickets_keeps_unlisted_tickets_in_place(self: APITestCase) -> None:
+        """
+        Test reordering a subset of tickets with one SELECT and one UPDATE, leaving the rest untouched
+        """
+        estimated = G(pokerboard_models.Ticket, pokerboard=self.pokerboard, rank=3, estimate=5)
+        last = G(pokerboard_models.Ticket, pokerboard=self.pokerboard, rank=4)
+        data = [
+            {"ticket_id": last.ticket_id, "rank": 1},
+            {"ticket_id": self.tickets[1].ticket_id, "rank": 2},
+            {"ticket_id": self.tickets[0].ticket_id, "rank": 3},
+        ]
+        # savepoint, board lock, select, update, release
+        with self.assertNumQueries(5):
+            pokerboard_ranking.reorder(self.pokerboard.id, [ticket["ticket_id"] for ticket in data])
+        expected = [last.ticket_id, self.tickets[1].ticket_id, estimated.ticket_id, self.tickets[0].ticket_id]
+        self.assertListEqual(expected, self.ordered_ticket_ids())
+
+    def test_order_tickets_with_unknown_ticket(self: APITestCase) -> None:
+        """
+        Test ordering fails instead of mis-pairing ranks when a ticket is not on the pokerboard
+        """
+        data = [
+            {"ticket_id": self.tickets[1].ticket_id, "rank": 1},
+            {"ticket_id": "UNKNOWN-1", "rank": 2},
+        ]
+        response = self.client.put(reverse("order-tickets", args=[self.pokerboard.id]), data=data, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertListEqual(["Tickets not on this pokerboard: UNKNOWN-1"], response.data)
+        self.assertListEqual([ticket.ticket_id for ticket in self.tickets], self.ordered_ticket_ids())
+
+    def test_move_ticket(self: APITestCase) -> None:
+        """
+        Test moving a ticket after another only changes the moved ticket
+        """
+        pokerboard_models.Ticket.objects.filter(id=self.tickets[1].id).update(rank=10)
+        last = G(pokerboard_models.Ticket, pokerboard=self.pokerboard, rank=11)
+        data = {"ticket_id": last.ticket_id, "after": self.tickets[0].ticket_id}
+        response = self.client.patch(reverse("order-tickets", args=[self.pokerboard.id]), data=data, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["ticket_id"], last.ticket_id)
+        self.assertListEqual(
+            [self.tickets[0].ticket_id, last.ticket_id, self.tickets[1].ticket_id], self.ordered_ticket_ids()
+        )
+        self.assertListEqual([1, 10], [ticket.rank for ticket in self.pokerboard.tickets.exclude(id=last.id).order_by("rank")])
+
+    def test_move_ticket_to_top(self: APITestCase) -> None:
+        """
+        Test moving a ticket to the top of the list
+        """
+        data = {"ticket_id": self.tickets[1].ticket_id, "after": None}
+        response = self.client.patch(reverse("order-tickets", args=[self.pokerboard.id]), data=data, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual([self.tickets[1].ticket_id, self.tickets[0].ticket_id], self.ordered_ticket_ids())
+
+    def test_move_ticket_without_room_rebalances(self: APITestCase) -> None:
+        """
+        Test moving a ticket between neighbouring ranks spreads the ranks out first
+        """
+        last = G(pokerboard_models.Ticket, pokerboard=self.pokerboard, rank=3)
+        pokerboard_ranking.move_after(self.pokerboard.id, last.ticket_id, self.tickets[0].ticket_id)
+        self.assertListEqual(
+            [self.tickets[0].ticket_id, last.ticket_id, self.tickets[1].ticket_id], self.ordered_ticket_ids()
+        )
+        ranks = list(self.pokerboard.tickets.order_by("rank").values_list("rank", flat=True))
+        self.assertListEqual([pokerboard_constants.TICKET_RANK_GAP, pokerboard_constants.TICKET_RANK_GAP * 3 // 2,
+                              pokerboard_constants.TICKET_RANK_GAP * 2], ranks)
+
+    def test_move_ticket_other_user_cannot_move(self: APITestCase) -> None:
+        """
+        Test only the pokerboard's manager can move its tickets
+        """
+        token = G(user_models.Token, user=G(get_user_model()))
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        data = {"ticket_id": self.tickets[1].ticket_id, "after": None}
+        response = self.client.patch(reverse("order-tickets", args=[self.pokerboard.id]), data=data, format="json")
+        self.assertEqual(response.status_code, 403)
+        self.assertListEqual([ticket.ticket_id for ticket in self.tickets], self.ordered_ticket_ids())
+
+    def test_move_unknown_ticket(self: APITestCase) -> None:
+        """
+        Test moving a ticket after one that is not on the pokerboard
+        """
+        data = {"ticket_id": self.tickets[1].ticket_id, "after": "UNKNOWN-1"}
+        response = self.client.patch(reverse("order-tickets", args=[self.pokerboard.id]), data=data, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertListEqual(["Tickets not on this pokerboard: UNKNOWN-1"], response.data)
+
+
 class JqlTestCases(APITestCase):
     """
     Test jql API
@@ -355,8 +559,9 @@ class JqlTestCases(APITestCase):
         self.user = G(get_user_model())
         token = G(user_models.Token, user=self.user)
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        caches["jira"].clear()
 
-    @patch("apps.pokerboard.utils.requests.request")
+    @patch("apps.pokerboard.jira.requests.Session.request")
     def test_search_jql(self: APITestCase, mock_get: Mock) -> None:
         """
         Creates group, check for it's name and default group member
@@ -368,7 +573,77 @@ class JqlTestCases(APITestCase):
         mock_get.return_value.text = json.dumps(pokerboard_mock_data.JQL_RESPONSE)
         response = self.client.get(f"{self.JQL_URL}?{urlencode(kwargs)}")
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(response.data, pokerboard_mock_data.JQL_RESPONSE)
+        self.assertEqual(response.data, dict(pokerboard_mock_data.JQL_RESPONSE, next=None, previous=None))
+
+    def search_page(self: APITestCase, start_at: int, count: int, total: int) -> Mock:
+        """
+        Mocked jira search response
+        """
+        page = Mock(status_code=200)
+        page.text = json.dumps({
+            "startAt": start_at,
+            "maxResults": count,
+            "total": total,
+            "issues": [{"key": f"KD-{idx}"} for idx in range(start_at, start_at + count)],
+        })
+        return page
+
+    @patch("apps.pokerboard.jira.requests.Session.request")
+    def test_search_jql_pages(self: APITestCase, mock_get: Mock) -> None:
+        """
+        Test following the next cursor fetches the next page from jira
+        """
+        kwargs = {
+            "jql": "project = KD",
+            "fields": "summary,status",
+            "page_size": 50,
+        }
+        mock_get.return_value = self.search_page(0, 50, 120)
+        response = self.client.get(f"{self.JQL_URL}?{urlencode(kwargs)}")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data["previous"])
+        self.assertIn("fields=summary%2Cstatus", mock_get.call_args[0][1])
+
+        mock_get.return_value = self.search_page(50, 50, 120)
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("startAt=50", mock_get.call_args[0][1])
+        self.assertEqual(response.data["issues"][0]["key"], "KD-50")
+        self.assertIsNotNone(response.data["next"])
+        self.assertIsNotNone(response.data["previous"])
+
+        mock_get.return_value = self.search_page(100, 20, 120)
+        response = self.client.get(response.data["next"])
+        self.assertIsNone(response.data["next"])
+
+    def test_search_jql_invalid_cursor(self: APITestCase) -> None:
+        """
+        Test a malformed cursor is rejected
+        """
+        kwargs = {
+            "jql": "project = KD",
+            "cursor": "not-a-cursor",
+        }
+        response = self.client.get(f"{self.JQL_URL}?{urlencode(kwargs)}")
+        self.assertEqual(response.status_code, 400)
+        self.assertDictEqual(response.data, {"cursor": ["Invalid cursor"]})
+
+    @patch("apps.pokerboard.jira.requests.Session.request")
+    def test_search_jql_stream(self: APITestCase, mock_get: Mock) -> None:
+        """
+        Test streaming returns every matching issue as newline delimited JSON
+        """
+        kwargs = {
+            "jql": "project = KD",
+            "stream": "true",
+        }
+        mock_get.side_effect = [self.search_page(0, 100, 250), self.search_page(100, 100, 250), self.search_page(200, 50, 250)]
+        response = self.client.get(f"{self.JQL_URL}?{urlencode(kwargs)}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        issues = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertListEqual([issue["key"] for issue in issues], [f"KD-{idx}" for idx in range(250)])
+        self.assertEqual(mock_get.call_count, 3)
 
 
 class CommentTestCases(APITestCase):
@@ -384,8 +659,9 @@ class CommentTestCases(APITestCase):
         self.user = G(get_user_model())
         token = G(user_models.Token, user=self.user)
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        caches["jira"].clear()
 
-    @patch("apps.pokerboard.utils.requests.request")
+    @patch("apps.pokerboard.jira.requests.Session.request")
     def test_get_comments(self: APITestCase, mock_get: Mock) -> None:
         """
         Test Get comments for an issue
@@ -396,7 +672,17 @@ class CommentTestCases(APITestCase):
         self.assertEqual(response.status_code, 200)
         self.assertListEqual(response.data, pokerboard_mock_data.COMMENTS_REPONSE["comments"])
 
-    @patch("apps.pokerboard.utils.requests.request")
+    @patch("apps.pokerboard.jira.requests.Session.request")
+    def test_get_comments_without_issue(self: APITestCase, mock_get: Mock) -> None:
+        """
+        Test get comments without an issue is rejected before reaching the cache or jira
+        """
+        response = self.client.get(self.COMMENTS_URL)
+        self.assertEqual(response.status_code, 400)
+        self.assertDictEqual(response.data, {"issueId": ["This field is required."]})
+        mock_get.assert_not_called()
+
+    @patch("apps.pokerboard.jira.requests.Session.request")
     def test_post_comments(self: APITestCase, mock_get: Mock) -> None:
         """
         Test post comment on an issue
@@ -480,8 +766,9 @@ class InviteTestCases(APITestCase):
 
     def test_invite_group(self):
         """
-        Invites group
+        Invites group, its creator is invited already so only the other member gets an invite
         """
+        G(group_models.GroupMember, group=self.group2)
         data = {
             "type": pokerboard_models.Invite.GROUP,
             "group": self.group2,
@@ -691,6 +978,45 @@ class SessionTestCases(APITestCase):
         self.assertEqual(response.status_code, 400)
         self.assertDictEqual(expected_data, response.data)
 
+    def test_create_second_active_session(self: APITestCase) -> None:
+        """
+        Test a pokerboard can not have two sessions in progress, even when the check is raced
+        """
+        G(pokerboard_models.GameSession, ticket=self.ticket)
+        other_ticket = G(pokerboard_models.Ticket, pokerboard=self.pokerboard)
+        expected_data = {
+            "ticket": [
+                "An active game session already exists for this pokerboard"
+            ]
+        }
+        response = self.client.post(self.CREATE_SESSION_URL, data={"ticket": other_ticket.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertDictEqual(expected_data, response.data)
+
+        with patch("apps.pokerboard.serializers.GameSessionSerializer.validate_ticket", side_effect=lambda ticket: ticket):
+            response = self.client.post(self.CREATE_SESSION_URL, data={"ticket": other_ticket.id})
+        self.assertEqual(response.status_code, 400)
+        self.assertDictEqual(expected_data, response.data)
+        self.assertEqual(pokerboard_models.GameSession.objects.filter(pokerboard=self.pokerboard).count(), 1)
+
+    def test_session_copies_pokerboard_of_ticket(self: APITestCase) -> None:
+        """
+        Test a session belongs to the pokerboard of its ticket
+        """
+        session = G(pokerboard_models.GameSession, ticket=self.ticket, status=pokerboard_models.GameSession.SKIPPED)
+        self.assertEqual(session.pokerboard_id, self.pokerboard.id)
+
+    def test_session_save_does_not_fetch_ticket(self: APITestCase) -> None:
+        """
+        Test saving a loaded session is one query, its ticket is not fetched for the pokerboard
+        """
+        session = G(pokerboard_models.GameSession, ticket=self.ticket, status=pokerboard_models.GameSession.SKIPPED)
+        session = pokerboard_models.GameSession.objects.get(id=session.id)
+        session.status = pokerboard_models.GameSession.ESTIMATED
+        with self.assertNumQueries(1):
+            session.save()
+        self.assertEqual(session.pokerboard_id, self.pokerboard.id)
+
     def test_get_active_session_does_not_exist(self: APITestCase) -> None:
         """
         Test get active session when active session does not exist
@@ -743,7 +1069,7 @@ class SessionTestCases(APITestCase):
         self.assertListEqual(expected_data, response.data)
 
 
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=True)
 @pytest.mark.asyncio
 class TestWebsocket:
     """
@@ -759,6 +1085,9 @@ class TestWebsocket:
         self.pokerboard = G(pokerboard_models.Pokerboard, manager=self.user)
         self.ticket = G(pokerboard_models.Ticket, pokerboard=self.pokerboard, estimate=None)
         self.session = G(pokerboard_models.GameSession, ticket=self.ticket, status=pokerboard_models.GameSession.IN_PROGRESS)
+        pokerboard_store.get_store().flushall()
+        cache.clear()
+        channel_layers.backends.pop(DEFAULT_CHANNEL_LAYER, None)
     
     async def test_websocket_connect(self, setup):
         """
@@ -767,8 +1096,41 @@ class TestWebsocket:
         communicator = WebsocketCommunicator(application, f"/session/{self.session.id}?token={self.token.key}")
         connected, subprotocol = await communicator.connect()
 
+        assert connected
+        res = json.loads(await communicator.receive_from())
+        expected_data = {
+            'type': 'join',
+            'user': {
+                'id': self.user.id,
+                'email': self.user.email,
+                'first_name': self.user.first_name,
+                'last_name': self.user.last_name
+            },
+            'seq': 1
+        }
+        assert res == expected_data
+
+    async def test_websocket_disconnect_broadcasts_leave(self, setup):
+        """
+        Test remaining users receive only the user who left
+        """
+        user_2 = G(get_user_model())
+        token = G(user_models.Token, user=user_2)
+        G(pokerboard_models.Invite, invitee=user_2.email, pokerboard=self.pokerboard, is_accepted=True, role=pokerboard_models.Invite.CONTRIBUTOR)
+        communicator = WebsocketCommunicator(application, f"/session/{self.session.id}?token={self.token.key}")
+        connected, subprotocol = await communicator.connect()
         assert connected
         await communicator.receive_from()
+        communicator_2 = WebsocketCommunicator(application, f"/session/{self.session.id}?token={token.key}")
+        connected, subprotocol = await communicator_2.connect()
+        assert connected
+        await communicator.receive_from()
+        await communicator_2.receive_from()
+
+        await communicator_2.disconnect()
+        res = json.loads(await communicator.receive_from())
+        assert res["type"] == "leave"
+        assert res["user"]["id"] == user_2.id
  
     async def test_websocket_connect_cannot_connect_estimated_session(self, setup):
         """
@@ -791,7 +1153,7 @@ class TestWebsocket:
         await communicator.receive_from()
         await communicator.send_json_to({"message_type": "skip", "message": "skip"})
         res = json.loads(await communicator.receive_from())
-        expected_data = {"type": "skip"}
+        expected_data = {"type": "skip", "seq": 2}
         assert res == expected_data
 
     async def test_websocket_skip_other_user_cannot_skip(self, setup):
@@ -832,10 +1194,134 @@ class TestWebsocket:
                 'last_name': self.user.last_name
                 }
             ],
-            'timer': 'null'
+            'timer': 'null',
+            'deadline': None,
+            'seq': 1
         }
+        assert abs(res.pop('server_time') - time.time()) < 5
         assert res == expected_data
 
+    async def test_websocket_initialise_game_only_to_sender(self, setup):
+        """
+        Test the snapshot goes to the user asking for it, not to everyone in the session
+        """
+        user_2 = G(get_user_model())
+        token = G(user_models.Token, user=user_2)
+        G(pokerboard_models.Invite, invitee=user_2.email, pokerboard=self.pokerboard, is_accepted=True, role=pokerboard_models.Invite.CONTRIBUTOR)
+        communicator = WebsocketCommunicator(application, f"/session/{self.session.id}?token={self.token.key}")
+        connected, subprotocol = await communicator.connect()
+        assert connected
+        await communicator.receive_from()
+        communicator_2 = WebsocketCommunicator(application, f"/session/{self.session.id}?token={token.key}")
+        connected, subprotocol = await communicator_2.connect()
+        assert connected
+        await communicator.receive_from()
+        await communicator_2.receive_from()
+
+        await communicator_2.send_json_to({"message_type": "initialise_game", "message": "initialise_game"})
+        res = json.loads(await communicator_2.receive_from())
+        assert res["type"] == "initialise_game"
+        assert len(res["users"]) == 2
+        assert await communicator.receive_nothing()
+
+    async def test_websocket_vote_estimate_to_managers_only(self, setup):
+        """
+        Test everyone is told who voted as a session event, and only the manager is then sent the estimate
+        """
+        user_2 = G(get_user_model())
+        token = G(user_models.Token, user=user_2)
+        G(pokerboard_models.Invite, invitee=user_2.email, pokerboard=self.pokerboard, is_accepted=True, role=pokerboard_models.Invite.CONTRIBUTOR)
+        communicator = WebsocketCommunicator(application, f"/session/{self.session.id}?token={self.token.key}")
+        connected, subprotocol = await communicator.connect()
+        assert connected
+        await communicator.receive_from()
+        communicator_2 = WebsocketCommunicator(application, f"/session/{self.session.id}?token={token.key}")
+        connected, subprotocol = await communicator_2.connect()
+        assert connected
+        await communicator.receive_from()
+        await communicator_2.receive_from()
+
+        await communicator_2.send_json_to({"message_type": "vote", "message": {"estimate": 3}})
+        vote = {"game_session": self.session.id, "user": user_serializers.UserSerializer(user_2).data}
+        assert json.loads(await communicator_2.receive_from()) == {"type": "vote", "seq": 3, "vote": vote}
+        assert json.loads(await communicator.receive_from()) == {"type": "vote", "seq": 3, "vote": vote}
+        assert json.loads(await communicator.receive_from()) == {"type": "vote", "vote": dict(vote, estimate=3)}
+        assert await communicator_2.receive_nothing()
+
+        await communicator.send_json_to({"message_type": "vote", "message": {"estimate": 5}})
+        await communicator_2.receive_from()
+        await communicator_2.send_json_to({"message_type": "initialise_game", "message": {"since": None}})
+        res = json.loads(await communicator_2.receive_from())
+        assert sorted((vote["user"]["id"], vote.get("estimate")) for vote in res["votes"]) == sorted([
+            (self.user.id, None), (user_2.id, 3)
+        ])
+
+    async def test_websocket_join_fan_out(self, setup):
+        """
+        Test a client joining and syncing sends the others only the joined user, and itself one snapshot
+        """
+        user_2 = G(get_user_model())
+        token = G(user_models.Token, user=user_2)
+        G(pokerboard_models.Invite, invitee=user_2.email, pokerboard=self.pokerboard, is_accepted=True, role=pokerboard_models.Invite.CONTRIBUTOR)
+        communicator = WebsocketCommunicator(application, f"/session/{self.session.id}?token={self.token.key}")
+        connected, subprotocol = await communicator.connect()
+        assert connected
+        await communicator.receive_from()
+
+        communicator_2 = WebsocketCommunicator(application, f"/session/{self.session.id}?token={token.key}")
+        connected, subprotocol = await communicator_2.connect()
+        assert connected
+        await communicator_2.send_json_to({"message_type": "initialise_game", "message": {"since": None}})
+        received = [json.loads(await communicator_2.receive_from()) for _ in range(2)]
+        assert sorted(message["type"] for message in received) == ["initialise_game", "join"]
+        assert json.loads(await communicator.receive_from()) == {
+            "type": "join", "seq": 2, "user": user_serializers.UserSerializer(user_2).data
+        }
+        assert await communicator.receive_nothing()
+
+    async def test_websocket_initialise_game_since(self, setup):
+        """
+        Test a client resyncing gets only the events it missed, in order
+        """
+        communicator = WebsocketCommunicator(application, f"/session/{self.session.id}?token={self.token.key}")
+        connected, subprotocol = await communicator.connect()
+        assert connected
+        join = json.loads(await communicator.receive_from())
+        for estimate in (3, 5):
+            await communicator.send_json_to({"message_type": "vote", "message": {"estimate": estimate}})
+            await communicator.receive_from()
+            await communicator.receive_from()
+
+        await communicator.send_json_to({"message_type": "initialise_game", "message": {"since": join["seq"]}})
+        res = json.loads(await communicator.receive_from())
+        assert res["type"] == "initialise_game"
+        assert res["seq"] == 3
+        assert [(event["type"], event["seq"], "estimate" in event["vote"]) for event in res["events"]] == [
+            ("vote", 2, False), ("vote", 3, False)
+        ]
+        assert [vote["estimate"] for vote in res["votes"]] == [5]
+        assert "users" not in res
+
+    async def test_websocket_initialise_game_since_rolled_over(self, setup, settings):
+        """
+        Test a client further behind than the event buffer gets a snapshot
+        """
+        settings.SESSION_EVENT_BUFFER_SIZE = 2
+        communicator = WebsocketCommunicator(application, f"/session/{self.session.id}?token={self.token.key}")
+        connected, subprotocol = await communicator.connect()
+        assert connected
+        await communicator.receive_from()
+        for estimate in (1, 2, 3):
+            await communicator.send_json_to({"message_type": "vote", "message": {"estimate": estimate}})
+            await communicator.receive_from()
+            await communicator.receive_from()
+
+        await communicator.send_json_to({"message_type": "initialise_game", "message": {"since": 1}})
+        res = json.loads(await communicator.receive_from())
+        assert res["seq"] == 4
+        assert "events" not in res
+        assert [vote["estimate"] for vote in res["votes"]] == [3]
+
     async def test_websocket_start_timer(self, setup):
         """
         Test start timer message
@@ -850,6 +1336,74 @@ class TestWebsocket:
         assert res["type"] == "start_timer"
         assert "timer_started_at" in res.keys()
 
+    async def test_websocket_timer_reveals_votes(self, setup, settings):
+        """
+        Test the server ends voting when the timer runs out, announcing the final votes
+        """
+        # the vote reaches the database with the reveal, not with a periodic flush racing it on sqlite
+        settings.VOTE_FLUSH_INTERVAL = 60
+        self.pokerboard.duration = 1
+        self.pokerboard.save()
+        communicator = WebsocketCommunicator(application, f"/session/{self.session.id}?token={self.token.key}")
+        connected, subprotocol = await communicator.connect()
+        assert connected
+        await communicator.receive_from()
+
+        await communicator.send_json_to({"message_type": "start_timer", "message": "start_timer"})
+        res = json.loads(await communicator.receive_from())
+        assert res["type"] == "start_timer"
+        assert 0 < res["deadline"] - res["server_time"] <= 1
+        await communicator.send_json_to({"message_type": "vote", "message": {"estimate": 3}})
+        await communicator.receive_from()
+        await communicator.receive_from()
+
+        res = json.loads(await communicator.receive_from(timeout=5))
+        assert res["type"] == "reveal"
+        assert [(vote["user"]["id"], vote["estimate"]) for vote in res["votes"]] == [(self.user.id, 3)]
+        await communicator.send_json_to({"message_type": "vote", "message": {"estimate": 5}})
+        assert json.loads(await communicator.receive_from()) == {"error": "Voting time is over"}
+
+    async def test_websocket_timer_closes_session(self, setup, settings):
+        """
+        Test the server skips the session when the timer runs out with the close action, and the manager
+        can no longer estimate it
+        """
+        settings.VOTE_FLUSH_INTERVAL = 60
+        settings.SESSION_TIMER_ACTION = "close"
+        self.pokerboard.duration = 1
+        self.pokerboard.save()
+        communicator = WebsocketCommunicator(application, f"/session/{self.session.id}?token={self.token.key}")
+        connected, subprotocol = await communicator.connect()
+        assert connected
+        await communicator.receive_from()
+
+        await communicator.send_json_to({"message_type": "start_timer", "message": "start_timer"})
+        await communicator.receive_from()
+        res = json.loads(await communicator.receive_from(timeout=5))
+        assert res["type"] == "skip"
+        await communicator.send_json_to({"message_type": "estimate", "message": {"estimate": 3}})
+        assert "error" in json.loads(await communicator.receive_from())
+        self.ticket.refresh_from_db()
+        assert self.ticket.estimate is None
+        assert pokerboard_models.GameSession.objects.get(id=self.session.id).status == pokerboard_models.GameSession.SKIPPED
+
+    async def test_websocket_estimate_session_finished_elsewhere(self, setup):
+        """
+        Test the manager can not estimate a session another worker finished, which this socket was not told of
+        """
+        communicator = WebsocketCommunicator(application, f"/session/{self.session.id}?token={self.token.key}")
+        connected, subprotocol = await communicator.connect()
+        assert connected
+        await communicator.receive_from()
+
+        pokerboard_models.GameSession.objects.filter(id=self.session.id).update(
+            status=pokerboard_models.GameSession.SKIPPED
+        )
+        await communicator.send_json_to({"message_type": "estimate", "message": {"estimate": 3}})
+        assert json.loads(await communicator.receive_from()) == {"error": "Session is already over"}
+        self.ticket.refresh_from_db()
+        assert self.ticket.estimate is None
+
     async def test_websocket_start_timer_other_user_cannot_start_timer(self, setup):
         """
         Test start timer message, only manager can start timer
@@ -878,13 +1432,9 @@ class TestWebsocket:
 
         await communicator.send_json_to({"message_type": "vote", "message": {"estimate": 6}})
         res = json.loads(await communicator.receive_from())
-        vote = pokerboard_models.Vote.objects.get(user=self.user, game_session=self.session)
-        assert vote
         expected_data = {
             'type': 'vote',
             'vote': {
-                "id": vote.id,
-                "estimate": vote.estimate,
                 "game_session": self.session.id,
                 'user': {
                     'id': self.user.id,
@@ -893,8 +1443,58 @@ class TestWebsocket:
                     'last_name': self.user.last_name
                 },
             },
+            'seq': 2,
         }
         assert res == expected_data
+        res = json.loads(await communicator.receive_from())
+        expected_data = {
+            'type': 'vote',
+            'vote': dict(expected_data['vote'], estimate=6),
+        }
+        assert res == expected_data
+        pokerboard_votes.vote_buffer.flush(self.session.id)
+        vote = pokerboard_models.Vote.objects.get(user=self.user, game_session=self.session)
+        assert vote.estimate == 6
+
+    async def test_websocket_skip_persists_pending_votes(self, setup):
+        """
+        Test buffered votes are written when the manager ends the session
+        """
+        communicator = WebsocketCommunicator(application, f"/session/{self.session.id}?token={self.token.key}")
+        connected, subprotocol = await communicator.connect()
+        assert connected
+        await communicator.receive_from()
+
+        await communicator.send_json_to({"message_type": "vote", "message": {"estimate": 3}})
+        await communicator.receive_from()
+        await communicator.receive_from()
+        await communicator.send_json_to({"message_type": "skip", "message": "skip"})
+        await communicator.receive_from()
+        vote = pokerboard_models.Vote.objects.get(user=self.user, game_session=self.session)
+        assert vote.estimate == 3
+
+    async def test_websocket_vote_after_session_finished(self, setup):
+        """
+        Test a socket takes no more votes once the manager finished the session from another socket
+        """
+        user_2 = G(get_user_model())
+        token = G(user_models.Token, user=user_2)
+        G(pokerboard_models.Invite, invitee=user_2.email, pokerboard=self.pokerboard, is_accepted=True, role=pokerboard_models.Invite.CONTRIBUTOR)
+        communicator = WebsocketCommunicator(application, f"/session/{self.session.id}?token={self.token.key}")
+        connected, subprotocol = await communicator.connect()
+        assert connected
+        await communicator.receive_from()
+        communicator_2 = WebsocketCommunicator(application, f"/session/{self.session.id}?token={token.key}")
+        connected, subprotocol = await communicator_2.connect()
+        assert connected
+        await communicator_2.receive_from()
+        await communicator.receive_from()
+
+        await communicator.send_json_to({"message_type": "skip", "message": "skip"})
+        assert json.loads(await communicator_2.receive_from())["type"] == "skip"
+        await communicator_2.send_json_to({"message_type": "vote", "message": {"estimate": 3}})
+        assert json.loads(await communicator_2.receive_from()) == {"error": "Voting is over"}
+        assert not pokerboard_models.Vote.objects.filter(game_session=self.session).exists()
 
     async def test_websocket_vote_invalid_estimate(self,setup):
         """
@@ -0,0 +1,94 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+
+from ddf import G
+from rest_framework.test import APITestCase
+
+from apps.pokerboard import (
+    models as pokerboard_models,
+    store as pokerboard_store,
+    votes as pokerboard_votes
+)
+
+
+class VoteBufferTestCases(APITestCase):
+    """
+    Test write-behind vote buffer
+    """
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup a game session, two users and an empty buffer on a fresh local store
+        """
+        self.users = [G(get_user_model()), G(get_user_model())]
+        self.session = G(pokerboard_models.GameSession)
+        self.store = pokerboard_store.LocalStore()
+        self.buffer = pokerboard_votes.VoteBuffer(store=self.store)
+
+    def test_flush_creates_and_updates_votes(self: APITestCase) -> None:
+        """
+        Test flush inserts new votes and updates existing ones
+        """
+        G(pokerboard_models.Vote, game_session=self.session, user=self.users[0], estimate=1)
+        self.buffer.add(self.session.id, {"id": self.users[0].id}, 5)
+        self.buffer.add(self.session.id, {"id": self.users[1].id}, 8)
+
+        self.assertEqual(self.buffer.flush(), 2)
+        votes = pokerboard_models.Vote.objects.filter(game_session=self.session).order_by("user_id")
+        self.assertListEqual([vote.estimate for vote in votes], [5, 8])
+        self.assertListEqual(self.buffer.pending(self.session.id), [])
+
+    def test_latest_vote_wins(self: APITestCase) -> None:
+        """
+        Test a user's later vote replaces the pending one
+        """
+        self.buffer.add(self.session.id, {"id": self.users[0].id}, 5)
+        self.buffer.add(self.session.id, {"id": self.users[0].id}, 3)
+        self.buffer.flush(self.session.id)
+        self.assertEqual(pokerboard_models.Vote.objects.get(user=self.users[0]).estimate, 3)
+
+    def test_merge_overlays_pending_votes(self: APITestCase) -> None:
+        """
+        Test pending votes replace persisted votes of the same user
+        """
+        persisted = [{"id": 1, "estimate": 1, "game_session": self.session.id, "user": {"id": self.users[0].id}}]
+        self.buffer.add(self.session.id, {"id": self.users[0].id}, 5)
+        merged = self.buffer.merge(self.session.id, persisted)
+        self.assertListEqual([vote["estimate"] for vote in merged], [5])
+
+    @patch("apps.pokerboard.votes.VoteBuffer._write")
+    def test_failed_flush_keeps_votes(self: APITestCase, mock_write) -> None:
+        """
+        Test votes stay pending when writing them fails
+        """
+        mock_write.side_effect = RuntimeError("database down")
+        self.buffer.add(self.session.id, {"id": self.users[0].id}, 5)
+        with self.assertRaises(RuntimeError):
+            self.buffer.flush()
+        self.assertEqual(len(self.buffer.pending(self.session.id)), 1)
+
+    def test_unwritable_vote_is_dropped(self: APITestCase) -> None:
+        """
+        Test a vote the database rejects is dropped while the other votes of its batch are written
+        """
+        G(pokerboard_models.Vote, game_session=self.session, user=self.users[0], estimate=1)
+        self.buffer.add(self.session.id, {"id": self.users[0].id}, -1)
+        self.buffer.add(self.session.id, {"id": self.users[1].id}, 8)
+
+        self.assertEqual(self.buffer.flush(), 1)
+        votes = pokerboard_models.Vote.objects.filter(game_session=self.session).order_by("user_id")
+        self.assertListEqual([vote.estimate for vote in votes], [1, 8])
+        self.assertListEqual(self.buffer.pending(self.session.id), [])
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_votes_are_shared_across_workers(self: APITestCase) -> None:
+        """
+        Test votes buffered by one worker are written by another worker's flush
+        """
+        self.buffer.add(self.session.id, {"id": self.users[0].id}, 5)
+        other = pokerboard_votes.VoteBuffer(store=self.store)
+        self.assertEqual(len(other.pending(self.session.id)), 1)
+        self.assertEqual(other.flush(self.session.id), 1)
+        self.assertEqual(pokerboard_models.Vote.objects.get(user=self.users[0]).estimate, 5)
+        self.assertListEqual(self.buffer.pending(self.session.id), [])
@@ -0,0 +1,196 @@
+import asyncio
+import heapq
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+
+from apps.pokerboard import (
+    database as pokerboard_database,
+    events as pokerboard_events,
+    models as pokerboard_models,
+    ranking as pokerboard_ranking,
+    serializers as pokerboard_serializers,
+    store as pokerboard_store,
+    votes as pokerboard_votes
+)
+
+logger = logging.getLogger(__name__)
+
+TIMERS_KEY = "timers"
+
+
+def deadline(session: pokerboard_models.GameSession) -> float:
+    """
+    Epoch seconds the voting timer of a session runs out, None if it was not started
+    """
+    if session.timer_started_at is None:
+        return None
+    return session.timer_started_at.timestamp() + session.ticket.pokerboard.duration
+
+
+def deadline_ms(deadline: float) -> int:
+    """
+    Deadline in whole epoch milliseconds, as kept in the shared store, so that deadlines compare exactly
+    """
+    return int(round(deadline * 1000))
+
+
+class TimerScheduler:
+    """
+    Fires voting timers of game sessions when they run out.
+    Each worker keeps the deadlines it knows of in a heap, served by one task sleeping until the
+    earliest. Deadlines are also kept in the shared session store, where a due timer is claimed
+    before it fires, so a timer watched by several workers fires once across the cluster.
+    The heap is guarded by a lock, as timers are cancelled from the threads finishing sessions.
+    """
+
+    def __init__(self, store=None):
+        self._store = store
+        self._lock = threading.Lock()
+        self._heap = []
+        self._deadlines = {}
+        self._wakeup = None
+        self._runner = None
+        self._runner_loop = None
+
+    @property
+    def store(self):
+        return self._store or pokerboard_store.get_store()
+
+    def start(self, session_id: int, deadline: float) -> None:
+        """
+        Starts (or restarts) a session's timer in the shared store. Every worker with sockets of
+        the session watches it once the start is broadcast.
+        """
+        self.store.zadd(TIMERS_KEY, {session_id: deadline_ms(deadline)})
+
+    def watch(self, session_id: int, deadline: float) -> None:
+        """
+        Makes this worker fire a session's timer at deadline unless another worker does first.
+        Watching a timer again with a new deadline replaces the old one.
+        """
+        with self._lock:
+            if self._deadlines.get(session_id) == deadline:
+                return
+            self._deadlines[session_id] = deadline
+            heapq.heappush(self._heap, (deadline, session_id))
+        self.ensure_runner()
+        self._wakeup.set()
+
+    def cancel(self, session_id: int) -> None:
+        """
+        Stops a session's timer, once the session is finished before it runs out
+        """
+        self.store.zrem(TIMERS_KEY, session_id)
+        with self._lock:
+            self._deadlines.pop(session_id, None)
+
+    def claim(self, session_id: int, deadline: float) -> bool:
+        """
+        Takes a due timer off the shared store, True only for the one worker that gets to fire it
+        """
+        score = self.store.zscore(TIMERS_KEY, session_id)
+        if score is None or int(score) != deadline_ms(deadline):
+            return False
+        return bool(self.store.zrem(TIMERS_KEY, session_id))
+
+    def due(self, now: float) -> list:
+        """
+        Pops timers due at now that this worker still watches, as (session id, deadline) pairs
+        """
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, session_id = heapq.heappop(self._heap)
+                # entries of restarted or cancelled timers are left in the heap and skipped here
+                if self._deadlines.get(session_id) == deadline:
+                    del self._deadlines[session_id]
+                    due.append((session_id, deadline))
+        return due
+
+    def ensure_runner(self) -> None:
+        """
+        Starts serving the heap on the running event loop, if it is not running already
+        """
+        loop = asyncio.get_event_loop()
+        if self._runner is None or self._runner.done() or self._runner_loop is not loop:
+            self._runner_loop = loop
+            self._wakeup = asyncio.Event()
+            self._runner = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        """
+        Sleeps until the earliest deadline, or until a timer is watched, and fires due timers
+        """
+        while True:
+            self._wakeup.clear()
+            timeout = self._heap[0][0] - time.time() if self._heap else None
+            if timeout is None or timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            for session_id, deadline in self.due(time.time()):
+                asyncio.ensure_future(self._fire(session_id, deadline))
+
+    async def _fire(self, session_id: int, deadline: float) -> None:
+        """
+        Expires a session if this worker claims its timer
+        """
+        try:
+            if await sync_to_async(self.claim, thread_sensitive=False)(session_id, deadline):
+                await expire(session_id)
+        except Exception:
+            logger.exception("Expiring timer of session %s failed", session_id)
+
+
+@pokerboard_database.database_sync_to_async
+def close_voting(session_id: int) -> dict:
+    """
+    Ends voting of a session whose timer ran out, returns the event announcing it.
+    SESSION_TIMER_ACTION 'reveal' announces the final votes, 'close' also skips the session.
+    """
+    # written before the transaction, votes taken off the store are not lost if it rolls back
+    pokerboard_votes.vote_buffer.flush(session_id)
+    with transaction.atomic():
+        # locked, so that the timer and a manager finishing the session at the same time do not both finish it
+        session = pokerboard_models.GameSession.objects.select_for_update().select_related(
+            "ticket__pokerboard"
+        ).filter(id=session_id, status=pokerboard_models.GameSession.IN_PROGRESS).first()
+        if session is None or session.timer_started_at is None:
+            return None
+        if settings.SESSION_TIMER_ACTION == "close":
+            session.status = pokerboard_models.GameSession.SKIPPED
+            session.timer_started_at = None
+            session.save()
+            pokerboard_ranking.move_to_end(session.ticket)
+            return {"type": "skip"}
+    votes = pokerboard_models.Vote.objects.filter(game_session=session).select_related("user")
+    return {
+        "type": "reveal",
+        "votes": pokerboard_serializers.VoteSerializer(instance=votes, many=True).data,
+    }
+
+
+async def expire(session_id: int) -> None:
+    """
+    Closes voting of a session and broadcasts it as a session event
+    """
+    message = await close_voting(session_id)
+    if message is None:
+        return
+    event = await sync_to_async(pokerboard_events.EventLog(session_id).append, thread_sensitive=False)(message)
+    await get_channel_layer().group_send(pokerboard_events.group_name(session_id), {
+        "type": "broadcast",
+        "message": event
+    })
+
+
+timer_scheduler = TimerScheduler()
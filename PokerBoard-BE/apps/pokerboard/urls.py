@@ -8,6 +8,7 @@ from apps.pokerboard import views as pokerboard_views
 router = SimpleRouter(trailing_slash=False)
 router.register('members', pokerboard_views.PokerboardMembersApiView, basename="members")
 router.register('game', pokerboard_views.GameSessionApi, basename="game-session")
+router.register('imports', pokerboard_views.ImportJobApiView, basename="imports")
 router.register('',pokerboard_views.PokerboardApiView, basename="pokerboards")
 
 urlpatterns = [
@@ -15,5 +16,6 @@ urlpatterns = [
     path("jql", pokerboard_views.JqlAPIView.as_view(), name="jql"),
     path("comment", pokerboard_views.CommentApiView.as_view(), name="comment"),
     path("suggestions", pokerboard_views.SuggestionsAPIView.as_view(), name="suggestions"),
+    path("jira/cache-stats", pokerboard_views.JiraCacheStatsApiView.as_view(), name="jira-cache-stats"),
     path("<int:pk>/order-tickets", pokerboard_views.TicketOrderApiView.as_view(), name="order-tickets"),
 ] + router.urls
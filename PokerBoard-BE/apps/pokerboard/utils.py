@@ -1,11 +1,15 @@
 import json
-import requests
-from typing import Any
+from typing import Any, Iterator
+from urllib.parse import urlencode
+
+from django.conf import settings
 
 from rest_framework.serializers import ValidationError
 
 from apps.pokerboard import (
     constants as pokerboard_constants,
+    jira as pokerboard_jira,
+    jira_cache as pokerboard_jira_cache,
     models as pokerboard_models
 )
 
@@ -16,49 +20,123 @@ class JiraApi:
     """
 
     @staticmethod
-    def query_jira(method: str, url: str, payload: Any=None, status_code: int=200):
+    def query_jira(method: str, url: str, payload: Any=None, status_code: int=200, idempotent: bool=True):
         """
         Perform a request and returns response
         """
-        if not payload:
-            payload = {}
-        response = requests.request(method, url, auth=pokerboard_constants.JIRA_AUTH, headers=pokerboard_constants.JIRA_HEADERS, data=payload)
-        if response.status_code != status_code:
-            error_msgs = ["Something went wrong"]
-            res = json.loads(response.text)
-            error_msgs = res.get("errorMessages", error_msgs)
-            raise ValidationError(error_msgs)
-        if not response.text:
-            return {}
-        return json.loads(response.text)
+        return pokerboard_jira.get_client().request(
+            method, url, payload=payload, status_code=status_code, idempotent=idempotent
+        )
 
     @staticmethod
     def get_sprints(boardId: int) -> list:
         """
         Get sprints for a given board
         """
-        sprint_res = JiraApi.query_jira("GET", f"{pokerboard_constants.JIRA_API_URL_V1}board/{boardId}/sprint")
-        return sprint_res["values"]
+        return pokerboard_jira.get_client().get_sprints(boardId)
 
     @staticmethod
     def get_boards() -> list:
         """
         Get all available boards
         """
-        boards_url = f"{pokerboard_constants.JIRA_API_URL_V1}board"
-        boards_res = JiraApi.query_jira("GET", boards_url)
-        return boards_res["values"]
+        return pokerboard_jira.get_client().get_boards()
 
     @staticmethod
     def get_all_sprints() -> list:
         """
         Fetches all sprints from all available boards
         """
-        boards = JiraApi.get_boards()
-        sprints = []
-        for board in boards:
-            sprints = sprints + JiraApi.get_sprints(board["id"])
-        return sprints
+        return pokerboard_jira.get_client().get_all_sprints()
+
+    @staticmethod
+    def get_projects() -> list:
+        """
+        Fetches all projects
+        """
+        return JiraApi.query_jira("GET", pokerboard_constants.GET_PROJECTS_URL)["results"]
+
+    @staticmethod
+    def search(jql: str, start_at: int=0, max_results: int=None, fields: list=None) -> dict:
+        """
+        Searches a page of issues by a JQL statement, with only the given fields of each issue
+        """
+        params = {"jql": jql}
+        if start_at:
+            params["startAt"] = start_at
+        if max_results:
+            params["maxResults"] = max_results
+        if fields:
+            params["fields"] = ",".join(fields)
+        return JiraApi.query_jira("GET", f"{pokerboard_constants.JIRA_API_URL_V2}search?{urlencode(params)}")
+
+    @staticmethod
+    def iter_search(jql: str, fields: list=None, page_size: int=None, start_at: int=0) -> Iterator[dict]:
+        """
+        Yields every issue matching a JQL statement, fetching one page at a time
+        """
+        while True:
+            page = JiraApi.search(jql, start_at, page_size, fields)
+            issues = page.get("issues", [])
+            yield from issues
+            start_at += len(issues)
+            if not issues or start_at >= page.get("total", 0):
+                return
+
+    @staticmethod
+    def find_issue_keys(keys: list) -> set:
+        """
+        Returns which of the issue keys exist, in one POST search which ignores invalid keys
+        """
+        payload = json.dumps({
+            "jql": f"issue IN ({json.dumps(keys)[1:-1]})",
+            "fields": ["key"],
+            "maxResults": len(keys),
+            "validateQuery": "warn",
+        })
+        res = JiraApi.query_jira("POST", f"{pokerboard_constants.JIRA_API_URL_V2}search", payload=payload)
+        return {issue["key"].upper() for issue in res.get("issues", [])}
+
+    @staticmethod
+    def get_comments(issue: str) -> list:
+        """
+        Get comments on an issue
+        """
+        return JiraApi.query_jira("GET", f"{pokerboard_constants.JIRA_API_URL_V2}issue/{issue}/comment")["comments"]
+
+    @staticmethod
+    def add_comment(issue: str, comment: str) -> None:
+        """
+        Comments on an issue
+        """
+        url = f"{pokerboard_constants.JIRA_API_URL_V2}issue/{issue}/comment"
+        JiraApi.query_jira(
+            "POST", url, payload=json.dumps({"body": comment}), status_code=201, idempotent=False
+        )
+
+
+def validate_tickets(ticket_ids: list) -> dict:
+    """
+    Maps each ticket id to whether it is an existing jira issue.
+    Ids not validated recently are checked in chunks of JIRA_VALIDATION_CHUNK_SIZE, all chunks at once.
+    """
+    ticket_ids = list(dict.fromkeys(ticket_ids))
+    valid = pokerboard_jira_cache.get_many("tickets", [ticket_id.upper() for ticket_id in ticket_ids])
+    unknown = [ticket_id for ticket_id in ticket_ids if ticket_id.upper() not in valid]
+    chunk_size = settings.JIRA_VALIDATION_CHUNK_SIZE
+    chunks = [unknown[idx:idx + chunk_size] for idx in range(0, len(unknown), chunk_size)]
+    found = set()
+    for keys in pokerboard_jira.get_client().fanout_executor.map(JiraApi.find_issue_keys, chunks):
+        found |= keys
+    pokerboard_jira_cache.set_many("tickets", {key: True for key in found})
+    return {ticket_id: ticket_id.upper() in valid or ticket_id.upper() in found for ticket_id in ticket_ids}
+
+
+def invalid_ticket_errors(validity: dict) -> list:
+    """
+    Error messages for the invalid tickets of a validate_tickets result
+    """
+    return [f"The issue key '{ticket}' for field 'issue' is invalid." for ticket, valid in validity.items() if not valid]
 
 
 def validate_vote(deck_type: int, estimate: int) -> None:
@@ -74,19 +152,3 @@ def validate_vote(deck_type: int, estimate: int) -> None:
     elif deck_type == pokerboard_models.Pokerboard.FIBONACCI:
         if estimate not in pokerboard_constants.FIBONACCI_OPTIONS:
             raise ValidationError("Invalid estimate")
-
-
-def move_ticket_to_end(ticket: pokerboard_models.Ticket) -> None:
-    """
-    move a ticket to the end of the list
-    """
-    # costs 2 db hits
-    all_tickets = ticket.pokerboard.tickets.filter(rank__gte=ticket.rank, estimate=None).order_by('rank')
-    prev_rank = ticket.rank
-    for _ticket in all_tickets:
-        if _ticket.rank == prev_rank:
-            continue
-        _ticket.rank, prev_rank = prev_rank, _ticket.rank
-    
-    all_tickets.first().rank = prev_rank
-    pokerboard_models.Ticket.objects.bulk_update(all_tickets, ['rank'])
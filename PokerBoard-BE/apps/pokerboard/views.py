@@ -1,51 +1,112 @@
 import json
+import logging
 from typing import Any
 from typing_extensions import OrderedDict
 
+from django.db.models import Count
 from django.db.models.query import QuerySet
-from django.db.models.query_utils import Q
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 
 from rest_framework import status
+from rest_framework.exceptions import APIException
 from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveAPIView, UpdateAPIView
 from rest_framework.mixins import CreateModelMixin, RetrieveModelMixin
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.serializers import Serializer
 from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
 from apps.pokerboard import (
     constants as pokerboard_constants,
+    jira_cache as pokerboard_jira_cache,
     models as pokerboard_models,
+    pagination as pokerboard_pagination,
     permissions as pokerboard_permissions,
     serializers as pokerboard_serializers,
+    tasks as pokerboard_tasks,
     utils as pokerboard_utils
 )
 
+logger = logging.getLogger(__name__)
+
 
 class PokerboardApiView(ModelViewSet):
     """
     Pokerboard API for getting pokerboard list/details, and creating pokerboard.
+    Listing with ?view=summary returns cursor paginated pokerboards carrying ticket counts instead of tickets.
     """
 
     http_method_names = ["get", "post"]
 
+    @property
+    def is_summary(self: ModelViewSet) -> bool:
+        """
+        Checks if pokerboards are listed in the summary representation
+        """
+        return self.action == "list" and self.request.query_params.get("view") == "summary"
+
+    @property
+    def pagination_class(self: ModelViewSet) -> Any:
+        """
+        Only the summary listing is paginated, the full listing stays a plain list
+        """
+        return pokerboard_pagination.PokerboardCursorPagination if self.is_summary else None
+
     def get_serializer_class(self: ModelViewSet) -> Serializer:
         """
         Get serializer class based on request's method
         """
         if self.request.method == "POST":
             return pokerboard_serializers.CreatePokerboardSerializer
+        if self.is_summary:
+            return pokerboard_serializers.PokerboardSummarySerializer
         return pokerboard_serializers.PokerboardSerializer
 
     def get_queryset(self: ModelViewSet) -> QuerySet:
         """
-        Get pokerboards a user can access
+        Get pokerboards a user is a member of. A user has one membership per pokerboard so no DISTINCT is needed,
+        and managers are joined, keeping the number of queries independent of the number of pokerboards.
         """
         queryset = pokerboard_models.Pokerboard.objects.filter(
-            Q(manager=self.request.user) | Q(invite__invitee=self.request.user, invite__is_accepted=True)
-        ).prefetch_related("tickets").distinct()
-        return queryset
+            memberships__user=self.request.user
+        ).select_related("manager")
+        if self.is_summary:
+            return queryset.annotate(ticket_count=Count("tickets"))
+        return queryset.prefetch_related("tickets")
+
+
+class ImportJobApiView(GenericViewSet, CreateModelMixin, RetrieveModelMixin):
+    """
+    Import job API for creating a pokerboard in the background and following the import's progress
+    """
+    serializer_class = pokerboard_serializers.ImportJobSerializer
+
+    def get_serializer_class(self: GenericViewSet) -> Serializer:
+        """
+        Get serializer class based on request's method
+        """
+        if self.request.method == "POST":
+            return pokerboard_serializers.ImportPokerboardSerializer
+        return pokerboard_serializers.ImportJobSerializer
+
+    def get_queryset(self: GenericViewSet) -> QuerySet:
+        """
+        Get import jobs of the user
+        """
+        return pokerboard_models.ImportJob.objects.filter(manager=self.request.user)
+
+    def create(self: GenericViewSet, request: OrderedDict, *args, **kwargs) -> Response:
+        """
+        Queues an import job, its progress is available at once
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save()
+        pokerboard_tasks.import_pokerboard_task.delay(job.id)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
 
 
 class JqlAPIView(RetrieveAPIView):
@@ -54,17 +115,67 @@ class JqlAPIView(RetrieveAPIView):
     Get Issues for a project - project IN ("<project-name>")
     Get issues for a sprint - sprint IN ("sprint-name")
     Get issues from issues Id's list - issues IN ("KD-1", "KD-2")
+
+    fields=summary,status limits issues to those fields. Pages follow jira's startAt/total,
+    the response links the next/previous page cursors. stream=true instead returns every
+    matching issue as newline delimited JSON, fetched from jira page by page.
     """
     def get(self: RetrieveAPIView, request: OrderedDict) -> Response:
         """
         Fetch JQL response given a JQL statement
         """
-        jql = request.GET.get("jql")
-        url = f"{pokerboard_constants.JIRA_API_URL_V2}search?jql={jql}"
-
-        res = pokerboard_utils.JiraApi.query_jira("GET", url)
+        serializer = pokerboard_serializers.JqlQuerySerializer(data=request.GET)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+        jql = query["jql"]
+        fields = query.get("fields")
+        start_at = query.get("cursor", 0)
+        page_size = query.get("page_size")
+
+        if query["stream"]:
+            return self.stream(jql, fields, page_size, start_at)
+
+        key = json.dumps([jql, fields, start_at, page_size])
+        res = pokerboard_jira_cache.cached(
+            "search", key, lambda: pokerboard_utils.JiraApi.search(jql, start_at, page_size, fields)
+        )
+        res = dict(res, next=None, previous=None)
+        end = res.get("startAt", start_at) + len(res.get("issues", []))
+        if res.get("issues") and end < res.get("total", 0):
+            res["next"] = self.page_url(request, end)
+        if start_at:
+            res["previous"] = self.page_url(request, max(start_at - (page_size or res.get("maxResults", 0)), 0))
         return Response(res, status=status.HTTP_200_OK)
 
+    def page_url(self: RetrieveAPIView, request: OrderedDict, start_at: int) -> str:
+        """
+        Url of the page starting at an issue
+        """
+        cursor = pokerboard_serializers.JqlQuerySerializer.encode_cursor(start_at)
+        return replace_query_param(request.build_absolute_uri(), "cursor", cursor)
+
+    def stream(self: RetrieveAPIView, jql: str, fields: list, page_size: int, start_at: int) -> StreamingHttpResponse:
+        """
+        Streams matching issues as newline delimited JSON, the first page is fetched upfront so errors are still a 400
+        """
+        issues = pokerboard_utils.JiraApi.iter_search(
+            jql, fields, page_size or pokerboard_constants.JQL_MAX_PAGE_SIZE, start_at
+        )
+        first = next(issues, None)
+        if first is None:
+            return StreamingHttpResponse([], content_type="application/x-ndjson")
+
+        def lines():
+            yield json.dumps(first) + "\n"
+            try:
+                for issue in issues:
+                    yield json.dumps(issue) + "\n"
+            except APIException as error:
+                logger.warning("JQL stream ended early: %s", error)
+                yield json.dumps({"error": error.detail}) + "\n"
+
+        return StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+
 
 class SuggestionsAPIView(RetrieveAPIView):
     """
@@ -74,11 +185,9 @@ class SuggestionsAPIView(RetrieveAPIView):
         """
         Fetch available sprints and projects
         """
-        sprints = pokerboard_utils.JiraApi.get_all_sprints()
-        project_res = pokerboard_utils.JiraApi.query_jira("GET", pokerboard_constants.GET_PROJECTS_URL)
         response = {
-            "projects": project_res["results"],
-            "sprints": sprints
+            "projects": pokerboard_jira_cache.cached("projects", "all", pokerboard_utils.JiraApi.get_projects),
+            "sprints": pokerboard_jira_cache.cached("sprints", "all", pokerboard_utils.JiraApi.get_all_sprints),
         }
         return Response(response, status=status.HTTP_200_OK)
 
@@ -93,22 +202,34 @@ class CommentApiView(CreateAPIView, ListAPIView):
         """
         Get comments on a JIRA ticket
         """
-        issueId = request.GET.get("issueId")
-        response = pokerboard_utils.JiraApi.query_jira(method="GET", url=f"{pokerboard_constants.JIRA_API_URL_V2}issue/{issueId}/comment")
-        return Response(response["comments"], status=status.HTTP_200_OK)
+        serializer = pokerboard_serializers.CommentQuerySerializer(data=request.GET)
+        serializer.is_valid(raise_exception=True)
+        issueId = serializer.validated_data["issueId"]
+        comments = pokerboard_jira_cache.cached(
+            "comments", issueId, lambda: pokerboard_utils.JiraApi.get_comments(issueId)
+        )
+        return Response(comments, status=status.HTTP_200_OK)
 
     def perform_create(self: CreateAPIView, serializer: Serializer) -> Any:
         """
         Comments on a JIRA ticket
         """
         issue = serializer.validated_data["issue"]
-        comment = serializer.validated_data["comment"]
-        url = f"{pokerboard_constants.JIRA_API_URL_V2}issue/{issue}/comment"
-        payload = json.dumps({
-            "body": comment
-        })
+        pokerboard_utils.JiraApi.add_comment(issue, serializer.validated_data["comment"])
+        pokerboard_jira_cache.invalidate("comments", issue)
+
+
+class JiraCacheStatsApiView(RetrieveAPIView):
+    """
+    Hit ratios of the jira response cache, for admins
+    """
+    permission_classes = [IsAdminUser]
 
-        pokerboard_utils.JiraApi.query_jira("POST", url, payload=payload, status_code=201)
+    def get(self: RetrieveAPIView, request: OrderedDict) -> Response:
+        """
+        Fetch cache counters of this worker
+        """
+        return Response(pokerboard_jira_cache.get_stats(), status=status.HTTP_200_OK)
 
 
 class TicketOrderApiView(UpdateAPIView):
@@ -118,6 +239,15 @@ class TicketOrderApiView(UpdateAPIView):
     serializer_class = pokerboard_serializers.TicketOrderSerializer
     queryset = pokerboard_models.Ticket.objects.all()
 
+    def get_permissions(self):
+        """
+        Only the pokerboard's manager can move its tickets
+        """
+        permissions = super().get_permissions()
+        if self.request.method == "PATCH":
+            permissions.append(pokerboard_permissions.IsManagerPermission())
+        return permissions
+
     def put(self: UpdateAPIView, request: OrderedDict, pk: int=None) -> Response:
         """
         Changes ticket ordering
@@ -127,6 +257,16 @@ class TicketOrderApiView(UpdateAPIView):
         serializer.save()
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def patch(self: UpdateAPIView, request: OrderedDict, pk: int=None) -> Response:
+        """
+        Moves a single ticket
+        """
+        self.check_object_permissions(request, get_object_or_404(pokerboard_models.Pokerboard, pk=pk))
+        serializer = pokerboard_serializers.TicketMoveSerializer(data=request.data, context={"pk": pk})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
 
 class GameSessionApi(GenericViewSet, CreateModelMixin, RetrieveModelMixin):
     """
@@ -140,7 +280,7 @@ class GameSessionApi(GenericViewSet, CreateModelMixin, RetrieveModelMixin):
         Get active gamesession for a pokerboard
         """
         pk = self.kwargs.get('pk')
-        active_gamesession = self.queryset.filter(ticket__pokerboard=pk, status=pokerboard_models.GameSession.IN_PROGRESS).first()
+        active_gamesession = self.queryset.filter(pokerboard=pk, status=pokerboard_models.GameSession.IN_PROGRESS).first()
         return active_gamesession
 
 
@@ -180,8 +320,7 @@ class PokerboardMembersApiView(ModelViewSet):
         Invites a user/group to pokerboard
         Only pokerboard's manager can perform this action
         """
-        pokerboard = pokerboard_models.Pokerboard.objects.get(id=self.request.data['pokerboard'])
-        self.check_object_permissions(self.request, pokerboard)
+        self.check_object_permissions(self.request, serializer.validated_data['pokerboard'])
         return super().perform_create(serializer)
 
     def retrieve(self, request, pk = None):
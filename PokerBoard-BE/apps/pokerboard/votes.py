@@ -0,0 +1,182 @@
+import asyncio
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.db import DataError, DatabaseError, IntegrityError, transaction
+
+from apps.pokerboard import (
+    database as pokerboard_database,
+    models as pokerboard_models,
+    store as pokerboard_store
+)
+
+logger = logging.getLogger(__name__)
+
+SESSIONS_KEY = "votes:sessions"
+
+
+def pending_key(session_id: int) -> str:
+    """
+    Store hash of a session's pending votes, by user id
+    """
+    return f"votes:{session_id}:pending"
+
+
+def without_estimate(vote: dict) -> dict:
+    """
+    Serialized vote as participants see it until votes are revealed, telling who voted but not the estimate
+    """
+    return {key: value for key, value in vote.items() if key != "estimate"}
+
+
+class VoteBuffer:
+    """
+    Votes that are not yet written to the Vote table.
+    Pending votes are kept in the shared session store, so whichever worker finalizes a session
+    writes the votes placed through every worker. Votes are acknowledged as soon as they are
+    buffered and written behind in batches, every VOTE_FLUSH_INTERVAL seconds and whenever a
+    session is finalized.
+    """
+
+    def __init__(self, store=None):
+        self._store = store
+        self._flusher = None
+        self._flusher_loop = None
+
+    @property
+    def store(self):
+        return self._store or pokerboard_store.get_store()
+
+    def add(self, session_id: int, user_data: dict, estimate: int) -> dict:
+        """
+        Buffers a user's vote, replacing any earlier pending vote of the user, returns it serialized
+        """
+        vote = {
+            "estimate": estimate,
+            "game_session": session_id,
+            "user": user_data,
+        }
+        pipeline = self.store.pipeline()
+        pipeline.hset(pending_key(session_id), user_data["id"], json.dumps(vote))
+        pipeline.expire(pending_key(session_id), settings.SESSION_EVENT_TTL)
+        pipeline.zadd(SESSIONS_KEY, {session_id: time.time()})
+        pipeline.execute()
+        return vote
+
+    def pending(self, session_id: int) -> list:
+        """
+        Returns pending votes of a session
+        """
+        return [json.loads(vote) for vote in self.store.hgetall(pending_key(session_id)).values()]
+
+    def merge(self, session_id: int, votes: list) -> list:
+        """
+        Overlays pending votes of a session on serialized persisted votes
+        """
+        merged = {vote["user"]["id"]: vote for vote in votes}
+        merged.update({vote["user"]["id"]: vote for vote in self.pending(session_id)})
+        return list(merged.values())
+
+    def take(self, session_id: int) -> dict:
+        """
+        Removes pending votes of a session from the store in one transaction, returns them by user id
+        """
+        pipeline = self.store.pipeline()
+        pipeline.hgetall(pending_key(session_id))
+        pipeline.delete(pending_key(session_id))
+        pipeline.zrem(SESSIONS_KEY, session_id)
+        votes = pipeline.execute()[0]
+        return {int(user_id): json.loads(vote) for user_id, vote in votes.items()}
+
+    def flush(self, session_id: int=None) -> int:
+        """
+        Writes pending votes of one (or every) session to the database, returns number of votes written
+        """
+        if session_id is None:
+            session_ids = [int(sid) for sid in self.store.zrangebyscore(SESSIONS_KEY, "-inf", "+inf")]
+        else:
+            session_ids = [session_id]
+        written = 0
+        for sid in session_ids:
+            votes = self.take(sid)
+            if not votes:
+                continue
+            try:
+                written += self._write_batch(sid, votes)
+            except Exception:
+                self._requeue(sid, votes)
+                raise
+        return written
+
+    def _write_batch(self, session_id: int, votes: dict) -> int:
+        """
+        Writes votes of a session together, or one by one when the batch fails, dropping
+        votes the database rejects so that they do not block the session's other votes
+        """
+        try:
+            self._write(session_id, votes)
+            return len(votes)
+        except DatabaseError:
+            logger.warning("Writing votes of session %s failed, writing them one by one", session_id)
+        written = 0
+        for user_id, vote in votes.items():
+            try:
+                self._write(session_id, {user_id: vote})
+            except (DataError, IntegrityError):
+                logger.exception("Dropping vote %s of user %s in session %s", vote["estimate"], user_id, session_id)
+                continue
+            written += 1
+        return written
+
+    def _write(self, session_id: int, votes: dict) -> None:
+        """
+        Updates existing votes and inserts new ones, two queries per session
+        """
+        with transaction.atomic():
+            existing = list(pokerboard_models.Vote.objects.select_for_update().filter(
+                game_session_id=session_id, user_id__in=votes.keys()
+            ))
+            for vote in existing:
+                vote.estimate = votes[vote.user_id]["estimate"]
+            pokerboard_models.Vote.objects.bulk_update(existing, ["estimate"])
+            existing_users = {vote.user_id for vote in existing}
+            pokerboard_models.Vote.objects.bulk_create([
+                pokerboard_models.Vote(game_session_id=session_id, user_id=user_id, estimate=vote["estimate"])
+                for user_id, vote in votes.items() if user_id not in existing_users
+            ], ignore_conflicts=True)
+
+    def _requeue(self, session_id: int, votes: dict) -> None:
+        """
+        Puts back votes of a failed flush, unless the user has voted again since
+        """
+        pipeline = self.store.pipeline()
+        for user_id, vote in votes.items():
+            pipeline.hsetnx(pending_key(session_id), user_id, json.dumps(vote))
+        pipeline.expire(pending_key(session_id), settings.SESSION_EVENT_TTL)
+        pipeline.zadd(SESSIONS_KEY, {session_id: time.time()})
+        pipeline.execute()
+
+    def ensure_flusher(self) -> None:
+        """
+        Starts the periodic flush on the running event loop, if it is not running already
+        """
+        loop = asyncio.get_event_loop()
+        if self._flusher is None or self._flusher.done() or self._flusher_loop is not loop:
+            self._flusher_loop = loop
+            self._flusher = asyncio.ensure_future(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        """
+        Flushes pending votes every VOTE_FLUSH_INTERVAL seconds
+        """
+        while True:
+            await asyncio.sleep(settings.VOTE_FLUSH_INTERVAL)
+            try:
+                await pokerboard_database.database_sync_to_async(self.flush)()
+            except Exception:
+                logger.exception("Flushing votes failed, retrying on next interval")
+
+
+vote_buffer = VoteBuffer()
@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 
 
 class UserConfig(AppConfig):
@@ -7,5 +7,8 @@ class UserConfig(AppConfig):
 
     def ready(self) -> None:
         from apps.user.signals import send_email_handler
-        from apps.user.models import User
+        from apps.user.models import Token, User
+        from apps.user.tokens import evict_token_handler, evict_user_tokens_handler
         post_save.connect(send_email_handler, sender=User)
+        post_save.connect(evict_user_tokens_handler, sender=User)
+        post_delete.connect(evict_token_handler, sender=Token)
@@ -3,7 +3,10 @@ import datetime
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 
-from apps.user import models as user_models
+from apps.user import (
+    models as user_models,
+    tokens as user_tokens
+)
 
 
 class CustomTokenAuthentication(TokenAuthentication):
@@ -16,7 +19,11 @@ class CustomTokenAuthentication(TokenAuthentication):
         """
         Check if the token is valid with the provided key
         """
-        user, token = super().authenticate_credentials(key)
+        token = user_tokens.resolve_token(key)
+        if token is None:
+            raise AuthenticationFailed('Invalid token.')
+        if not token.user.is_active:
+            raise AuthenticationFailed('User inactive or deleted.')
         if token.expired_at < datetime.datetime.now():
             raise AuthenticationFailed({"error": "Token has expired"})
-        return user, token
+        return token.user, token
@@ -0,0 +1,17 @@
+import apps.user.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_auto_20210915_1320'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='token',
+            name='expired_at',
+            field=models.DateTimeField(db_index=True, default=apps.user.utils.get_expire_date),
+        ),
+    ]
@@ -99,4 +99,4 @@ class Token(AuthToken):
     Custom Token Auth Model
     """
     user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='auth_tokens', on_delete=models.CASCADE)
-    expired_at = models.DateTimeField(default=user_utils.get_expire_date)
+    expired_at = models.DateTimeField(default=user_utils.get_expire_date, db_index=True)
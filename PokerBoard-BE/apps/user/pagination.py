@@ -0,0 +1,12 @@
+from rest_framework.pagination import LimitOffsetPagination
+
+
+class ProfileSectionPagination(LimitOffsetPagination):
+    """
+    Limit/offset pagination of one section of a user profile, each section reads its own offset parameter
+    """
+    default_limit = 20
+    max_limit = 100
+
+    def __init__(self, section: str):
+        self.offset_query_param = f"{section}_offset"
@@ -0,0 +1,81 @@
+from collections import OrderedDict
+
+from django.db.models import Count
+from django.db.models.query import QuerySet
+
+from rest_framework.request import Request
+from rest_framework.serializers import ValidationError
+
+from apps.group import (
+    models as group_models,
+    serializer as group_serializers
+)
+from apps.pokerboard import (
+    models as pokerboard_models,
+    serializers as pokerboard_serializers
+)
+from apps.user import pagination as user_pagination
+
+
+def boards(user) -> QuerySet:
+    """
+    Pokerboards the user is a member of, with ticket counts
+    """
+    return pokerboard_models.Pokerboard.objects.filter(
+        memberships__user=user
+    ).select_related("manager").annotate(ticket_count=Count("tickets")).order_by("-id")
+
+
+def groups(user) -> QuerySet:
+    """
+    Groups the user is a member of, with member counts
+    """
+    return group_models.Group.objects.filter(
+        id__in=group_models.GroupMember.objects.filter(user=user).values("group_id")
+    ).annotate(member_count=Count("members")).order_by("-id")
+
+
+def votes(user) -> QuerySet:
+    """
+    Estimated tickets the user voted on
+    """
+    return pokerboard_models.Ticket.objects.filter(
+        id__in=pokerboard_models.Vote.objects.filter(user=user).values("game_session__ticket_id")
+    ).exclude(estimate=None).order_by("-id")
+
+
+SECTIONS = OrderedDict([
+    ("boards", (boards, pokerboard_serializers.PokerboardSummarySerializer)),
+    ("groups", (groups, group_serializers.GroupSummarySerializer)),
+    ("votes", (votes, pokerboard_serializers.TicketSerializer)),
+])
+
+
+def parse_include(value: str) -> list:
+    """
+    Sections named by an include parameter, e.g. "boards,votes"
+    """
+    include = [section for section in value.split(",") if section]
+    unknown = [section for section in include if section not in SECTIONS]
+    if unknown:
+        raise ValidationError({"include": [f"Unknown sections: {', '.join(unknown)}"]})
+    return include
+
+
+def get_sections(request: Request, user, include: list) -> dict:
+    """
+    Requested sections of a user's profile, each paginated on its own by `limit` and `<section>_offset`.
+    Every section takes two queries (its page and its count) however many rows it has.
+    """
+    sections = {}
+    for section in include:
+        get_queryset, serializer_class = SECTIONS[section]
+        paginator = user_pagination.ProfileSectionPagination(section)
+        page = paginator.paginate_queryset(get_queryset(user), request)
+        sections[section] = OrderedDict([
+            ("count", paginator.count),
+            ("next", paginator.get_next_link()),
+            ("previous", paginator.get_previous_link()),
+            ("results", serializer_class(page, many=True).data),
+        ])
+    return sections
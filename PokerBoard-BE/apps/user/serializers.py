@@ -114,23 +114,22 @@ class UserProfileSerializer(rest_framework_serializers.ModelSerializer):
         from apps.pokerboard.serializers import PokerboardSerializer
 
         boardquery = pokerboard_models.Pokerboard.objects.filter(
-            manager=user
-        ).prefetch_related("tickets")
-        invites = pokerboard_models.Pokerboard.objects.filter(
-            invite__invitee=user, invite__is_accepted=True
-        )
-        return PokerboardSerializer(boardquery.union(invites), many=True).data
+            memberships__user=user
+        ).select_related("manager").prefetch_related("tickets")
+        return PokerboardSerializer(boardquery, many=True).data
 
     def get_vote(self, user):
         from apps.pokerboard.serializers import TicketSerializer
 
         tickets = pokerboard_models.Ticket.objects.filter(
-            estimations__votes__user=user
-        ).exclude(estimate=None).distinct()
+            id__in=pokerboard_models.Vote.objects.filter(user=user).values("game_session__ticket_id")
+        ).exclude(estimate=None)
         return TicketSerializer(tickets, many=True).data
 
     def get_group(self, user):
         from apps.group import serializer as group_serializers
 
-        groups = group_models.Group.objects.filter(members__user=user)
+        groups = group_models.Group.objects.filter(
+            id__in=group_models.GroupMember.objects.filter(user=user).values("group_id")
+        ).prefetch_related("members__user")
         return group_serializers.GroupSerializer(groups, many=True).data
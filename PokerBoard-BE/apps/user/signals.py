@@ -1,6 +1,5 @@
-from django.contrib.auth.tokens import PasswordResetTokenGenerator
-
-from apps.user.tasks import send_email_task
+from apps.user.tasks import send_activation_emails_task
+from poker import mail
 
 
 def send_email_handler(instance, **kwargs):
@@ -9,6 +8,4 @@ def send_email_handler(instance, **kwargs):
     """
     created = kwargs.get('created')
     if created:
-        account_activation_token = PasswordResetTokenGenerator()
-        token = account_activation_token.make_token(instance)
-        send_email_task.delay(instance.first_name, instance.pk, token, instance.email)
+        mail.enqueue(send_activation_emails_task, instance.pk)
@@ -1,32 +1,49 @@
-import logging
-import smtplib
+import datetime
 
 from django.conf import settings
-from django.core.mail import send_mail
-from django.template.loader import render_to_string
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
 
+from poker import mail
 from poker.celery import app
 
 from apps.user import constants as user_constants
 
-logger = logging.getLogger(__name__)
 
-
-@app.task
-def send_email_task(first_name, pk, token, email):
+def activation_email(user, token_generator: PasswordResetTokenGenerator) -> mail.EmailMultiAlternatives:
     """
-    Celery task for sending email
+    Account activation email of a user
     """
-    message = render_to_string('user/email_template.html', {
-        'username': first_name,
+    message = mail.render('user/email_template.html', {
+        'username': user.first_name,
         'domain': settings.BASE_URL_FE,
-        'uid': pk,
-        'token': token
+        'uid': user.pk,
+        'token': token_generator.make_token(user)
     })
-    subject = render_to_string("user/email_subject_template.html", {
+    subject = mail.render("user/email_subject_template.html", {
         "subject": user_constants.EMAIL_REGISTER_SUBJECT
     })
-    try:
-        send_mail(subject=subject, message=message, from_email=settings.EMAIL_HOST_USER, recipient_list=[email], fail_silently=False)
-    except smtplib.SMTPException as e:
-        logger.error(e)
+    return mail.build(user.email, subject, body=message)
+
+
+@app.task(bind=True, **mail.retry_options())
+def send_activation_emails_task(self, user_ids):
+    """
+    Celery task for sending account activation emails of many users, in batches over one connection each.
+    Takes only user ids, fetching just the fields the email and its token need.
+    """
+    from django.contrib.auth import get_user_model
+    token_generator = PasswordResetTokenGenerator()
+    users = get_user_model().objects.filter(id__in=user_ids).only("id", "first_name", "email", "password", "last_login")
+    result = mail.send_batch({
+        f"activation:{user.pk}": activation_email(user, token_generator) for user in users
+    })
+    return {**result, "message_size": mail.message_size(self)}
+
+
+@app.task
+def purge_expired_tokens_task():
+    """
+    Celery task deleting expired tokens, which otherwise pile up with every login
+    """
+    from apps.user.models import Token
+    Token.objects.filter(expired_at__lt=datetime.datetime.now()).delete()
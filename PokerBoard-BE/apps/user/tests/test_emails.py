@@ -0,0 +1,133 @@
+import smtplib
+from unittest.mock import patch
+
+from ddf import G
+
+from rest_framework.test import APITestCase
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.core import mail as django_mail
+from django.core.cache import _create_cache
+from django.core.cache.backends import locmem as locmem_cache
+from django.core.mail.backends import locmem
+from django.test import override_settings
+
+from apps.pokerboard.tests import test_utils as pokerboard_test_utils
+from apps.user import tasks as user_tasks
+from poker import mail
+
+
+class MailTestCases(pokerboard_test_utils.EagerCeleryMixin, APITestCase):
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup method with an empty outbox and no email sent before
+        """
+        super().setUp()
+        django_mail.outbox = []
+        mail.get_cache().clear()
+
+    def test_activation_email(self: APITestCase) -> None:
+        """
+        Test creating a user sends its activation link, with a token generated on the worker
+        """
+        user = G(get_user_model(), first_name="Dummy")
+        self.assertEqual(len(django_mail.outbox), 1)
+        message = django_mail.outbox[0]
+        self.assertListEqual(message.to, [user.email])
+        self.assertIn("Hi Dummy", message.body)
+        token = message.body.split(f"/activate/{user.pk}/")[1].split()[0]
+        self.assertTrue(PasswordResetTokenGenerator().check_token(user, token))
+
+    def test_collect_coalesces_tasks(self: APITestCase) -> None:
+        """
+        Test users created in one collect block are emailed by a single task call, carrying only their ids
+        """
+        with patch.object(user_tasks.send_activation_emails_task, "delay") as delay:
+            with mail.collect():
+                users = G(get_user_model(), n=3)
+                delay.assert_not_called()
+        delay.assert_called_once_with([user.pk for user in users])
+
+    @override_settings(MAIL_BATCH_SIZE=2)
+    def test_send_batch_reuses_connections(self: APITestCase) -> None:
+        """
+        Test every batch of messages is sent over one connection
+        """
+        with patch("poker.mail.get_connection", wraps=mail.get_connection) as get_connection:
+            with mail.collect():
+                G(get_user_model(), n=5)
+        self.assertEqual(get_connection.call_count, 3)
+        self.assertEqual(len(django_mail.outbox), 5)
+
+    def test_templates_are_cached(self: APITestCase) -> None:
+        """
+        Test a template is compiled once and reused
+        """
+        mail.get_cached_template.cache_clear()
+        with patch("poker.mail.get_template", wraps=mail.get_template) as get_template:
+            mail.render("user/email_subject_template.html", {"subject": "one"})
+            mail.render("user/email_subject_template.html", {"subject": "two"})
+        self.assertEqual(get_template.call_count, 1)
+
+    def test_redelivered_task_sends_once(self: APITestCase) -> None:
+        """
+        Test running an email task again for the same users sends nothing new
+        """
+        users = G(get_user_model(), n=2)
+        result = user_tasks.send_activation_emails_task.delay([user.pk for user in users]).get()
+        self.assertEqual(result["sent"], 0)
+        self.assertEqual(result["skipped"], 2)
+        self.assertEqual(len(django_mail.outbox), 2)
+
+    def test_sent_emails_are_shared_across_workers(self: APITestCase) -> None:
+        """
+        Test an email claimed through one cache instance is skipped when retried through another,
+        as by a task redelivered to a different worker
+        """
+        user = G(get_user_model())
+        mail.get_cache().clear()
+        django_mail.outbox = []
+        messages = {f"activation:{user.pk}": mail.build(user.email, "Activate")}
+        mail_cache = settings.CACHES[settings.MAIL_CACHE_ALIAS]
+        first_worker = _create_cache(mail_cache['BACKEND'], **mail_cache)
+        with patch("poker.mail.get_cache", return_value=first_worker):
+            self.assertDictEqual(mail.send_batch(messages), {"sent": 1, "skipped": 0})
+
+        # the other worker's process starts without the in memory caches of this one
+        with patch.dict(locmem_cache._caches, clear=True), patch.dict(locmem_cache._expire_info, clear=True):
+            second_worker = _create_cache(mail_cache['BACKEND'], **mail_cache)
+            with patch("poker.mail.get_cache", return_value=second_worker):
+                self.assertDictEqual(mail.send_batch(messages), {"sent": 0, "skipped": 1})
+        self.assertEqual(len(django_mail.outbox), 1)
+
+    def test_retry_after_smtp_failure(self: APITestCase) -> None:
+        """
+        Test a batch failing midway is retried, sending the emails sent before the failure only once
+        """
+        send_messages = locmem.EmailBackend.send_messages
+        calls = []
+
+        def flaky_send_messages(backend, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise smtplib.SMTPServerDisconnected("connection lost")
+            return send_messages(backend, messages)
+
+        with patch.object(locmem.EmailBackend, "send_messages", flaky_send_messages):
+            with mail.collect():
+                users = G(get_user_model(), n=3)
+        self.assertEqual(len(calls), 4)
+        self.assertListEqual(sorted(message.to[0] for message in django_mail.outbox), sorted(user.email for user in users))
+
+    def test_task_reports_message_size(self: APITestCase) -> None:
+        """
+        Test the task result carries the size of its message, growing with the ids only
+        """
+        user = G(get_user_model())
+        small = user_tasks.send_activation_emails_task.delay([user.pk]).get()["message_size"]
+        large = user_tasks.send_activation_emails_task.delay([user.pk] * 100).get()["message_size"]
+        self.assertLess(small, 50)
+        self.assertLess(large, 100 * 10)
@@ -0,0 +1,116 @@
+import datetime
+
+from ddf import G
+
+from rest_framework.test import APITestCase
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from apps.user import (
+    models as user_models,
+    tasks as user_tasks,
+    tokens as user_tokens
+)
+
+
+class TokenCacheTestCases(APITestCase):
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup method for creating default user, it's token and an empty token cache
+        """
+        user_tokens.token_cache.clear()
+        self.user = G(get_user_model())
+        self.token = G(user_models.Token, user=self.user)
+        self.url = reverse('user', args=[self.user.id])
+
+    def test_cached_token_resolves_without_queries(self: APITestCase) -> None:
+        """
+        Test second lookup of a token is served from the cache, user included
+        """
+        user_tokens.resolve_token(self.token.key)
+        with self.assertNumQueries(0):
+            token = user_tokens.resolve_token(self.token.key)
+            self.assertEqual(token.user.email, self.user.email)
+
+    def test_lookups_get_their_own_instances(self: APITestCase) -> None:
+        """
+        Test every lookup of a cached token gets its own token and user, so requests never share them
+        """
+        user_tokens.resolve_token(self.token.key)
+        first = user_tokens.resolve_token(self.token.key)
+        second = user_tokens.resolve_token(self.token.key)
+        self.assertIsNot(first, second)
+        self.assertIsNot(first.user, second.user)
+        first.user.first_name = "Changed"
+        self.assertEqual(second.user.first_name, self.user.first_name)
+        self.assertEqual(user_tokens.resolve_token(self.token.key).user.first_name, self.user.first_name)
+
+    def test_entries_expire_after_ttl(self: APITestCase) -> None:
+        """
+        Test a token revoked by another process stops resolving from this cache after its ttl
+        """
+        cache = user_tokens.TokenCache(max_size=2, ttl=0)
+        cache.set(self.token)
+        self.assertIsNone(cache.get(self.token.key))
+
+    def test_expired_token_is_rejected(self: APITestCase) -> None:
+        """
+        Test a token expiring while cached is rejected and evicted
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        cached = user_tokens.token_cache.get(self.token.key)
+        cached.expired_at = datetime.datetime.now() - datetime.timedelta(seconds=1)
+        user_models.Token.objects.filter(key=self.token.key).update(expired_at=cached.expired_at)
+        user_tokens.token_cache.set(cached)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data, {"error": "Token has expired"})
+        self.assertIsNone(user_tokens.token_cache.get(self.token.key))
+
+    def test_deleted_token_is_evicted(self: APITestCase) -> None:
+        """
+        Test deleting a token (logout) stops it authenticating right away
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.token.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_updated_user_is_evicted(self: APITestCase) -> None:
+        """
+        Test cached tokens of a user are dropped when the user changes
+        """
+        user_tokens.resolve_token(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(user_tokens.token_cache.get(self.token.key))
+        self.assertFalse(user_tokens.resolve_token(self.token.key).user.is_active)
+
+    def test_cache_is_bounded(self: APITestCase) -> None:
+        """
+        Test least recently used token is evicted once the cache is full
+        """
+        cache = user_tokens.TokenCache(max_size=2, ttl=60)
+        tokens = [G(user_models.Token, user=G(get_user_model())) for _ in range(3)]
+        cache.set(tokens[0])
+        cache.set(tokens[1])
+        cache.get(tokens[0].key)
+        cache.set(tokens[2])
+        self.assertIsNotNone(cache.get(tokens[0].key))
+        self.assertIsNone(cache.get(tokens[1].key))
+        self.assertIsNotNone(cache.get(tokens[2].key))
+
+    def test_purge_expired_tokens(self: APITestCase) -> None:
+        """
+        Test purging deletes expired tokens only
+        """
+        expired = G(
+            user_models.Token, user=self.user, expired_at=datetime.datetime.now() - datetime.timedelta(seconds=1)
+        )
+        user_tasks.purge_expired_tokens_task()
+        self.assertFalse(user_models.Token.objects.filter(key=expired.key).exists())
+        self.assertTrue(user_models.Token.objects.filter(key=self.token.key).exists())
@@ -3,8 +3,12 @@ from ddf import G
 from rest_framework.test import APITestCase
 
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from apps.group import models as group_models
+from apps.pokerboard import models as pokerboard_models
 from apps.user import models as user_models
 
 
@@ -186,3 +190,91 @@ class PokerboardTestCases(APITestCase):
         response = self.client.patch(url, data=data)
         self.assertEqual(response.status_code, 200)
         self.assertDictEqual(expected_data, response.data)
+
+
+class UserProfileTestCases(APITestCase):
+    """
+    Test user profile sections
+    """
+
+    def setUp(self: APITestCase) -> None:
+        """
+        Setup a user who manages a pokerboard, belongs to a group and voted on an estimated ticket
+        """
+        self.user = G(get_user_model())
+        token = G(user_models.Token, user=self.user).key
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token)
+        self.url = reverse('user', args=[self.user.id])
+        self.add_rows()
+
+    def add_rows(self: APITestCase) -> None:
+        """
+        Adds a pokerboard, a group and a vote to the user's profile
+        """
+        self.pokerboard = G(pokerboard_models.Pokerboard, manager=self.user)
+        self.ticket = G(pokerboard_models.Ticket, pokerboard=self.pokerboard, estimate=3)
+        G(pokerboard_models.Ticket, pokerboard=self.pokerboard)
+        session = G(pokerboard_models.GameSession, ticket=self.ticket, status=pokerboard_models.GameSession.ESTIMATED)
+        G(pokerboard_models.Vote, game_session=session, user=self.user)
+        # the creator joins the group on creation
+        self.group = G(group_models.Group, created_by=self.user)
+        G(group_models.GroupMember, group=self.group)
+
+    def test_profile_sections(self: APITestCase) -> None:
+        """
+        Test only included sections are returned, with counts instead of nested rows
+        """
+        response = self.client.get(self.url, {"include": "boards,groups,votes"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["email"], self.user.email)
+        self.assertNotIn("pokerboard", response.data)
+        self.assertEqual(response.data["boards"]["count"], 1)
+        self.assertEqual(response.data["boards"]["results"][0]["id"], self.pokerboard.id)
+        self.assertEqual(response.data["boards"]["results"][0]["ticket_count"], 2)
+        self.assertEqual(response.data["groups"]["results"][0]["id"], self.group.id)
+        self.assertEqual(response.data["groups"]["results"][0]["member_count"], 2)
+        self.assertListEqual([ticket["id"] for ticket in response.data["votes"]["results"]], [self.ticket.id])
+
+        response = self.client.get(self.url, {"include": "votes"})
+        self.assertListEqual(["id", "email", "first_name", "last_name", "votes"], list(response.data))
+
+    def test_profile_section_pagination(self: APITestCase) -> None:
+        """
+        Test every section is paginated with its own offset
+        """
+        first_pokerboard = self.pokerboard
+        self.add_rows()
+        response = self.client.get(self.url, {"include": "boards,groups", "limit": 1, "groups_offset": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["boards"]["count"], 2)
+        self.assertIsNotNone(response.data["boards"]["next"])
+        self.assertIsNone(response.data["boards"]["previous"])
+        self.assertIsNone(response.data["groups"]["next"])
+
+        response = self.client.get(response.data["boards"]["next"])
+        self.assertListEqual([board["id"] for board in response.data["boards"]["results"]], [first_pokerboard.id])
+
+    def test_profile_unknown_section(self: APITestCase) -> None:
+        """
+        Test including an unknown section is rejected
+        """
+        response = self.client.get(self.url, {"include": "boards,friends"})
+        self.assertEqual(response.status_code, 400)
+        self.assertDictEqual(response.data, {"include": ["Unknown sections: friends"]})
+
+    def test_profile_query_count(self: APITestCase) -> None:
+        """
+        Test the profile takes as many queries for many boards, groups and votes as for one
+        """
+        def count_queries(params: dict) -> int:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 200)
+            return len(context.captured_queries)
+
+        # warm up the token cache, so only the profile itself is counted
+        self.client.get(self.url)
+        few = [count_queries({}), count_queries({"include": "boards,groups,votes"})]
+        for _ in range(5):
+            self.add_rows()
+        self.assertListEqual(few, [count_queries({}), count_queries({"include": "boards,groups,votes"})])
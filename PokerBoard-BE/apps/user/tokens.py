@@ -0,0 +1,121 @@
+import datetime
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from channels.db import database_sync_to_async
+
+from apps.user import models as user_models
+
+
+def _values(instance) -> tuple:
+    """
+    Values of a model instance's concrete fields, in field order
+    """
+    return tuple(getattr(instance, field.attname) for field in instance._meta.concrete_fields)
+
+
+def _instance(model, values: tuple):
+    """
+    Builds a fresh model instance from values of its concrete fields, as if loaded from the database
+    """
+    return model.from_db(None, [field.attname for field in model._meta.concrete_fields], values)
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of token key -> field values of the token and of its user.
+    Only immutable values are cached, every lookup gets its own token and user instances.
+    Entries live at most `ttl` seconds and never past the token's own expiry; eviction on
+    logout or user changes reaches this process only, other processes drop entries after `ttl`.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key: str):
+        """
+        Returns a fresh copy of a cached token with its user, evicting it if it is stale or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user_id, expired_at, token_values, user_values, cached_until = entry
+            if cached_until <= time.time() or expired_at <= datetime.datetime.now():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        token = _instance(user_models.Token, token_values)
+        token.user = _instance(user_models.User, user_values)
+        return token
+
+    def set(self, token: user_models.Token) -> None:
+        """
+        Caches a token, evicting the least recently used one when full
+        """
+        with self._lock:
+            self._entries[token.key] = (
+                token.user_id, token.expired_at, _values(token), _values(token.user), time.time() + self.ttl
+            )
+            self._entries.move_to_end(token.key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, key: str) -> None:
+        """
+        Drops a token
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def evict_user(self, user_id: int) -> None:
+        """
+        Drops every token of a user
+        """
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL)
+
+
+def resolve_token(key: str):
+    """
+    Returns token with its user for a key, or None if there is no such token.
+    Only unexpired tokens are cached, callers still have to check expiry.
+    """
+    token = token_cache.get(key)
+    if token is not None:
+        return token
+    token = user_models.Token.objects.select_related("user").filter(key=key).first()
+    if token is not None and token.expired_at > datetime.datetime.now():
+        token_cache.set(token)
+    return token
+
+
+aresolve_token = database_sync_to_async(resolve_token)
+
+
+def evict_token_handler(**kwargs):
+    """
+    Django signal handler dropping a deleted token from the cache
+    """
+    token_cache.evict(kwargs.get('instance').key)
+
+
+def evict_user_tokens_handler(**kwargs):
+    """
+    Django signal handler dropping cached tokens of a changed user, so they carry fresh user data
+    """
+    token_cache.evict_user(kwargs.get('instance').pk)
@@ -2,11 +2,13 @@ from rest_framework.generics import CreateAPIView, UpdateAPIView, RetrieveUpdate
 from rest_framework.generics import CreateAPIView
 from rest_framework.permissions import AllowAny
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.serializers import Serializer
 
 from apps.user import (
     models as user_models,
+    profile as user_profile,
     serializers as user_serializers
 )
 
@@ -35,7 +37,8 @@ class LoginView(CreateAPIView):
 
 class UserProfileView(RetrieveUpdateAPIView):
     """
-    Fetching and updating user profile
+    Fetching and updating user profile.
+    With ?include=boards,groups,votes only the listed sections are fetched, each one paginated.
     """
     queryset = user_models.User.objects.all()
     permission_classes = [IsAuthenticated]
@@ -44,10 +47,22 @@ class UserProfileView(RetrieveUpdateAPIView):
         """
         Get serializer class based on request's method
         """
-        if self.request.method == "PATCH":
+        if self.request.method == "PATCH" or "include" in self.request.query_params:
             return user_serializers.UserSerializer
         return user_serializers.UserProfileSerializer
 
+    def retrieve(self: RetrieveUpdateAPIView, request: Request, *args, **kwargs) -> Response:
+        """
+        Get user profile, with the requested sections when sections are listed
+        """
+        if "include" not in request.query_params:
+            return super().retrieve(request, *args, **kwargs)
+        include = user_profile.parse_include(request.query_params["include"])
+        user = self.get_object()
+        data = self.get_serializer(user).data
+        data.update(user_profile.get_sections(request, user, include))
+        return Response(data)
+
 
 class ActivateAccountView(UpdateAPIView):
     """ 
@@ -0,0 +1,102 @@
+"""
+Channel layer fan-out benchmark.
+
+For every --sockets count, adds that many channels to one group of the channel layer picked
+with --layer, then broadcasts --rounds messages to the group, the way a session event reaches
+every socket of a session. Prints the latency until the first and the last socket received
+each broadcast.
+
+The memory layer reaches sockets of this process only. For the redis layers start a local
+redis server (e.g. `redis-server --port 6379 --save ''`) and pass its url with --url.
+
+Usage (from PokerBoard-BE):
+    python -m benchmarks.fanout --layer memory --sockets 1 10 100 1000
+    python -m benchmarks.fanout --layer redis --url redis://localhost:6379/15 --sockets 1 10 100 1000
+    python -m benchmarks.fanout --layer redis_pubsub --url redis://localhost:6379/15 --sockets 1 10 100 1000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from benchmarks import utils as benchmark_utils
+
+
+def make_layer(layer: str, url: str, capacity: int):
+    """
+    Channel layer configured like CHANNEL_LAYERS would configure it, with a prefix of its own
+    """
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+    from poker import layers as poker_layers
+
+    config = poker_layers.layer_config(
+        layer, url, f"bench-{uuid.uuid4().hex[:8]}", capacity,
+        settings.CHANNEL_LAYER_EXPIRY, settings.CHANNEL_LAYER_GROUP_EXPIRY
+    )
+    return import_string(config["BACKEND"])(**config["CONFIG"])
+
+
+async def receive(channel_layer, channel: str) -> float:
+    """
+    Waits for a message on a channel, returns when it arrived
+    """
+    await channel_layer.receive(channel)
+    return time.perf_counter()
+
+
+async def fan_out(channel_layer, sockets: int, rounds: int, payload: str) -> tuple:
+    """
+    Broadcasts rounds messages to a group of sockets channels, returns seconds until the first
+    and until the last channel received each of them
+    """
+    group = f"fanout-{sockets}"
+    channels = [await channel_layer.new_channel() for _ in range(sockets)]
+    for channel in channels:
+        await channel_layer.group_add(group, channel)
+
+    first, last = [], []
+    for _ in range(rounds):
+        receivers = [asyncio.ensure_future(receive(channel_layer, channel)) for channel in channels]
+        # let every receiver start listening before the broadcast is timed
+        await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        await channel_layer.group_send(group, {"type": "broadcast", "message": payload})
+        arrivals = await asyncio.gather(*receivers)
+        first.append(min(arrivals) - started)
+        last.append(max(arrivals) - started)
+
+    for channel in channels:
+        await channel_layer.group_discard(group, channel)
+    return first, last
+
+
+async def run(args) -> None:
+    """
+    Runs the fan-out of every socket count against one channel layer
+    """
+    channel_layer = make_layer(args.layer, args.url, args.rounds + 10)
+    payload = "x" * args.payload_bytes
+    for sockets in args.sockets:
+        first, last = await fan_out(channel_layer, sockets, args.rounds, payload)
+        benchmark_utils.report(f"{args.layer} {sockets} sockets first", first)
+        benchmark_utils.report(f"{args.layer} {sockets} sockets last", last)
+    if hasattr(channel_layer, "flush"):
+        await channel_layer.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--layer", default="memory", help="one of poker.layers.LAYER_BACKENDS")
+    parser.add_argument("--url", default="redis://localhost:6379/15", help="redis url of the redis layers")
+    parser.add_argument("--sockets", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--payload-bytes", type=int, default=300, help="size of a broadcast, a vote event is ~300")
+    args = parser.parse_args()
+
+    benchmark_utils.setup_django()
+    asyncio.get_event_loop().run_until_complete(run(args))
+
+
+if __name__ == "__main__":
+    main()
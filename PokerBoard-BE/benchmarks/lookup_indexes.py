@@ -0,0 +1,177 @@
+"""
+Hot lookup benchmark, before and after the lookup indexes and constraints.
+
+Seeds pokerboards with tickets, one game session per ticket, votes, invites and tokens, then
+for every hot lookup prints the query plan and latency with the current schema and queries
+("after"), drops the indexes and the active session constraint, and does the same with the
+queries as they were written before them ("before").
+
+Usage (from PokerBoard-BE):
+    python -m benchmarks.lookup_indexes --pokerboards 1000 --tickets 100000 --votes 1000000 --tokens 100000
+"""
+import argparse
+import copy
+import datetime
+import random
+import time
+
+from benchmarks import utils as benchmark_utils
+
+BATCH_SIZE = 5000
+
+
+def seed(pokerboards: int, tickets: int, votes: int, tokens: int, invites: int) -> list:
+    """
+    Creates the rows to look up, returns ids of the pokerboards
+    """
+    from django.contrib.auth import get_user_model
+    from apps.pokerboard import models as pokerboard_models
+    from apps.user import models as user_models
+
+    voters = max(1, votes // tickets)
+    get_user_model().objects.bulk_create([
+        get_user_model()(email=f"bench-{idx}@example.com", first_name="bench", last_name=str(idx))
+        for idx in range(max(voters, invites) + 1)
+    ])
+    user_ids = list(get_user_model().objects.order_by("id").values_list("id", flat=True))
+    emails = list(get_user_model().objects.order_by("id").values_list("email", flat=True))
+
+    pokerboard_models.Pokerboard.objects.bulk_create([
+        pokerboard_models.Pokerboard(manager_id=user_ids[0], title=f"bench-{idx}", description="benchmark", duration=60)
+        for idx in range(pokerboards)
+    ])
+    pokerboard_ids = list(pokerboard_models.Pokerboard.objects.values_list("id", flat=True))
+
+    pokerboard_models.Invite.objects.bulk_create([
+        pokerboard_models.Invite(pokerboard_id=pokerboard_id, invitee=emails[idx + 1], is_accepted=idx % 2 == 0)
+        for pokerboard_id in pokerboard_ids for idx in range(invites)
+    ])
+
+    per_board = tickets // pokerboards
+    pokerboard_models.Ticket.objects.bulk_create([
+        pokerboard_models.Ticket(
+            pokerboard_id=pokerboard_id, ticket_id=f"BENCH-{idx}", rank=(idx + 1) * 1024,
+            estimate=None if idx == per_board - 1 else 3
+        )
+        for pokerboard_id in pokerboard_ids for idx in range(per_board)
+    ])
+
+    # one session per ticket, only the last (unestimated) ticket of a board is in progress
+    pokerboard_models.GameSession.objects.bulk_create([
+        pokerboard_models.GameSession(
+            ticket_id=ticket_id, pokerboard_id=pokerboard_id,
+            status=pokerboard_models.GameSession.IN_PROGRESS if estimate is None else pokerboard_models.GameSession.ESTIMATED
+        )
+        for ticket_id, pokerboard_id, estimate in pokerboard_models.Ticket.objects.values_list("id", "pokerboard_id", "estimate")
+    ])
+
+    session_ids = list(pokerboard_models.GameSession.objects.values_list("id", flat=True))
+    for start in range(0, len(session_ids), BATCH_SIZE):
+        pokerboard_models.Vote.objects.bulk_create([
+            pokerboard_models.Vote(game_session_id=session_id, user_id=user_ids[idx], estimate=3)
+            for session_id in session_ids[start:start + BATCH_SIZE] for idx in range(voters)
+        ])
+
+    # a tenth of the tokens expired
+    now = datetime.datetime.now()
+    user_models.Token.objects.bulk_create([
+        user_models.Token(
+            key=f"{idx:040d}", user_id=user_ids[idx % len(user_ids)],
+            expired_at=now + datetime.timedelta(days=-1 if idx % 10 == 0 else 1)
+        )
+        for idx in range(tokens)
+    ])
+    return pokerboard_ids
+
+
+def lookups(pokerboard_id: int, legacy: bool) -> dict:
+    """
+    Hot lookups of a pokerboard, as written before the indexes when legacy is set
+    """
+    from apps.pokerboard import models as pokerboard_models
+    from apps.user import models as user_models
+
+    invitee = pokerboard_models.Invite.objects.filter(pokerboard_id=pokerboard_id).values_list("invitee", flat=True)[0]
+    if legacy:
+        active_session = pokerboard_models.GameSession.objects.filter(
+            ticket__pokerboard=pokerboard_id, status=pokerboard_models.GameSession.IN_PROGRESS
+        )
+    else:
+        active_session = pokerboard_models.GameSession.objects.filter(
+            pokerboard=pokerboard_id, status=pokerboard_models.GameSession.IN_PROGRESS
+        )
+    return {
+        "invite of invitee": pokerboard_models.Invite.objects.filter(
+            pokerboard=pokerboard_id, invitee=invitee, is_accepted=True
+        ),
+        "accepted invites": pokerboard_models.Invite.objects.filter(pokerboard=pokerboard_id, is_accepted=True),
+        "active session": active_session[:1],
+        "last rank": pokerboard_models.Ticket.objects.filter(
+            pokerboard_id=pokerboard_id
+        ).order_by("-rank").values("rank")[:1],
+        "expired tokens": user_models.Token.objects.filter(
+            expired_at__lt=datetime.datetime.now()
+        ).values_list("pk", flat=True)[:100],
+    }
+
+
+def drop_indexes() -> None:
+    """
+    Drops the lookup indexes and the active session constraint
+    """
+    from django.db import connection
+    from apps.pokerboard import models as pokerboard_models
+    from apps.user import models as user_models
+
+    with connection.schema_editor() as schema_editor:
+        for model in (pokerboard_models.Invite, pokerboard_models.Ticket):
+            for index in model._meta.indexes:
+                schema_editor.remove_index(model, index)
+        for constraint in pokerboard_models.GameSession._meta.constraints:
+            schema_editor.remove_constraint(pokerboard_models.GameSession, constraint)
+        old_field = user_models.Token._meta.get_field("expired_at")
+        new_field = copy.copy(old_field)
+        new_field.db_index = False
+        schema_editor.alter_field(user_models.Token, old_field, new_field)
+
+
+def measure(title: str, pokerboard_ids: list, legacy: bool, rounds: int) -> None:
+    """
+    Prints the plan and latency of every lookup over rounds random pokerboards
+    """
+    print(f"== {title}")
+    for name, queryset in lookups(pokerboard_ids[0], legacy).items():
+        print(f"-- {name}: {queryset.explain()}")
+    samples = {}
+    for pokerboard_id in random.sample(pokerboard_ids, min(rounds, len(pokerboard_ids))):
+        for name, queryset in lookups(pokerboard_id, legacy).items():
+            started = time.perf_counter()
+            list(queryset)
+            samples.setdefault(name, []).append(time.perf_counter() - started)
+    for name, timings in samples.items():
+        benchmark_utils.report(f"{title} {name}", timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pokerboards", type=int, default=1000)
+    parser.add_argument("--tickets", type=int, default=100000)
+    parser.add_argument("--votes", type=int, default=1000000)
+    parser.add_argument("--tokens", type=int, default=100000)
+    parser.add_argument("--invites", type=int, default=20, help="invites per pokerboard")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    benchmark_utils.setup_django()
+
+    with benchmark_utils.test_database():
+        started = time.perf_counter()
+        pokerboard_ids = seed(args.pokerboards, args.tickets, args.votes, args.tokens, args.invites)
+        print(f"seeded in {time.perf_counter() - started:.1f}s")
+        measure("after", pokerboard_ids, legacy=False, rounds=args.rounds)
+        drop_indexes()
+        measure("before", pokerboard_ids, legacy=True, rounds=args.rounds)
+
+
+if __name__ == "__main__":
+    main()
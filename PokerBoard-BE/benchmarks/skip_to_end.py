@@ -0,0 +1,100 @@
+"""
+Skip-to-end benchmark across board sizes.
+
+For every board size seeds a pokerboard with that many unestimated tickets, then skips the
+first ticket --rounds times and reports per-skip latency and rows written, both for
+ranking.move_to_end and for the previous implementation (every ticket ranked at or after the
+skipped one shifted in Python and bulk-updated), kept here for comparison.
+
+Usage (from PokerBoard-BE):
+    python -m benchmarks.skip_to_end --sizes 100 500 2000 5000 --rounds 20 --db-delay-ms 0
+"""
+import argparse
+import time
+
+from benchmarks import utils as benchmark_utils
+
+
+def legacy_move_ticket_to_end(ticket) -> int:
+    """
+    Previous skip implementation, returns number of rows written
+    """
+    from apps.pokerboard import models as pokerboard_models
+
+    all_tickets = ticket.pokerboard.tickets.filter(rank__gte=ticket.rank, estimate=None).order_by('rank')
+    prev_rank = ticket.rank
+    for _ticket in all_tickets:
+        if _ticket.rank == prev_rank:
+            continue
+        _ticket.rank, prev_rank = prev_rank, _ticket.rank
+    all_tickets.first().rank = prev_rank
+    pokerboard_models.Ticket.objects.bulk_update(all_tickets, ['rank'])
+    return len(all_tickets)
+
+
+def sparse_move_ticket_to_end(ticket) -> int:
+    """
+    Current skip implementation, returns number of rows written
+    """
+    from apps.pokerboard import ranking as pokerboard_ranking
+
+    pokerboard_ranking.move_to_end(ticket)
+    return 1
+
+
+def seed(size: int, ranks: list):
+    """
+    Creates a pokerboard with size tickets ranked by ranks, returns it
+    """
+    from django.contrib.auth import get_user_model
+    from apps.pokerboard import models as pokerboard_models
+
+    manager = get_user_model().objects.create(email=f"bench-{size}-{ranks[-1]}@example.com")
+    pokerboard = pokerboard_models.Pokerboard.objects.create(
+        manager=manager, title=f"bench-{size}-{ranks[-1]}"[:20], description="benchmark", duration=60
+    )
+    pokerboard_models.Ticket.objects.bulk_create([
+        pokerboard_models.Ticket(pokerboard=pokerboard, ticket_id=f"BENCH-{idx}", rank=rank)
+        for idx, rank in enumerate(ranks)
+    ], batch_size=500)
+    return pokerboard
+
+
+def run(pokerboard, move, rounds: int) -> tuple:
+    """
+    Skips the first ticket of a pokerboard rounds times, returns latency samples and rows written per skip
+    """
+    samples = []
+    rows = 0
+    for _ in range(rounds):
+        ticket = pokerboard.tickets.order_by("rank").select_related("pokerboard").first()
+        started = time.perf_counter()
+        rows += move(ticket)
+        samples.append(time.perf_counter() - started)
+    return samples, rows / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 2000, 5000])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--db-delay-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    benchmark_utils.setup_django()
+    from apps.pokerboard import ranking as pokerboard_ranking
+
+    with benchmark_utils.test_database():
+        for size in args.sizes:
+            for name, move, ranks in (
+                ("legacy", legacy_move_ticket_to_end, list(range(1, size + 1))),
+                ("sparse", sparse_move_ticket_to_end, pokerboard_ranking.initial_ranks(size)),
+            ):
+                pokerboard = seed(size, ranks)
+                with benchmark_utils.query_delay(args.db_delay_ms / 1000):
+                    samples, rows = run(pokerboard, move, args.rounds)
+                benchmark_utils.report(f"{name} skip, {size} tickets, {rows:.0f} rows written per skip", samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import contextlib
+import statistics
+import time
+
+from manage import set_settings
+
+
+def setup_django() -> None:
+    """
+    Configures settings the same way manage.py does and sets up django
+    """
+    set_settings()
+    import django
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database():
+    """
+    Runs the block against a throwaway test database, so benchmarks never touch real data
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextlib.contextmanager
+def query_delay(seconds: float):
+    """
+    Adds a fixed delay to every SQL query, emulating a slow or remote database
+    """
+    from django.db.backends import utils as db_utils
+
+    original = db_utils.CursorWrapper._execute
+
+    def _execute(self, *args, **kwargs):
+        time.sleep(seconds)
+        return original(self, *args, **kwargs)
+
+    db_utils.CursorWrapper._execute = _execute
+    try:
+        yield
+    finally:
+        db_utils.CursorWrapper._execute = original
+
+
+def percentile(samples: list, pct: float) -> float:
+    """
+    Nearest-rank percentile of samples
+    """
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def report(title: str, samples: list, unit: str="ms", scale: float=1000) -> None:
+    """
+    Prints summary statistics of timing samples (in seconds)
+    """
+    print(
+        f"{title}: n={len(samples)} "
+        f"mean={statistics.mean(samples) * scale:.2f}{unit} "
+        f"p50={percentile(samples, 50) * scale:.2f}{unit} "
+        f"p90={percentile(samples, 90) * scale:.2f}{unit} "
+        f"p99={percentile(samples, 99) * scale:.2f}{unit} "
+        f"max={max(samples) * scale:.2f}{unit}"
+    )
@@ -0,0 +1,131 @@
+"""
+Websocket message latency benchmark.
+
+Opens --sockets connections to game sessions of --per-session users each, through the ASGI
+application and the in-memory channel layer, then every socket places votes and records the
+time until it receives the broadcast of its own vote. Prints p50/p90/p99 latency.
+
+--db-delay-ms adds a sleep to every SQL query to emulate a slow database; that is where ORM
+calls made on the event loop stall every other socket of the worker. To get "before" numbers
+run the same command with the previous revision of apps/pokerboard/consumers.py checked out.
+
+Usage (from PokerBoard-BE):
+    python -m benchmarks.ws_latency --sockets 500 --per-session 10 --rounds 3 --db-delay-ms 2
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks import utils as benchmark_utils
+
+
+def seed(sockets: int, per_session: int) -> list:
+    """
+    Creates users, tokens, pokerboards and in progress sessions, returns (user_id, token, session_id) tuples
+    """
+    from apps.pokerboard import models as pokerboard_models
+    from apps.user import models as user_models
+
+    user_models.User.objects.bulk_create([
+        user_models.User(email=f"bench{idx}@example.com", first_name="Bench", last_name=str(idx))
+        for idx in range(sockets)
+    ])
+    users = list(user_models.User.objects.filter(email__startswith="bench").order_by("id"))
+    tokens = user_models.Token.objects.bulk_create([
+        user_models.Token(key=user_models.Token.generate_key(), user=user) for user in users
+    ])
+
+    connections = []
+    for offset in range(0, sockets, per_session):
+        members = users[offset:offset + per_session]
+        pokerboard = pokerboard_models.Pokerboard.objects.create(
+            manager=members[0], title=f"bench-{offset}", description="benchmark", duration=60
+        )
+        ticket = pokerboard_models.Ticket.objects.create(pokerboard=pokerboard, ticket_id=f"BENCH-{offset}", rank=1)
+        session = pokerboard_models.GameSession.objects.create(ticket=ticket)
+        pokerboard_models.Invite.objects.bulk_create([
+            pokerboard_models.Invite(pokerboard=pokerboard, invitee=member.email, is_accepted=True)
+            for member in members[1:]
+        ])
+        connections += [(member.id, tokens[offset + idx].key, session.id) for idx, member in enumerate(members)]
+    return connections
+
+
+async def drain(communicator) -> None:
+    """
+    Discards every message already queued for a socket
+    """
+    while not await communicator.receive_nothing(timeout=0.05):
+        await communicator.receive_from()
+
+
+async def vote_and_wait(communicator, user_id: int, estimate: int) -> float:
+    """
+    Sends a vote and returns seconds until the socket receives its own vote back
+    """
+    started = time.perf_counter()
+    await communicator.send_json_to({"message_type": "vote", "message": {"estimate": estimate}})
+    while True:
+        message = json.loads(await communicator.receive_from(timeout=60))
+        if message.get("type") == "vote" and message["vote"]["user"]["id"] == user_id:
+            return time.perf_counter() - started
+
+
+async def run(connections: list, rounds: int) -> list:
+    """
+    Connects every socket and runs voting rounds, returns all latency samples
+    """
+    from channels.testing import WebsocketCommunicator
+    from poker.asgi import application
+
+    communicators = []
+    for user_id, token, session_id in connections:
+        communicator = WebsocketCommunicator(application, f"/session/{session_id}?token={token}")
+        connected, subprotocol = await communicator.connect(timeout=60)
+        assert connected, f"user {user_id} could not connect"
+        communicators.append((user_id, communicator))
+    await asyncio.gather(*[drain(communicator) for user_id, communicator in communicators])
+
+    samples = []
+    for estimate in range(1, rounds + 1):
+        samples += await asyncio.gather(*[
+            vote_and_wait(communicator, user_id, estimate) for user_id, communicator in communicators
+        ])
+        await asyncio.gather(*[drain(communicator) for user_id, communicator in communicators])
+
+    for user_id, communicator in communicators:
+        await communicator.disconnect()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sockets", type=int, default=500)
+    parser.add_argument("--per-session", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--db-delay-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    benchmark_utils.setup_django()
+    from django.conf import settings
+
+    # room for every broadcast of a round in each socket's queue
+    settings.CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+            "CONFIG": {"capacity": args.per_session * 4 + 100},
+        }
+    }
+    with benchmark_utils.test_database():
+        connections = seed(args.sockets, args.per_session)
+        with benchmark_utils.query_delay(args.db_delay_ms / 1000):
+            samples = asyncio.get_event_loop().run_until_complete(run(connections, args.rounds))
+    benchmark_utils.report(
+        f"vote latency ({args.sockets} sockets, {args.per_session} per session, db delay {args.db_delay_ms}ms)",
+        samples
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Websocket message handling CPU benchmark.
+
+Times the work SessionConsumer.receive does on every message before and after its handler runs:
+decoding and validating the message, picking the handler, validating a vote's estimate and
+encoding the reply. "before" is the path as it was, json with a print of every message, a DRF
+MessageSerializer, getattr dispatch and a DRF VoteSerializer for votes; "after" is the handler
+table with compiled validators, using orjson when it is installed.
+
+Usage (from PokerBoard-BE):
+    python -m benchmarks.ws_messages --messages 100000
+"""
+import argparse
+import contextlib
+import io
+import json
+import time
+
+from benchmarks import utils as benchmark_utils
+
+MESSAGES = {
+    "vote": {"message_type": "vote", "message": {"estimate": 5}},
+    "initialise_game": {"message_type": "initialise_game", "message": {"since": 42}},
+    "skip": {"message_type": "skip", "message": "skip"},
+}
+
+REPLY = {
+    "type": "vote",
+    "vote": {
+        "estimate": 5,
+        "game_session": 1,
+        "user": {"id": 1, "email": "bench@example.com", "first_name": "Bench", "last_name": "User"},
+    },
+    "seq": 42,
+}
+
+
+def legacy_path():
+    """
+    Message handling as done before the handler table
+    """
+    from rest_framework import serializers
+    from apps.pokerboard import (
+        models as pokerboard_models,
+        serializers as pokerboard_serializers,
+        utils as pokerboard_utils
+    )
+
+    class MessageSerializer(serializers.Serializer):
+        message_type = serializers.ChoiceField(
+            choices=["estimate", "skip", "vote", "initialise_game", "start_timer", "update"]
+        )
+        message = serializers.OrderedDict()
+
+    class Consumer:
+        def vote(self, event):
+            serializer = pokerboard_serializers.VoteSerializer(data=event["message"])
+            serializer.is_valid(raise_exception=True)
+            pokerboard_utils.validate_vote(pokerboard_models.Pokerboard.FIBONACCI, serializer.validated_data["estimate"])
+            return REPLY
+
+        def initialise_game(self, event):
+            return REPLY
+
+        def skip(self, event):
+            return REPLY
+
+    consumer = Consumer()
+
+    def handle(text_data):
+        text_data_json = json.loads(text_data)
+        print(text_data_json)
+        serializer = MessageSerializer(data=text_data_json)
+        serializer.is_valid(raise_exception=True)
+        message_type = text_data_json["message_type"]
+        res = getattr(consumer, message_type)({"type": message_type, "message": text_data_json["message"], "user": 1})
+        return json.dumps(res)
+    return handle
+
+
+def current_path():
+    """
+    Message handling through the session consumer's handler table
+    """
+    from apps.pokerboard import (
+        consumers as pokerboard_consumers,
+        messages as pokerboard_messages,
+        models as pokerboard_models,
+        utils as pokerboard_utils
+    )
+
+    def handle(text_data):
+        handler, message = pokerboard_consumers.session_handlers.parse(text_data)
+        if handler.message_type == "vote":
+            pokerboard_utils.validate_vote(pokerboard_models.Pokerboard.FIBONACCI, message["estimate"])
+        return pokerboard_messages.dumps(REPLY)
+    return handle
+
+
+def measure(handle, text_data: str, messages: int) -> float:
+    """
+    Returns CPU microseconds spent per message
+    """
+    started = time.process_time()
+    for _ in range(messages):
+        handle(text_data)
+    return (time.process_time() - started) / messages * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100000)
+    args = parser.parse_args()
+
+    benchmark_utils.setup_django()
+    from apps.pokerboard import messages as pokerboard_messages
+    print(f"json codec: {'orjson' if pokerboard_messages.orjson is not None else 'json'}")
+
+    legacy, current = legacy_path(), current_path()
+    for message_type, message in MESSAGES.items():
+        text_data = json.dumps(message)
+        # the legacy path prints every message, here into a buffer, cheaper than the log it goes to in production
+        with contextlib.redirect_stdout(io.StringIO()):
+            before = measure(legacy, text_data, args.messages)
+        after = measure(current, text_data, args.messages)
+        print(f"{message_type}: before={before:.1f}us after={after:.1f}us per message ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,12 @@ from channels.http import AsgiHandler
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 
-from apps.pokerboard.consumers import SessionConsumer
+from apps.pokerboard.consumers import ImportJobConsumer, SessionConsumer
 from poker.token_auth import TokenAuthMiddleware
 
 ws_patterns = [
-    path("session/<int:pk>", SessionConsumer.as_asgi())
+    path("session/<int:pk>", SessionConsumer.as_asgi()),
+    path("imports/<int:pk>", ImportJobConsumer.as_asgi()),
 ]
 
 application = ProtocolTypeRouter({
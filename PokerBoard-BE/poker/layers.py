@@ -0,0 +1,25 @@
+from django.core.exceptions import ImproperlyConfigured
+
+LAYER_BACKENDS = {
+    "memory": "channels.layers.InMemoryChannelLayer",
+    "redis": "channels_redis.core.RedisChannelLayer",
+    "redis_pubsub": "channels_redis.pubsub.RedisPubSubChannelLayer",
+}
+
+
+def layer_config(layer: str, url: str, prefix: str, capacity: int, expiry: int, group_expiry: int) -> dict:
+    """
+    Entry of CHANNEL_LAYERS for one of LAYER_BACKENDS.
+    The pubsub layer keeps no queues in redis, so capacity and expiries do not apply to it.
+    """
+    if layer not in LAYER_BACKENDS:
+        raise ImproperlyConfigured(f"Unknown channel layer {layer!r}, expected one of {', '.join(LAYER_BACKENDS)}")
+    config = {}
+    if layer != "redis_pubsub":
+        config.update(capacity=capacity, expiry=expiry, group_expiry=group_expiry)
+    if layer != "memory":
+        config.update(hosts=[url], prefix=prefix)
+    return {
+        "BACKEND": LAYER_BACKENDS[layer],
+        "CONFIG": config,
+    }
@@ -0,0 +1,133 @@
+import functools
+import smtplib
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
+
+from kombu import serialization
+
+_local = threading.local()
+
+
+@functools.lru_cache(maxsize=None)
+def get_cached_template(template_name: str):
+    """
+    Loads and compiles a template once per process
+    """
+    return get_template(template_name)
+
+
+def render(template_name: str, context: dict) -> str:
+    """
+    Renders a template, compiled only on first use
+    """
+    return get_cached_template(template_name).render(context)
+
+
+def build(to: str, subject: str, body: str="", html: str=None) -> EmailMultiAlternatives:
+    """
+    Email to a single recipient, with an optional html alternative
+    """
+    message = EmailMultiAlternatives(subject=subject.strip(), body=body, from_email=settings.EMAIL_HOST_USER, to=[to])
+    if html is not None:
+        message.attach_alternative(html, "text/html")
+    return message
+
+
+def get_cache():
+    """
+    Cache backend holding idempotency keys of sent emails, configured by the MAIL_CACHE_ALIAS entry of CACHES
+    """
+    return caches[settings.MAIL_CACHE_ALIAS]
+
+
+def send_batch(messages: dict) -> dict:
+    """
+    Sends messages by idempotency key, MAIL_BATCH_SIZE at a time over one connection each.
+    A key is claimed before its message is sent and released if sending fails, so a message whose key
+    was sent within MAIL_IDEMPOTENCY_TTL, by this or a redelivered task, is skipped.
+    Returns the number of messages sent and skipped.
+    """
+    cache = get_cache()
+    keys = list(messages)
+    sent = skipped = 0
+    for start in range(0, len(keys), settings.MAIL_BATCH_SIZE):
+        with get_connection() as connection:
+            for key in keys[start:start + settings.MAIL_BATCH_SIZE]:
+                if not cache.add(f"mail:{key}", True, timeout=settings.MAIL_IDEMPOTENCY_TTL):
+                    skipped += 1
+                    continue
+                try:
+                    connection.send_messages([messages[key]])
+                except Exception:
+                    cache.delete(f"mail:{key}")
+                    raise
+                sent += 1
+    return {"sent": sent, "skipped": skipped}
+
+
+def retry_options() -> dict:
+    """
+    Celery task options retrying a mail task on smtp and connection errors, with exponential backoff
+    """
+    return {
+        "autoretry_for": (smtplib.SMTPException, OSError),
+        "max_retries": settings.MAIL_RETRIES,
+        "retry_backoff": settings.MAIL_RETRY_BACKOFF,
+        "retry_backoff_max": settings.MAIL_RETRY_BACKOFF_MAX,
+        "retry_jitter": True,
+    }
+
+
+def message_size(task) -> int:
+    """
+    Size in bytes of the arguments of the running task, as serialized into its broker message
+    """
+    _, _, body = serialization.dumps([task.request.args, task.request.kwargs], serializer=task.serializer)
+    return len(body)
+
+
+def enqueue(task, object_id: int) -> None:
+    """
+    Queues a mail task for an object. Inside collect() ids are coalesced into one task call per task,
+    elsewhere the task is called right away.
+    """
+    pending = getattr(_local, "pending", None)
+    if pending is None:
+        task.delay([object_id])
+    else:
+        pending.setdefault(task, []).append(object_id)
+
+
+@contextmanager
+def collect():
+    """
+    Coalesces mail tasks queued in the block, calling every task once with all its ids when the block ends
+    """
+    if getattr(_local, "pending", None) is not None:
+        yield
+        return
+    _local.pending = {}
+    try:
+        yield
+    finally:
+        pending, _local.pending = _local.pending, None
+        for task, object_ids in pending.items():
+            task.delay(object_ids)
+
+
+class CollectMailMiddleware:
+    """
+    Coalesces the mails queued while handling a request, so a request triggers one task per kind of mail
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect():
+            return self.get_response(request)
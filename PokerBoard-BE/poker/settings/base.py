@@ -2,6 +2,8 @@ import os
 
 from class_settings import Settings
 
+from poker import layers as poker_layers
+
 
 class Setting(Settings):
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -43,6 +45,12 @@ class Setting(Settings):
 
     TOKEN_TTL = 500
 
+    # Tokens (with their users) cached per worker and seconds each stays cached. A logout or user
+    # change evicts the token on its own worker at once and on other workers within TOKEN_CACHE_TTL
+    TOKEN_CACHE_SIZE = 10000
+
+    TOKEN_CACHE_TTL = 5
+
     MIDDLEWARE = [
         'django.middleware.security.SecurityMiddleware',
         'django.contrib.sessions.middleware.SessionMiddleware',
@@ -52,6 +60,7 @@ class Setting(Settings):
         'django.contrib.messages.middleware.MessageMiddleware',
         'django.middleware.clickjacking.XFrameOptionsMiddleware',
         'corsheaders.middleware.CorsMiddleware',
+        'poker.mail.CollectMailMiddleware',
     ]
 
     ROOT_URLCONF = 'poker.urls'
@@ -107,10 +116,131 @@ class Setting(Settings):
         }
     }
 
-    CHANNEL_LAYERS = {
-        'default': {
-            "BACKEND": "channels.layers.InMemoryChannelLayer"
+    # Channel layer carrying websocket broadcasts, one of poker.layers.LAYER_BACKENDS: 'memory' reaches
+    # sockets of the same process only, 'redis' and 'redis_pubsub' reach every worker through CHANNEL_LAYER_URL
+    CHANNEL_LAYER = 'memory'
+
+    CHANNEL_LAYER_URL = 'redis://localhost:6379/1'
+
+    CHANNEL_LAYER_PREFIX = 'asgi'
+
+    # Messages queued per channel before sends to it fail, seconds a queued message is kept,
+    # and seconds a channel stays in a group without being added again
+    CHANNEL_LAYER_CAPACITY = 100
+
+    CHANNEL_LAYER_EXPIRY = 60
+
+    CHANNEL_LAYER_GROUP_EXPIRY = 24 * 60 * 60
+
+    @property
+    def CHANNEL_LAYERS(self):
+        return {
+            'default': poker_layers.layer_config(
+                self.CHANNEL_LAYER, self.CHANNEL_LAYER_URL, self.CHANNEL_LAYER_PREFIX,
+                self.CHANNEL_LAYER_CAPACITY, self.CHANNEL_LAYER_EXPIRY, self.CHANNEL_LAYER_GROUP_EXPIRY
+            )
         }
+
+    # Shared store for live session state (presence). Set to a redis url when running several workers.
+    SESSION_STORE_URL = None
+
+    PRESENCE_TTL = 60
+
+    PRESENCE_HEARTBEAT_INTERVAL = 20
+
+    # Latest events of a game session kept for clients resyncing after a reconnect, and seconds
+    # they are kept after the last one. Clients further behind get a full snapshot instead.
+    SESSION_EVENT_BUFFER_SIZE = 256
+
+    SESSION_EVENT_TTL = 24 * 60 * 60
+
+    # What happens when the voting timer of a session runs out: 'reveal' ends voting and announces
+    # the final votes, 'close' also skips the session
+    SESSION_TIMER_ACTION = 'reveal'
+
+    # Threads (and so database connections) per worker used by websocket consumers for ORM access
+    WEBSOCKET_DB_POOL_SIZE = 10
+
+    # Seconds between batched writes of buffered votes
+    VOTE_FLUSH_INTERVAL = 1
+
+    # Seconds a user's access to a pokerboard stays cached, invite changes invalidate it earlier
+    POKERBOARD_ACCESS_CACHE_TTL = 300
+
+    # Jira client: (connect, read) timeouts in seconds, retries with exponential backoff on 429/5xx,
+    # and requests (and pooled connections) in flight at once per worker
+    JIRA_TIMEOUT = (3.05, 15)
+
+    JIRA_RETRIES = 3
+
+    JIRA_RETRY_BACKOFF = 0.5
+
+    JIRA_MAX_PARALLEL = 8
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'jira': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'jira',
+            'OPTIONS': {
+                'MAX_ENTRIES': 1000,
+            },
+        },
+        # in the database so every worker sees the same sent emails, its table is created by createcachetable
+        'mail': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'mail_cache',
+            'OPTIONS': {
+                'MAX_ENTRIES': 100000,
+            },
+        },
+    }
+
+    # Cache (an entry of CACHES) in front of jira, and per endpoint seconds a response is fresh (ttl)
+    # and afterwards served stale while it is refetched in the background (stale)
+    JIRA_CACHE_ALIAS = 'jira'
+
+    JIRA_CACHE_POLICIES = {
+        'projects': {'ttl': 3600, 'stale': 86400},
+        'sprints': {'ttl': 3600, 'stale': 86400},
+        'search': {'ttl': 60},
+        'comments': {'ttl': 30},
+        'tickets': {'ttl': 3600},
+    }
+
+    # Ticket ids validated per jira search while creating a pokerboard
+    JIRA_VALIDATION_CHUNK_SIZE = 100
+
+    # Tickets validated between progress reports of an import job, and inserted per query
+    IMPORT_BATCH_SIZE = 500
+
+    # Invites inserted per query when a group is invited to a pokerboard
+    INVITE_BATCH_SIZE = 500
+
+    # Emails sent over one smtp connection before it is reopened
+    MAIL_BATCH_SIZE = 100
+
+    # Cache (an entry of CACHES, shared by all workers) remembering sent emails,
+    # and seconds a sent email is not sent again when its task is redelivered or retried
+    MAIL_CACHE_ALIAS = 'mail'
+
+    MAIL_IDEMPOTENCY_TTL = 7 * 24 * 60 * 60
+
+    # Retries of an email task failing to reach the smtp server, backing off exponentially
+    # from MAIL_RETRY_BACKOFF seconds up to MAIL_RETRY_BACKOFF_MAX seconds
+    MAIL_RETRIES = 5
+
+    MAIL_RETRY_BACKOFF = 2
+
+    MAIL_RETRY_BACKOFF_MAX = 300
+
+    CELERY_BEAT_SCHEDULE = {
+        'purge-expired-tokens': {
+            'task': 'apps.user.tasks.purge_expired_tokens_task',
+            'schedule': 24 * 60 * 60,
+        },
     }
 
     LANGUAGE_CODE = 'en-us'
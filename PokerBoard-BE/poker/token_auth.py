@@ -1,19 +1,20 @@
+import datetime
+
 from django.contrib.auth.models import AnonymousUser
 
 from channels.middleware import BaseMiddleware
 
-from apps.user.models import Token
+from apps.user import tokens as user_tokens
 
 
-def get_user(token_key):
+async def get_user(token_key):
     """
-    Gets user from a token_key
+    Gets user from a token_key, anonymous if the token is unknown or expired
     """
-    try:
-        token = Token.objects.get(key=token_key)
-        return token.user
-    except Token.DoesNotExist:
+    token = await user_tokens.aresolve_token(token_key)
+    if token is None or token.expired_at < datetime.datetime.now() or not token.user.is_active:
         return AnonymousUser()
+    return token.user
 
 
 class TokenAuthMiddleware(BaseMiddleware):
@@ -26,5 +27,5 @@ class TokenAuthMiddleware(BaseMiddleware):
             token_key = (dict((query.split('=') for query in scope['query_string'].decode().split("&")))).get('token', None)
         except ValueError:
             token_key = None
-        scope['user'] = AnonymousUser() if token_key is None else get_user(token_key)
+        scope['user'] = AnonymousUser() if token_key is None else await get_user(token_key)
         return await super().__call__(scope, receive, send)
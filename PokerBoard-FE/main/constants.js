@@ -56,8 +56,10 @@
             VOTE: 'vote',
             START_TIMER: 'start_timer',
             JOIN: 'join',
+            LEAVE: 'leave',
             UPDATE : 'update',
             ESTIMATE: 'estimate',
+            REVEAL: 'reveal',
         },
         ROUTES: {
             //access whether user is authenticated or not
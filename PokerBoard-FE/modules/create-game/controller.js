@@ -43,7 +43,7 @@
 
             const showTickets = query => {
                 /* Show the list of JIRA tickets from selected projects/sprint/JQL */
-                createGameService.getTickets('?jql=' + query).then(response => {
+                createGameService.getTickets('?fields=summary&jql=' + query).then(response => {
                     $scope.ticketList = [];
                     const parseTickets = ele => {
                         $scope.ticketList.push({
@@ -9,22 +9,9 @@
                 {
                     "id": <int>,
                     "name": "<string>",
-                    "members": [
-                        {
-                            "id": <int>,
-                            "user": {
-                                "first_name": "<string>",
-                                "last_name": "<string>",
-                                "email": "<string>",
-                            },
-                            "group": <int>,
-                            "created_at": "<datetime>",
-                            "updated_at": "<datetime>"
-                        },
-                    ],
-                    "created_by": <int>,
-                    "created_at": "<datetime>",
-                    "updated_at": "<datetime>"
+                    "created_at": "<date>",
+                    "members": <int>,
+                    "created_by": <int>
                 },
             ]
             */
@@ -65,7 +52,7 @@
                             id: obj.id,
                             name: obj.name,
                             created_at: new Date(obj.created_at).toLocaleDateString(),
-                            members: obj.members.length,
+                            members: obj.member_count,
                             created_by: obj.created_by
                         }
                     });;
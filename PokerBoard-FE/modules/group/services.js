@@ -48,11 +48,11 @@
             };
 
             /**
-             * @description get group list service
+             * @description get group list service, groups carry member counts instead of members
              * @returns list of group
              */
             this.getGroups = () => {
-                return Restangular.all(APP_CONSTANTS.API_ENDPOINT.GROUPS).getList();
+                return Restangular.all(APP_CONSTANTS.API_ENDPOINT.GROUPS).getList({ view: 'compact' });
             };
     }]); 
 })();
@@ -13,9 +13,12 @@
                 $state.go('pokerboard-details', { "id": id });
             }
 
-            const init = () => {
-                pokerboardService.getPokerboards().then(response => {
-                    $scope.boardList = [];
+            /**
+             * Appends the next page of pokerboards to the list
+             */
+            $scope.loadPokerboards = () => {
+                pokerboardService.getPokerboards($scope.nextCursor).then(response => {
+                    $scope.nextCursor = response.next ? new URL(response.next).searchParams.get('cursor') : null;
                     const parse = ele => {
                         $scope.boardList.push({
                             id: ele.id,
@@ -25,10 +28,16 @@
                             creator: ele.manager.first_name + " " + ele.manager.last_name,
                         });
                     }
-                    response.forEach(parse);
+                    response.results.forEach(parse);
                 });
             };
 
+            const init = () => {
+                $scope.boardList = [];
+                $scope.nextCursor = null;
+                $scope.loadPokerboards();
+            };
+
             init();
 
             $scope.redirect = function () {
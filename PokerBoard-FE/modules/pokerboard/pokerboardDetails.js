@@ -94,7 +94,7 @@
                     
                     if(ticketIds == "") return;
                     const query = `issue IN (${ticketIds})`;
-                    return createGameService.getTickets('?jql=' + query);
+                    return createGameService.getTickets('?fields=summary&jql=' + query);
                 })
                 .then((res)=>{
                     const issues = res?.issues;
@@ -10,11 +10,16 @@
             Restangular, APP_CONSTANTS
         ) {
             /**
-             * Get pokerboard list
-             * @returns pokerboard list
+             * Get a page of the pokerboard list, with ticket counts instead of tickets
+             * @param {string} cursor of the page, first page if missing
+             * @returns pokerboard list page
              */
-            this.getPokerboards = function () {
-                return Restangular.one(APP_CONSTANTS.API_ENDPOINT.POKERBOARD).get();
+            this.getPokerboards = function (cursor) {
+                const params = { view: 'summary' };
+                if (cursor) {
+                    params.cursor = cursor;
+                }
+                return Restangular.one(APP_CONSTANTS.API_ENDPOINT.POKERBOARD).get(params);
             }
 
             /**
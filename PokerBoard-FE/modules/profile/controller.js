@@ -7,29 +7,51 @@
         ) {
             $scope.passNote = APP_CONSTANTS.ERROR_MESSAGES.PASSWORD_VALIDATION;
             $scope.votes = [];
+            const parsePokerboard = ele => {
+                $scope.pokerboardList.push({
+                    title: ele.title,
+                    description: ele.description,
+                    status: APP_CONSTANTS.POKERBOARD_STATUS[ele.status],
+                });
+            }
+            const parseGroup = ele => {
+                $scope.groupList.push({
+                    name: ele.name,
+                    createdAt: new Date(ele.created_at).toLocaleDateString(),
+                });
+            }
+
+            /**
+             * Appends the next page of pokerboards joined
+             */
+            $scope.loadMorePokerboards = () => {
+                profileService.getSectionPage($scope.nextPokerboards).then(response => {
+                    $scope.nextPokerboards = response.boards.next;
+                    response.boards.results.forEach(parsePokerboard);
+                });
+            };
+
+            /**
+             * Appends the next page of groups joined
+             */
+            $scope.loadMoreGroups = () => {
+                profileService.getSectionPage($scope.nextGroups).then(response => {
+                    $scope.nextGroups = response.groups.next;
+                    response.groups.results.forEach(parseGroup);
+                });
+            };
+
             const init = function () {
-                profileService.getUser($rootScope.user.id).then(response => {
+                profileService.getUser($rootScope.user.id, 'boards,groups').then(response => {
                     $scope.groupList = [];
                     $scope.pokerboardList = [];
                     $scope.email = response.email;
                     $scope.firstname = response.first_name;
                     $scope.lastname = response.last_name;
-                    $scope.votes = response.votes;
-                    const parsePokerboard = ele => {
-                        $scope.pokerboardList.push({
-                            title: ele.title,
-                            description: ele.description,
-                            status: APP_CONSTANTS.POKERBOARD_STATUS[ele.status],
-                        });
-                    }
-                    const parseGroup = ele => {
-                        $scope.groupList.push({
-                            name: ele.name,
-                            createdAt: new Date(ele.created_at).toLocaleDateString(),
-                        });
-                    }
-                    response.pokerboard.forEach(parsePokerboard);
-                    response.group.forEach(parseGroup);
+                    $scope.nextPokerboards = response.boards.next;
+                    $scope.nextGroups = response.groups.next;
+                    response.boards.results.forEach(parsePokerboard);
+                    response.groups.results.forEach(parseGroup);
                 });
             };
 
@@ -7,12 +7,22 @@
     angular.module("pokerPlanner").service('profileService', ['Restangular', 'APP_CONSTANTS',
         function (Restangular, APP_CONSTANTS) {
             /**
-             * Fetches user through user id
+             * Fetches user through user id, along with the first page of each requested section
              * @param {Integer} id 
+             * @param {String} include comma separated sections, out of boards, groups and votes
              * @returns user details
              */
-            this.getUser = id => {
-                return Restangular.one(APP_CONSTANTS.API_ENDPOINT.USER_PROFILE, id).get();
+            this.getUser = (id, include) => {
+                return Restangular.one(APP_CONSTANTS.API_ENDPOINT.USER_PROFILE, id).get({ include: include });
+            };
+
+            /**
+             * Fetches the next page of a profile section
+             * @param {String} url next link of the section
+             * @returns user details with the section's next page
+             */
+            this.getSectionPage = url => {
+                return Restangular.oneUrl('profile', url).get();
             };
 
             /**
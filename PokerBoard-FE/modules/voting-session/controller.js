@@ -7,6 +7,11 @@
             const pokerboardId = $stateParams.id;
 
             let issueId;
+            let participants = {};
+            // number of the latest session event applied, null until the first snapshot
+            let seq = null;
+            // milliseconds the server's clock is ahead of this client's
+            let clockOffset = 0;
             $scope.voteList = [];
             const setCards = type => {
                 /* Setting card type */
@@ -15,7 +20,7 @@
 
             const setIssueDetails = ticketId => {
                 /* Fetching JIRA issue to be estimated */
-                const query = "?jql=issue IN (" + ticketId + ")";
+                const query = "?fields=summary,description,labels&jql=issue IN (" + ticketId + ")";
                 issueId = ticketId;
                 votingSessionService.getIssue(query).then(response => {
                     $scope.issueTitle = ticketId + ": " + response.issues[0].fields.summary;
@@ -81,15 +86,14 @@
                 $scope.$apply();
             };
 
-            const setCountdown = timer => {
-                /* Setting up countdown timer */
+            const setCountdown = deadline => {
+                /* Counting down to the server's deadline (epoch seconds) on the server's clock */
+                clearInterval($scope.timerId);
                 $scope.time = 0;
-                if (timer === "null") {
+                if (deadline === null || deadline === undefined) {
                     return;
                 }
-                let startTime = new Date(timer);
-                let currentTime = new Date();
-                $scope.time = Math.round($scope.duration - (currentTime - startTime) / 1000);
+                $scope.time = Math.round((deadline * 1000 - (Date.now() + clockOffset)) / 1000);
                 if ($scope.time <= 0) {
                     clearInterval($scope.timerId);
                     $scope.time = 0;
@@ -103,6 +107,16 @@
                 $scope.timerId = setInterval(countdown, 1000);
             };
 
+            const onReveal = data => {
+                /* Voting ended on the server, showing the final votes */
+                clearInterval($scope.timerId);
+                $scope.time = 0;
+                $scope.estimated = true;
+                $scope.voteList = [];
+                data.votes.forEach(addRealTimeVotedUser);
+                $scope.$apply();
+            };
+
             const initializeGame = data => {
                 /* Initializing game after successfull connection with websocket */
                 $scope.voteList = [];
@@ -111,19 +125,33 @@
                     addRealTimeVotedUser(ele);
                 }
                 data.votes.forEach(parseVotes);
-                setCountdown(data.timer);
+                setCountdown(data.deadline);
             };
 
-            const updateParticipants = data => {
+            const renderParticipants = () => {
                 /* Updating Participants in UI */
-                $scope.participantList = [];
-                const parseUsers = ele => {
-                    let name = ele.first_name + " " + ele.last_name;
-                    if (!$scope.participantList.includes(name)) {
-                        $scope.participantList.push(name);
-                    }
-                }
-                data.forEach(parseUsers);
+                $scope.participantList = Object.values(participants);
+            };
+
+            const updateParticipants = data => {
+                /* Replacing participants with a full user list */
+                participants = {};
+                data.forEach(ele => {
+                    participants[ele.id] = ele.first_name + " " + ele.last_name;
+                });
+                renderParticipants();
+            };
+
+            const addParticipant = user => {
+                /* Adding the user who joined */
+                participants[user.id] = user.first_name + " " + user.last_name;
+                renderParticipants();
+            };
+
+            const removeParticipant = user => {
+                /* Removing the user who left */
+                delete participants[user.id];
+                renderParticipants();
             };
 
             const addRealTimeVotedUser = data => {
@@ -132,7 +160,8 @@
                 $scope.voteList = $scope.voteList.filter(ele => ele.id != data.user.id);
                 let first_name = data.user.first_name;
                 let last_name = data.user.last_name;
-                if (data.user.id === $rootScope.user.id) {
+                /* Estimates of votes are sent to managers only until votes are revealed */
+                if (data.user.id === $rootScope.user.id && data.estimate !== undefined) {
                     elevateCard($scope.cardList.indexOf(data.estimate));
                 }
                 $scope.voteList.push(
@@ -150,26 +179,78 @@
                 $state.go('pokerboard-details', { id: pokerboardId });
             };
 
+            const requestSync = () => {
+                /* Asking for the events missed since the latest one applied, or a snapshot */
+                $scope.websocket.send({ "message": { "since": seq }, "message_type": APP_CONSTANTS.MESSAGE_TYPE.INITIALIZE_GAME });
+            };
+
+            const applyEvent = obj => {
+                /* Applying a session event once and in order, resyncing when some were missed */
+                if (seq !== null && obj.seq <= seq) {
+                    return;
+                }
+                if (seq !== null && obj.seq > seq + 1) {
+                    requestSync();
+                    return;
+                }
+                seq = obj.seq;
+                switch (obj.type) {
+                    case APP_CONSTANTS.MESSAGE_TYPE.SKIP: onGameSkipped();
+                        break;
+                    case APP_CONSTANTS.MESSAGE_TYPE.VOTE: addRealTimeVotedUser(obj.vote);
+                        break;
+                    case APP_CONSTANTS.MESSAGE_TYPE.START_TIMER: setCountdown(obj.deadline);
+                        break;
+                    case APP_CONSTANTS.MESSAGE_TYPE.REVEAL: onReveal(obj);
+                        break;
+                    case APP_CONSTANTS.MESSAGE_TYPE.ESTIMATE: $state.go('pokerboard-details', { id: pokerboardId });
+                        break;
+                    case APP_CONSTANTS.MESSAGE_TYPE.JOIN: addParticipant(obj.user);
+                        break;
+                    case APP_CONSTANTS.MESSAGE_TYPE.LEAVE: removeParticipant(obj.user);
+                        break;
+                }
+            };
+
+            const applyManagerReply = obj => {
+                /* Replies to managers only, they are not numbered session events */
+                if (obj.type === APP_CONSTANTS.MESSAGE_TYPE.VOTE) {
+                    addRealTimeVotedUser(obj.vote);
+                }
+            };
+
+            const onSync = obj => {
+                /* Applying missed events, or replacing the state with a snapshot */
+                if (obj.events) {
+                    obj.events.forEach(applyEvent);
+                    if (obj.votes) {
+                        obj.votes.forEach(addRealTimeVotedUser);
+                    }
+                    return;
+                }
+                seq = obj.seq;
+                initializeGame(obj);
+            };
+
             const setSocketConnection = sessionId => {
-                /* Establishing web socket connection */
+                /* Establishing web socket connection, resyncing whenever it is (re)opened */
                 $scope.websocket = votingSessionService.wsConnect(sessionId, $rootScope.user.token);
-                $scope.websocket.send({ "message": "Member Joined", "message_type": APP_CONSTANTS.MESSAGE_TYPE.INITIALIZE_GAME });
+                $scope.websocket.onOpen(requestSync);
                 $scope.websocket.onMessage(function (message) {
                     const obj = JSON.parse(message.data);
-                    console.log(obj);
-                    switch (obj.type) {
-                        case APP_CONSTANTS.MESSAGE_TYPE.INITIALIZE_GAME: initializeGame(obj);
-                            break;
-                        case APP_CONSTANTS.MESSAGE_TYPE.SKIP: onGameSkipped();
-                            break;
-                        case APP_CONSTANTS.MESSAGE_TYPE.VOTE: addRealTimeVotedUser(obj.vote);
-                            break;
-                        case APP_CONSTANTS.MESSAGE_TYPE.START_TIMER: setCountdown(obj.timer_started_at);
-                            break;
-                        case APP_CONSTANTS.MESSAGE_TYPE.ESTIMATE: $state.go('pokerboard-details', { id: pokerboardId });
-                            break;
-                        case APP_CONSTANTS.MESSAGE_TYPE.UPDATE: updateParticipants(obj.users);
-                            break;
+                    if (obj.error) {
+                        /* Errors are replies to this client only, not session events */
+                        return;
+                    }
+                    if (obj.server_time) {
+                        clockOffset = obj.server_time * 1000 - Date.now();
+                    }
+                    if (obj.type === APP_CONSTANTS.MESSAGE_TYPE.INITIALIZE_GAME) {
+                        onSync(obj);
+                    } else if (obj.seq === undefined) {
+                        applyManagerReply(obj);
+                    } else {
+                        applyEvent(obj);
                     }
                 });
             };
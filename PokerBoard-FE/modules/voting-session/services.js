@@ -54,13 +54,15 @@
             }
 
             /**
-             * Connect to websocket
+             * Connect to websocket, reconnecting when the connection drops
              * @param {Integer} sessionId
              * @param {String} token
              * @returns Connection with websocket
              */
             this.wsConnect = (sessionId, token) => {
-                return $websocket(APP_CONSTANTS.WS_BASE_URL + "session/" + sessionId + "?token=" + token);
+                return $websocket(APP_CONSTANTS.WS_BASE_URL + "session/" + sessionId + "?token=" + token, null, {
+                    reconnectIfNotNormalClose: true
+                });
             }
 
         }]);